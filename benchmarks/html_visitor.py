@@ -0,0 +1,94 @@
+"""Compare the rendering time of HtmlVisitor and
+JinjaVisitor on a generated document, using Jinja
+templates that produce the same HTML.
+
+Run it from the root of the repository with
+
+    python benchmarks/html_visitor.py [SECTIONS] [REPEAT]
+"""
+
+import logging
+import sys
+import time
+
+from mau import Mau
+from mau.environment.environment import Environment
+from mau.message import LogMessageHandler
+from mau.visitors.html_visitor import HtmlVisitor
+from mau.visitors.jinja_visitor import JinjaVisitor
+
+SECTION = """
+= Section {index}
+
+This is *some* text with _styles_ and `verbatim` and a [link](https://example.com, "here").
+A second line of the paragraph with more words.
+
+* Item one
+* Item two
+
+[engine=source, language=python]
+----
+def function(x):
+    return x
+----
+"""
+
+# Templates that render the nodes of the
+# document as HtmlVisitor does.
+TEMPLATES = {
+    "document.j2": "{{ content }}",
+    "header.j2": '<h{{ level }} id="{{ internal_id }}">{{ content }}</h{{ level }}>',
+    "paragraph.j2": "<p>{{ lines }}</p>",
+    "paragraph-line.j2": "{{ content }}",
+    "text.j2": "{{ value }}",
+    "verbatim.j2": "<code>{{ value }}</code>",
+    "style-star.j2": "<strong>{{ content }}</strong>",
+    "style-underscore.j2": "<em>{{ content }}</em>",
+    "macro-link.j2": '<a href="{{ target }}">{{ content }}</a>',
+    "list.j2": "<ul>{{ content }}</ul>",
+    "list-item.j2": "<li>{{ content }}</li>",
+    "source.j2": (
+        '<div class="source"><pre><code class="language-{{ language }}">'
+        "{{ content }}</code></pre></div>"
+    ),
+    "source-line.j2": "{{ line_content }}",
+}
+
+
+def main():
+    sections = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    text = "".join(SECTION.format(index=index) for index in range(sections))
+
+    environment = Environment()
+    environment.dupdate(TEMPLATES, "mau.visitor.templates.custom")
+
+    mau = Mau(LogMessageHandler(logging.getLogger(__name__)), environment)
+    lexer = mau.run_lexer(mau.init_text_buffer(text, "benchmark.mau"))
+    document = mau.run_parser(lexer.tokens).output.document
+
+    results = {}
+
+    for visitor_class in (JinjaVisitor, HtmlVisitor):
+        # Load the templates before measuring.
+        visitor = visitor_class(mau.message_handler, Environment())
+        if visitor_class is JinjaVisitor:
+            visitor = visitor_class(mau.message_handler, environment)
+
+        start = time.perf_counter()
+
+        for _ in range(repeat):
+            output = visitor.process(document)
+
+        elapsed = (time.perf_counter() - start) / repeat
+        results[visitor_class.__name__] = output
+
+        print(f"{visitor_class.__name__:>12}: {elapsed:.4f}s")
+
+    if results["JinjaVisitor"] != results["HtmlVisitor"]:
+        print("WARNING: the outputs are different")
+
+
+if __name__ == "__main__":
+    main()
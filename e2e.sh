@@ -11,14 +11,15 @@ if [[ ! -d ${OUTPUT_DIR} ]]; then mkdir ${OUTPUT_DIR}; fi
 
 rm -fR ${OUTPUT_DIR}/* > /dev/null
 
+# Process all the files in a single run.
+echo "Processing ${SOURCE_DIR}"
+mau --inputs "${SOURCE_DIR}/*.mau" -t core:YamlVisitor --output-dir ${OUTPUT_DIR}
+
 for source_file in ${source_files}
 do
-    echo "Processing ${source_file}"
-    
     output_file=${source_file/.mau/.yaml}
-    mau -i ${SOURCE_DIR}/${source_file} -t core:YamlVisitor -o ${OUTPUT_DIR}/${output_file}
 
-    echo "Diffing..."
+    echo "Diffing ${output_file}..."
     diff ${REF_DIR}/${output_file} ${OUTPUT_DIR}/${output_file}
 done
 
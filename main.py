@@ -1,37 +1,52 @@
 import argparse
+import itertools
 import logging
+import os
 import sys
-from typing import Type
-
-import yaml
-from rich.traceback import install
-
-from mau import (
-    BASE_NAMESPACE,
-    Mau,
-    __version__,
-    load_environment_files,
-    load_environment_variables,
-    load_visitors,
-)
-from mau.environment.environment import Environment
-from mau.message import LogMessageHandler, MauException
-from mau.visitors.base_visitor import BaseVisitor
-from mau.lexers.base_lexer import print_tokens
-
-install(show_locals=True)
+from typing import TYPE_CHECKING, Type
+
+# The Mau package is imported only after
+# the arguments have been parsed, so that
+# options like --help and --version
+# don't need to wait for it.
+if TYPE_CHECKING:
+    from mau.visitors.base_visitor import BaseVisitor
 
 logger = logging.getLogger(__name__)
 
-# Load a dictionary of all visitors,
-# indexed by the output format.
-visitors: dict[str, Type[BaseVisitor]] = load_visitors()
+
+class VersionAction(argparse.Action):
+    # Like the standard "version" action, but the
+    # version is read only when the option is used,
+    # as reading it imports the package metadata.
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, **kwargs):
+        super().__init__(option_strings, dest=dest, nargs=0, **kwargs)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        from importlib import metadata
+
+        parser.exit(message=f"Mau version {metadata.version('mau')}\n")
 
 
 def write_output(output, output_file, postprocess=None):
     if postprocess:
         output = postprocess(output)
 
+    # Binary output is written as it is.
+    if isinstance(output, bytes):
+        if output_file == "-":
+            sys.stdout.flush()
+            sys.stdout.buffer.write(output)
+            sys.stdout.buffer.flush()
+
+            return
+
+        from mau.batch import write_output_file
+
+        write_output_file(output, output_file, if_changed=True)
+
+        return
+
     # The output file can be "-" which means
     # the standard output
     if output_file == "-":
@@ -39,10 +54,57 @@ def write_output(output, output_file, postprocess=None):
 
         return
 
-    # We need to write on an actual file
-    with open(output_file, "w", encoding="utf-8") as out:
-        out.write(output)
-        out.write("\n")
+    from mau.batch import write_output_file
+
+    # We need to write on an actual file. If it
+    # already contains the output it is not written
+    # again, so that its modification time is stable.
+    write_output_file(output, output_file, if_changed=True)
+
+
+def write_output_stream(chunks, output_file):
+    # Write the output chunks as they are produced,
+    # so that the whole output is never in memory.
+    chunks = iter(chunks)
+    first_chunk = next(chunks, "")
+
+    # Binary output is written in one piece.
+    if isinstance(first_chunk, bytes):
+        write_output(b"".join([first_chunk, *chunks]), output_file)
+
+        return
+
+    chunks = itertools.chain([first_chunk], chunks)
+
+    if output_file == "-":
+        for chunk in chunks:
+            sys.stdout.write(chunk)
+
+        sys.stdout.write("\n")
+
+        return
+
+    # The chunks are written to a temporary file that
+    # replaces the output only when the rendering is
+    # complete, so that an error doesn't leave a
+    # truncated file instead of the previous output.
+    temp_filename = f"{output_file}.tmp"
+
+    try:
+        with open(temp_filename, "w", encoding="utf-8") as out:
+            for chunk in chunks:
+                out.write(chunk)
+
+            out.write("\n")
+
+        os.replace(temp_filename, output_file)
+    except BaseException:
+        try:
+            os.remove(temp_filename)
+        except OSError:
+            pass
+
+        raise
 
 
 def create_parser():
@@ -55,17 +117,46 @@ def create_parser():
         "--config-file",
         action="store",
         required=False,
-        help="Optional YAML config file",
+        help="Optional YAML or JSON config file",
     )
 
     parser.add_argument(
         "-i",
         "--input-file",
         action="store",
-        required=True,
+        required=False,
         help="Input file",
     )
 
+    parser.add_argument(
+        "--inputs",
+        action="store",
+        nargs="+",
+        required=False,
+        help="Input files or glob patterns, processed in a single run",
+    )
+
+    parser.add_argument(
+        "--manifest",
+        action="store",
+        required=False,
+        help="Optional file that lists input files or glob patterns, one per line",
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        action="store",
+        required=False,
+        help="Optional directory for the output of multiple input files",
+    )
+
+    parser.add_argument(
+        "--output-extension",
+        action="store",
+        required=False,
+        help="Optional extension of the output of multiple input files",
+    )
+
     parser.add_argument(
         "-o",
         "--output-file",
@@ -96,7 +187,7 @@ def create_parser():
         action="append",
         required=False,
         help=(
-            "Optional text/YAML file in the form key=path (can be specified "
+            "Optional YAML/JSON file in the form key=path (can be specified "
             "multiple times). The key can be dotted to add namespaces."
         ),
     )
@@ -133,8 +224,141 @@ def create_parser():
         "--visitor",
         action="store",
         dest="output_format",
-        choices=visitors.keys(),
-        help="Output format",
+        help="Output format (e.g. core:HtmlVisitor)",
+    )
+
+    parser.add_argument(
+        "--templates-cache-dir",
+        action="store",
+        required=False,
+        help="Optional directory where compiled templates are cached",
+    )
+
+    parser.add_argument(
+        "--warm-templates-cache",
+        dest="warm_templates_cache",
+        help="compile all templates into the templates cache and exit",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--render-cache-dir",
+        action="store",
+        required=False,
+        help="Optional directory where rendered nodes are cached",
+    )
+
+    parser.add_argument(
+        "--no-render-cache",
+        dest="no_render_cache",
+        help="do not use the cache of rendered nodes",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--highlight",
+        dest="highlight",
+        help="highlight the code of source blocks with Pygments",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--highlight-cache-dir",
+        action="store",
+        required=False,
+        help="Optional directory where highlighted code is cached",
+    )
+
+    parser.add_argument(
+        "--highlight-jobs",
+        action="store",
+        type=int,
+        required=False,
+        help="Number of processes used to highlight source blocks",
+    )
+
+    parser.add_argument(
+        "--parse-cache-dir",
+        action="store",
+        required=False,
+        help="Optional directory where parsed documents are cached",
+    )
+
+    parser.add_argument(
+        "--no-parse-cache",
+        dest="no_parse_cache",
+        help="do not use the cache of parsed documents",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--include-jobs",
+        action="store",
+        type=int,
+        required=False,
+        help="Number of processes used to parse included Mau files",
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        type=int,
+        required=False,
+        help=(
+            "Optional number of processes used to render the document "
+            "(or to process the files when there are multiple inputs)"
+        ),
+    )
+
+    parser.add_argument(
+        "--strip-parent",
+        dest="strip_parent",
+        help="do not include the parent of each node in data outputs",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--intern-contexts",
+        dest="intern_contexts",
+        help="store the contexts of data outputs in a separate table",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--stream",
+        dest="stream",
+        help="write the output while it is rendered",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--build-manifest",
+        dest="build_manifest",
+        help=(
+            "write a build manifest next to each output "
+            "and skip the outputs that are up to date"
+        ),
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--watch",
+        dest="watch",
+        help=(
+            "rebuild the outputs when the inputs, the configuration, "
+            "or the templates change"
+        ),
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--watch-interval",
+        action="store",
+        type=float,
+        default=0.5,
+        required=False,
+        help="Seconds between two checks of the watched files",
     )
 
     parser.add_argument(
@@ -152,7 +376,7 @@ def create_parser():
     )
 
     parser.add_argument(
-        "--version", action="version", version=f"Mau version {__version__}"
+        "--version", action=VersionAction, help="show the version and exit"
     )
 
     return parser
@@ -164,33 +388,239 @@ def setup_logging(loglevel):
         level=loglevel, stream=sys.stdout, format=logformat, datefmt="%Y-%m-%d %H:%M:%S"
     )
 
+    # Detailed tracebacks are useful only when
+    # debugging, and Rich takes a long time
+    # to import.
+    if loglevel == logging.DEBUG:
+        from rich.traceback import install
 
-def main():
-    ###############################################
-    # INITIAL SETUP
-    ###############################################
+        install(show_locals=True)
 
-    # Create the parser.
-    argparser = create_parser()
 
-    # Get arguments and logging set up.
-    args = argparser.parse_args()
-    setup_logging(args.loglevel)
+def select_visitor(argparser, output_format: str) -> Type["BaseVisitor"]:
+    from mau import available_visitors, load_visitor
 
-    # Initialise the message handler.
-    message_handler = LogMessageHandler(logger)
+    # Import only the selected visitor.
+    visitor_class = load_visitor(output_format)
 
-    ###############################################
-    # CONFIGURATION
-    ###############################################
+    if visitor_class is None:
+        choices = ", ".join(repr(name) for name in available_visitors())
+        argparser.error(
+            f"argument -t/--visitor: invalid choice: {output_format!r} "
+            f"(choose from {choices})"
+        )
+
+    return visitor_class
+
+
+def warm_templates_cache(argparser, args, message_handler, environment):
+    from mau.message import MauException
+
+    if not args.output_format:
+        argparser.error("the option -t/--visitor is required to warm the cache")
+
+    if not environment.get("mau.visitor.templates.cache_dir"):
+        argparser.error(
+            "the option --templates-cache-dir is required to warm the cache"
+        )
+
+    visitor_class = select_visitor(argparser, args.output_format)
+
+    # Only visitors based on templates
+    # can compile them in advance.
+    if not hasattr(visitor_class, "compile_templates"):
+        argparser.error(f"visitor {args.output_format} does not use templates")
+
+    try:
+        visitor = visitor_class(message_handler, environment)
+        compiled = visitor.compile_templates()
+    except MauException as exc:
+        message_handler.process(exc.message)
+        sys.exit(1)
+
+    print(f"Compiled {compiled} templates")
+
+
+def process_batch(argparser, args, message_handler, environment):
+    from mau import Mau
+    from mau.batch import expand_inputs
+
+    if not args.output_format:
+        argparser.error("the option -t/--visitor is required with multiple inputs")
+
+    patterns = list(args.inputs or [])
+    if args.input_file:
+        patterns.insert(0, args.input_file)
+
+    try:
+        inputs = expand_inputs(patterns, args.manifest)
+    except OSError as exc:
+        argparser.error(f"cannot read the manifest: {exc.strerror}")
+
+    # The setup is done once
+    # and shared by all files.
+    mau = Mau(
+        message_handler=message_handler,
+        environment=environment,
+    )
+
+    results = mau.process_many(
+        select_visitor(argparser, args.output_format),
+        inputs,
+        output_dir=args.output_dir,
+        output_extension=args.output_extension,
+        jobs=args.jobs or 1,
+        build_manifest=args.build_manifest,
+        configuration_files=configuration_files(args),
+    )
+
+    failed = [result for result in results if not result.success]
+    skipped = [result for result in results if result.skipped]
+
+    for result in failed:
+        logger.error("%s: %s", result.source_filename, result.error)
+
+    logger.info(
+        "Processed %d files, %d failed, %d up to date",
+        len(results),
+        len(failed),
+        len(skipped),
+    )
+
+    if failed:
+        sys.exit(1)
+
+
+def process_watch(argparser, args, message_handler):
+    from mau.batch import common_directory, expand_inputs, output_filename_for
+    from mau.watch import WatchBuilder
+
+    if not args.output_format:
+        argparser.error("the option -t/--visitor is required with --watch")
+
+    visitor_class = select_visitor(argparser, args.output_format)
+
+    if args.inputs or args.manifest:
+        patterns = list(args.inputs or [])
+        if args.input_file:
+            patterns.insert(0, args.input_file)
+
+        try:
+            inputs = expand_inputs(patterns, args.manifest)
+        except OSError as exc:
+            argparser.error(f"cannot read the manifest: {exc.strerror}")
+
+        output_extension = args.output_extension
+        if output_extension is None:
+            output_extension = visitor_class.extension
+        base_dir = common_directory(inputs)
+
+        jobs = [
+            (
+                source,
+                output_filename_for(
+                    source, output_extension, args.output_dir, base_dir
+                ),
+            )
+            for source in inputs
+        ]
+    elif args.input_file:
+        output_file = args.output_file or args.input_file.replace(
+            ".mau", f".{visitor_class.extension}"
+        )
+
+        if output_file == "-":
+            argparser.error("the option --watch requires an output file")
+
+        jobs = [(args.input_file, output_file)]
+    else:
+        argparser.error("the following arguments are required: -i/--input-file")
+
+    # Changes in the configuration and in the
+    # environment files rebuild the environment.
+    builder = WatchBuilder(
+        visitor_class,
+        message_handler,
+        lambda: create_environment(args),
+        jobs,
+        configuration_files(args),
+    )
+
+    logger.info("Watching %d files, press Ctrl-C to stop", len(jobs))
+
+    try:
+        builder.run(interval=args.watch_interval)
+    except KeyboardInterrupt:
+        pass
+
+
+def process_single_file(argparser, args, message_handler, environment):
+    from mau.batch import process_file
+
+    if not args.output_format:
+        argparser.error("the option -t/--visitor is required with --build-manifest")
+
+    visitor_class = select_visitor(argparser, args.output_format)
+
+    output_file = args.output_file or args.input_file.replace(
+        ".mau", f".{visitor_class.extension}"
+    )
+
+    if output_file == "-":
+        argparser.error("the option --build-manifest requires an output file")
+
+    result = process_file(
+        visitor_class,
+        message_handler,
+        environment,
+        args.input_file,
+        output_file,
+        build_manifest=True,
+        configuration_files=configuration_files(args),
+    )
+
+    if not result.success:
+        logger.error("%s: %s", result.source_filename, result.error)
+        sys.exit(1)
+
+    if result.skipped:
+        logger.info("%s is up to date", output_file)
+
+
+def configuration_files(args) -> list[str]:
+    # The files that contain the configuration
+    # and the environment given on the command line.
+    files = [
+        environment_file.split("=")[-1]
+        for environment_file in args.environment_file or []
+    ]
+
+    if args.config_file:
+        files.append(args.config_file)
+
+    return files
+
+
+def create_environment(args):
+    from mau import (
+        BASE_NAMESPACE,
+        ConfigurationError,
+        load_environment_files,
+        load_environment_variables,
+    )
+    from mau.environment.environment import Environment
+    from mau.environment.files import load_data_file
 
     # Load the YAML configuration file into a dictionary.
     # All values in the configuration file are loaded
     # under the hard coded Mau base namespace.
+    # The parsed file is cached (see `load_data_file`).
     config = {}
     if args.config_file:
-        with open(args.config_file, "r", encoding="utf-8") as config_file:
-            config = yaml.safe_load(config_file)
+        try:
+            config = load_data_file(args.config_file) or {}
+        except Exception as exc:
+            raise ConfigurationError(f"Error processing {args.config_file}") from exc
 
     # Build the inital environment.
     environment = Environment.from_dict(config, BASE_NAMESPACE)
@@ -215,6 +645,112 @@ def main():
         namespace=args.environment_variables_namespace,
     )
 
+    # Store compiled templates in the given directory.
+    if args.templates_cache_dir:
+        environment["mau.visitor.templates.cache_dir"] = args.templates_cache_dir
+
+    # Store rendered nodes in the given directory.
+    if args.render_cache_dir:
+        environment["mau.visitor.render_cache.path"] = args.render_cache_dir
+
+    # The user doesn't want to use
+    # the cache of rendered nodes.
+    if args.no_render_cache:
+        environment["mau.visitor.render_cache.enabled"] = False
+
+    # Highlight source blocks before rendering.
+    if args.highlight:
+        environment["mau.visitor.highlight.enabled"] = True
+
+    # Store highlighted code in the given directory.
+    if args.highlight_cache_dir:
+        environment["mau.visitor.highlight.cache.path"] = args.highlight_cache_dir
+
+    # Highlight source blocks with multiple processes.
+    if args.highlight_jobs:
+        environment["mau.visitor.highlight.jobs"] = args.highlight_jobs
+
+    # Store parsed documents in the given directory.
+    if args.parse_cache_dir:
+        environment["mau.parser.cache.path"] = args.parse_cache_dir
+
+    # The user doesn't want to use
+    # the cache of parsed documents.
+    if args.no_parse_cache:
+        environment["mau.parser.cache.enabled"] = False
+
+    # Parse included files with multiple processes.
+    if args.include_jobs:
+        environment["mau.parser.include_jobs"] = args.include_jobs
+
+    # Render the document with multiple processes.
+    if args.jobs:
+        environment["mau.visitor.jobs"] = args.jobs
+
+    # Make the output of data visitors smaller.
+    if args.strip_parent:
+        environment["mau.visitor.strip_parent"] = True
+
+    if args.intern_contexts:
+        environment["mau.visitor.intern_contexts"] = True
+
+    return environment
+
+
+def main():
+    ###############################################
+    # INITIAL SETUP
+    ###############################################
+
+    # Create the parser.
+    argparser = create_parser()
+
+    # Get arguments and logging set up.
+    args = argparser.parse_args()
+    setup_logging(args.loglevel)
+
+    from mau import Mau
+    from mau.lexers.base_lexer import print_tokens
+    from mau.message import LogMessageHandler, MauException
+
+    # Initialise the message handler.
+    message_handler = LogMessageHandler(logger)
+
+    ###############################################
+    # CONFIGURATION
+    ###############################################
+
+    environment = create_environment(args)
+
+    # The user wants us to compile the templates
+    # into the cache without processing any input.
+    if args.warm_templates_cache:
+        warm_templates_cache(argparser, args, message_handler, environment)
+        sys.exit(0)
+
+    # Keep running and rebuild the
+    # outputs when the sources change.
+    if args.watch:
+        process_watch(argparser, args, message_handler)
+        sys.exit(0)
+
+    # Multiple inputs are processed
+    # in a single run.
+    if args.inputs or args.manifest:
+        process_batch(argparser, args, message_handler, environment)
+        sys.exit(0)
+
+    if not args.input_file:
+        argparser.error("the following arguments are required: -i/--input-file")
+
+    # The build manifest skips the whole
+    # process if the output is up to date.
+    if args.build_manifest and not (
+        args.stream or args.lexer_print_output or args.lexer_only
+    ):
+        process_single_file(argparser, args, message_handler, environment)
+        sys.exit(0)
+
     # Read the input file
     with open(args.input_file, "r", encoding="utf-8") as input_file:
         text = input_file.read()
@@ -226,36 +762,43 @@ def main():
         environment=environment,
     )
 
-    # Initialise the Text Buffer.
-    text_buffer = mau.init_text_buffer(text, args.input_file)
-
     ###############################################
     # LEXER
     ###############################################
 
-    # Run the lexer.
-    try:
-        lexer = mau.run_lexer(text_buffer)
-    except MauException:
-        sys.exit(1)
+    # The user wants to see the tokens, so
+    # the lexer runs on its own.
+    if args.lexer_print_output or args.lexer_only:
+        # Initialise the Text Buffer.
+        text_buffer = mau.init_text_buffer(text, args.input_file)
 
-    # The user wants us print the resulting tokens.
-    if args.lexer_print_output:
-        # Print the tokens collected by the lexer.
-        print_tokens(lexer.tokens)
+        # Run the lexer.
+        try:
+            lexer = mau.run_lexer(text_buffer)
+        except MauException:
+            sys.exit(1)
 
-    # The user wants us to run the lexer only.
-    if args.lexer_only:
-        print("Mau stopped after the lexing step as requested")
-        sys.exit(0)
+        # The user wants us print the resulting tokens.
+        if args.lexer_print_output:
+            # Print the tokens collected by the lexer.
+            print_tokens(lexer.tokens)
+
+        # The user wants us to run the lexer only.
+        if args.lexer_only:
+            print("Mau stopped after the lexing step as requested")
+            sys.exit(0)
 
     ###############################################
     # PARSER
     ###############################################
 
-    # Run the parser.
+    # Lex and parse the text. The parsed
+    # document might come from the cache.
     try:
-        parser = mau.run_parser(lexer.tokens)
+        if args.lexer_print_output:
+            parser = mau.run_parser(lexer.tokens)
+        else:
+            parser = mau.run_lexer_and_parser(text, args.input_file)
     except MauException:
         sys.exit(1)
 
@@ -271,23 +814,34 @@ def main():
 
     # Select the visitor according
     # to the required output format.
-    visitor_class = visitors[args.output_format]
+    visitor_class = select_visitor(argparser, args.output_format)
 
     # Get the main output node
     # from the parser.
     document = parser.output.document
 
+    # Find out the name of the output file
+    output_file = args.output_file or args.input_file.replace(
+        ".mau", f".{visitor_class.extension}"
+    )
+
+    # Write the output while it is rendered.
+    if args.stream:
+        try:
+            write_output_stream(
+                mau.run_visitor_iter(visitor_class, document), output_file
+            )
+        except MauException:
+            sys.exit(1)
+
+        return
+
     try:
         # Process the node.
         rendered = mau.run_visitor(visitor_class, document)
     except MauException:
         sys.exit(1)
 
-    # Find out the name of the output file
-    output_file = args.output_file or args.input_file.replace(
-        ".mau", f".{visitor_class.extension}"
-    )
-
     # Write the rendered text to
     # the selected output file.
     write_output(rendered, output_file)
@@ -1,12 +1,10 @@
-from importlib import metadata
+from collections.abc import Iterator, Sequence
+from importlib import import_module
 from pathlib import Path
-from typing import Type
-
-import yaml
-
-__version__ = metadata.version("mau")
 
+from mau.entry_points import discover_entry_points, load_entry_point
 from mau.environment.environment import Environment
+from mau.environment.files import data_file_signature, load_data_file
 from mau.lexers.document_lexer import DocumentLexer
 from mau.message import BaseMessageHandler, MauException
 from mau.nodes.node import Node
@@ -14,8 +12,6 @@ from mau.parsers.document_parser import DocumentParser
 from mau.text_buffer import TextBuffer
 from mau.token import Token
 from mau.visitors.base_visitor import BaseVisitor
-from mau.visitors.jinja_visitor import JinjaVisitor
-from mau.visitors.yaml_visitor import YamlVisitor
 
 # This is the base namespace used by
 # the configuration, by variables defined
@@ -35,49 +31,137 @@ DEFAULT_ENVIRONMENT_FILES_NAMESPACE = "envfiles"
 # to the base namespace).
 DEFAULT_ENVIRONMENT_VARIABLES_NAMESPACE = "envvars"
 
+# The visitors defined in this codebase,
+# by name, with the module that defines
+# them. Modules are imported only when
+# a visitor is used, as some of them
+# depend on big packages (e.g. Jinja).
+CORE_VISITORS = {
+    "core:YamlVisitor": ("mau.visitors.yaml_visitor", "YamlVisitor"),
+    "core:JinjaVisitor": ("mau.visitors.jinja_visitor", "JinjaVisitor"),
+    "core:HtmlVisitor": ("mau.visitors.html_visitor", "HtmlVisitor"),
+    "core:JsonVisitor": ("mau.visitors.json_visitor", "JsonVisitor"),
+    "core:BinaryVisitor": ("mau.visitors.binary_visitor", "BinaryVisitor"),
+}
+
+
+def __getattr__(name: str):
+    # Attributes of the package that
+    # are expensive to compute or to
+    # import are created when used.
+    if name == "__version__":
+        from importlib import metadata
+
+        version = metadata.version("mau")
+        globals()["__version__"] = version
+
+        return version
+
+    for module_name, class_name in CORE_VISITORS.values():
+        if name == class_name:
+            return getattr(import_module(module_name), class_name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 class ConfigurationError(ValueError):
     """Used to signal an error in the configuration"""
 
 
+def available_visitors() -> list[str]:  # pragma: no cover
+    """Return the names of all the visitors
+    without importing them."""
+
+    return [value for _, value in discover_entry_points("mau.visitors")] + list(
+        CORE_VISITORS
+    )
+
+
+def load_visitor(name: str) -> type[BaseVisitor] | None:
+    """Import and return the visitor with the given
+    name, or None if there is no such visitor. Only
+    the module of the selected visitor is imported."""
+
+    try:
+        module_name, class_name = CORE_VISITORS[name]
+    except KeyError:
+        pass
+    else:
+        return getattr(import_module(module_name), class_name)
+
+    for _, value in discover_entry_points("mau.visitors"):  # pragma: no cover
+        if value == name:
+            return load_entry_point(value)
+
+    return None  # pragma: no cover
+
+
 def load_visitors():  # pragma: no cover
     """
     This function loads all the visitors belonging to
     the group "mau.visitors". This code has been isolated
     in a function to allow visitor modules to import the
     Mau package without running into circula imports.
+    This imports all visitors, use `load_visitor` to
+    import only one of them.
     """
 
-    import sys
-
-    if sys.version_info < (3, 10):
-        from importlib_metadata import entry_points
-    else:
-        from importlib.metadata import entry_points
-
-    # Load all packages that register
-    # themselves under the group
-    # `mau.visitors`.
-    discovered_plugins = entry_points(group="mau.visitors")
-
     # Load the available visitors.
-    visitors = {i.value: i.load() for i in discovered_plugins}
+    visitors = {
+        value: load_entry_point(value)
+        for _, value in discover_entry_points("mau.visitors")
+    }
 
     # addg the visitors defined
     # in this codebase.
-    visitors["core:YamlVisitor"] = YamlVisitor
-    visitors["core:JinjaVisitor"] = JinjaVisitor
+    for name in CORE_VISITORS:
+        visitors[name] = load_visitor(name)
 
     return visitors
 
 
+class EnvironmentFile:
+    """A YAML or JSON file loaded into an
+    environment the first time one of its
+    values is needed (see `Environment.add_lazy`)."""
+
+    __slots__ = ("cache", "filename", "signature")
+
+    def __init__(self, filename: str, path: Path, cache: bool = True):
+        # The name given by the user,
+        # used to report errors.
+        self.filename = filename
+        self.cache = cache
+
+        try:
+            # The file is checked now, so that
+            # a wrong path is reported before
+            # processing the documents.
+            self.signature = data_file_signature(path)
+        except OSError as exc:
+            raise ConfigurationError(f"Error processing {filename}") from exc
+
+    def load(self):
+        try:
+            return load_data_file(self.signature[0], self.cache)
+        except Exception as exc:
+            raise ConfigurationError(f"Error processing {self.filename}") from exc
+
+
 def load_environment_files(
     environment: Environment,
     files: list[str],
     namespace: str | None = None,
+    lazy: bool = True,
+    cache: bool = True,
 ):
-    """Load YAML files into dictionaries and
-    convert them into an environment."""
+    """Load YAML or JSON files into dictionaries and
+    convert them into an environment.
+
+    If `lazy` is True each file is loaded the first time
+    one of its values is read from the environment.
+    If `cache` is True the parsed files are stored
+    in the user cache (see `load_data_file`)."""
 
     # Set the namespace or use the default one.
     namespace = namespace or DEFAULT_ENVIRONMENT_FILES_NAMESPACE
@@ -85,10 +169,6 @@ def load_environment_files(
     # Add the base namespace as a prefix.
     namespace = f"{BASE_NAMESPACE}.{namespace}"
 
-    # Create a flat dictionary that will
-    # contain all the environment files.
-    flat_environment_files: dict[str, str] = {}
-
     for filename in files:
         # Files can be specified as `PATH` or as `KEY=PATH`.
         # If the key is specified the file content is stored under
@@ -116,16 +196,12 @@ def load_environment_files(
             # file without extension.
             key = filepath.stem
 
-        try:
-            # Assume this is YAML.
-            with filepath.open("r", encoding="utf-8") as f:
-                content = yaml.safe_load(f)
-                flat_environment_files[key] = content
-        except Exception as exc:
-            raise ConfigurationError(f"Error processing {filename}") from exc
+        environment_file = EnvironmentFile(filename, filepath, cache)
 
-    if flat_environment_files:
-        environment.dupdate(flat_environment_files, namespace)
+        if lazy:
+            environment.add_lazy(f"{namespace}.{key}", environment_file)
+        else:
+            environment.dupdate({key: environment_file.load()}, namespace)
 
 
 def load_environment_variables(
@@ -202,7 +278,24 @@ class Mau:  # pragma: no cover
 
         return parser
 
-    def run_visitor(self, visitor_class: Type, node: Node | None) -> dict:
+    def run_lexer_and_parser(self, text: str, source_filename: str) -> DocumentParser:
+        # Lex and parse the text in one step, which
+        # allows the parser to use the parse cache
+        # (`mau.parser.cache.path`) and skip both.
+        try:
+            parser = DocumentParser.lex_and_parse(
+                text,
+                self.message_handler,
+                self.environment,
+                source_filename=source_filename,
+            )
+        except MauException as exc:
+            self.message_handler.process(exc.message)
+            raise
+
+        return parser
+
+    def run_visitor(self, visitor_class: type, node: Node | None) -> dict:
         # Initialise the visitor with the
         # current environment.
         try:
@@ -214,20 +307,42 @@ class Mau:  # pragma: no cover
             self.message_handler.process(exc.message)
             raise
 
-    def process(
+    def run_visitor_iter(self, visitor_class: type, node: Node | None) -> Iterator:
+        # Initialise the visitor with the
+        # current environment.
+        try:
+            visitor = visitor_class(self.message_handler, self.environment)
+
+            # Visit the given node and all its children,
+            # yielding the output in chunks.
+            yield from visitor.process_iter(node)
+        except MauException as exc:
+            self.message_handler.process(exc.message)
+            raise
+
+    def process_iter(
         self,
-        visitor_class: Type[BaseVisitor],
+        visitor_class: type[BaseVisitor],
         text: str,
         source_filename: str,
-    ):
-        # The text buffer that manages the input file.
-        text_buffer = self.init_text_buffer(text, source_filename)
+    ) -> Iterator:
+        # This is the streaming version of `process`.
 
-        # Run the lexer on the text buffer.
-        lexer = self.run_lexer(text_buffer)
+        # Lex and parse the text.
+        parser = self.run_lexer_and_parser(text, source_filename)
 
-        # Parse the lexer tokens.
-        parser = self.run_parser(lexer.tokens)
+        # Run the selected visitor and
+        # yield the output in chunks.
+        yield from self.run_visitor_iter(visitor_class, parser.output.document)
+
+    def process(
+        self,
+        visitor_class: type[BaseVisitor],
+        text: str,
+        source_filename: str,
+    ):
+        # Lex and parse the text.
+        parser = self.run_lexer_and_parser(text, source_filename)
 
         # Get the main node from the parser.
         document = parser.output.document
@@ -236,3 +351,56 @@ class Mau:  # pragma: no cover
         rendered = self.run_visitor(visitor_class, document)
 
         return rendered
+
+    def process_many(
+        self,
+        visitor_class: type[BaseVisitor],
+        source_filenames: Sequence[str],
+        output_dir: str | None = None,
+        output_extension: str | None = None,
+        jobs: int = 1,
+        write: bool = True,
+        build_manifest: bool = False,
+        configuration_files: Sequence[str] = (),
+    ) -> list:
+        # Process multiple files with the same
+        # configuration, using `jobs` worker
+        # processes. Each file is processed with
+        # a copy of the current environment.
+        # If `write` is True, the output of each
+        # file is written in `output_dir` (or next
+        # to the source), otherwise it is returned
+        # in the results. The output directory
+        # mirrors the structure of the directory
+        # that contains all the sources.
+        # If `build_manifest` is True, outputs that
+        # are up to date are not built again
+        # (see mau.build_manifest).
+        from mau.batch import common_directory, output_filename_for, process_files
+
+        if output_extension is None:
+            output_extension = visitor_class.extension
+
+        base_dir = common_directory(source_filenames)
+
+        batch_jobs = [
+            (
+                source_filename,
+                output_filename_for(
+                    source_filename, output_extension, output_dir, base_dir
+                )
+                if write
+                else None,
+            )
+            for source_filename in source_filenames
+        ]
+
+        return process_files(
+            visitor_class,
+            self.message_handler,
+            self.environment,
+            batch_jobs,
+            workers=jobs,
+            build_manifest=build_manifest,
+            configuration_files=configuration_files,
+        )
@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+import glob
+import os
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from mau import ConfigurationError, Mau
+from mau.build_manifest import build_key, is_up_to_date, write_build_manifest
+from mau.environment.environment import Environment
+from mau.message import BaseMessageHandler, MauException
+from mau.parsers.document_parser import DocumentParser
+from mau.parsers.parse_cache import ParseRecorder, get_parse_cache
+from mau.visitors.base_visitor import BaseVisitor
+
+
+@dataclass
+class BatchResult:
+    # The result of processing
+    # a single file in a batch.
+    source_filename: str
+
+    # The file where the output has been
+    # written, if any. Otherwise, the
+    # output is stored in `output`.
+    output_filename: str | None = None
+    output: str | bytes | None = None
+
+    # The text of the error that stopped
+    # the processing of the file, if any.
+    # The message itself has already been
+    # sent to the message handler.
+    error: str | None = None
+
+    # True if the output was up to date
+    # according to its build manifest and
+    # the file has not been processed.
+    skipped: bool = False
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+def processing_errors() -> tuple[type[Exception], ...]:
+    """Return the errors, apart from MauException, that
+    stop the processing of a single file but not the
+    whole batch: errors in the encoding of the files,
+    in the file system, in the configuration, and
+    in the templates."""
+
+    # Imported here as visitors that don't
+    # use templates don't need Jinja.
+    from jinja2 import TemplateError
+
+    return (OSError, UnicodeError, ConfigurationError, TemplateError)
+
+
+def error_text(exc: Exception) -> str:
+    # The text of an error that
+    # is not a MauException.
+    return f"{type(exc).__name__}: {exc}"
+
+
+def expand_inputs(
+    patterns: Iterable[str],
+    manifest: str | None = None,
+) -> list[str]:
+    """Return the list of input files matched by
+    the given glob patterns and listed in the
+    manifest, a text file with one pattern per
+    line (empty lines and lines starting with `#`
+    are ignored). Files are returned in the order
+    they are found, without duplicates."""
+
+    patterns = list(patterns)
+
+    if manifest:
+        with open(manifest, encoding="utf-8") as manifest_file:
+            for line in manifest_file:
+                line = line.strip()
+
+                if line and not line.startswith("#"):
+                    patterns.append(line)
+
+    inputs: dict[str, None] = {}
+
+    for pattern in patterns:
+        # Patterns that don't match anything
+        # are kept, so that the missing file
+        # is reported as an error.
+        matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+
+        for match in matches:
+            inputs[match] = None
+
+    return list(inputs)
+
+
+def common_directory(source_filenames: Sequence[str]) -> str:
+    """Return the deepest directory that
+    contains all the given files."""
+
+    if not source_filenames:
+        return os.getcwd()
+
+    return os.path.commonpath(
+        [os.path.dirname(os.path.abspath(i)) for i in source_filenames]
+    )
+
+
+def output_filename_for(
+    source_filename: str,
+    extension: str,
+    output_dir: str | None = None,
+    base_dir: str | None = None,
+) -> str:
+    """Return the name of the output file of the
+    given source. Without an output directory the
+    output is written next to the source. Otherwise,
+    the path of the source relative to `base_dir`
+    (by default the directory of the source) is
+    recreated in the output directory."""
+
+    extension = f".{extension.lstrip('.')}" if extension else ""
+    source = Path(source_filename)
+
+    if output_dir is None:
+        return source.with_suffix(extension).as_posix()
+
+    relative = Path(source.name)
+    if base_dir is not None:
+        relative = Path(os.path.relpath(os.path.abspath(source), base_dir))
+
+    return (Path(output_dir) / relative).with_suffix(extension).as_posix()
+
+
+def _file_contains(filename: str, content: str | bytes) -> bool:
+    # True if the file exists and
+    # contains exactly the given content.
+    try:
+        if isinstance(content, bytes):
+            if os.path.getsize(filename) != len(content):
+                return False
+
+            with open(filename, "rb") as existing_file:
+                return existing_file.read() == content
+
+        with open(filename, encoding="utf-8") as existing_file:
+            return existing_file.read() == content
+    except (OSError, UnicodeDecodeError):
+        return False
+
+
+def write_output_file(
+    output: str | bytes, output_filename: str, if_changed: bool = False
+) -> bool:
+    # Write the output of a visitor,
+    # creating the directories if needed.
+    # If `if_changed` is True, a file that
+    # already contains the output is not
+    # written again, so that its modification
+    # time doesn't change. Return True if
+    # the file has been written.
+    if isinstance(output, str):
+        output = f"{output}\n"
+
+    if if_changed and _file_contains(output_filename, output):
+        return False
+
+    Path(output_filename).parent.mkdir(parents=True, exist_ok=True)
+
+    if isinstance(output, bytes):
+        with open(output_filename, "wb") as output_file:
+            output_file.write(output)
+
+        return True
+
+    with open(output_filename, "w", encoding="utf-8") as output_file:
+        output_file.write(output)
+
+    return True
+
+
+def process_text(
+    visitor_class: type[BaseVisitor],
+    message_handler: BaseMessageHandler,
+    environment: Environment,
+    text: str,
+    source_filename: str,
+    dependencies: set[str] | None = None,
+    include_memo: dict | None = None,
+):
+    """Lex, parse, and render the text like `Mau.process`.
+    The absolute paths of the files the output depends
+    on (the source, the included files, and the other
+    files read while parsing) are added to `dependencies`.
+    The `include_memo` can be shared by multiple calls
+    to reuse the included files that didn't change."""
+
+    if dependencies is None:
+        dependencies = set()
+
+    dependencies.add(os.path.abspath(source_filename))
+
+    # The recorder collects the files
+    # read while parsing the source.
+    recorder = ParseRecorder()
+    environment.recorder = recorder
+
+    try:
+        parser = DocumentParser.lex_and_parse(
+            text,
+            message_handler,
+            environment,
+            source_filename=source_filename,
+            include_memo=include_memo,
+        )
+    except MauException as exc:
+        message_handler.process(exc.message)
+        raise
+    finally:
+        environment.recorder = None
+
+        dependencies.update(os.path.abspath(i) for i in recorder.files)
+
+    dependencies.update(
+        os.path.abspath(call.callee_uri) for call in parser.output.include_calls
+    )
+
+    # The parse cache is pruned at the end of
+    # the parse only if nothing is recording it.
+    if (parse_cache := get_parse_cache(environment)) is not None:
+        parse_cache.prune()
+
+    return Mau(message_handler, environment).run_visitor(
+        visitor_class, parser.output.document
+    )
+
+
+def process_file(
+    visitor_class: type[BaseVisitor],
+    message_handler: BaseMessageHandler,
+    environment: Environment,
+    source_filename: str,
+    output_filename: str | None = None,
+    build_manifest: bool = False,
+    configuration_files: Sequence[str] = (),
+) -> BatchResult:
+    """Process a single file. Each file gets a copy
+    of the environment, so variables defined in a
+    document do not leak into the others.
+
+    If `build_manifest` is True a manifest is written
+    next to the output (see mau.build_manifest), and
+    the file is not processed at all if the manifest
+    shows that the output is up to date. The output
+    depends on the `configuration_files` as well."""
+
+    result = BatchResult(source_filename=source_filename)
+
+    # The manifest needs an output file.
+    build_manifest = build_manifest and output_filename is not None
+
+    if build_manifest:
+        key = build_key(visitor_class, environment)
+
+        if is_up_to_date(output_filename, key, environment):
+            result.output_filename = output_filename
+            result.skipped = True
+            return result
+
+    try:
+        with open(source_filename, encoding="utf-8") as source_file:
+            text = source_file.read()
+    except OSError as exc:
+        result.error = f"Cannot read file '{source_filename}': {exc.strerror}"
+        return result
+    except UnicodeDecodeError as exc:
+        result.error = f"Cannot decode file '{source_filename}': {exc.reason}"
+        return result
+
+    dependencies = {os.path.abspath(i) for i in configuration_files}
+
+    # Errors are stored in the result, so
+    # that the other files of a batch
+    # are processed anyway.
+    try:
+        output = process_text(
+            visitor_class,
+            message_handler,
+            Environment.from_environment(environment),
+            text,
+            source_filename,
+            dependencies,
+        )
+
+        if output_filename is not None:
+            # Files that didn't change are not written,
+            # so that their modification time is stable.
+            write_output_file(output, output_filename, if_changed=True)
+    except MauException as exc:
+        result.error = exc.message.text
+        return result
+    except processing_errors() as exc:
+        result.error = error_text(exc)
+        return result
+
+    if output_filename is None:
+        result.output = output
+        return result
+
+    result.output_filename = output_filename
+
+    if build_manifest:
+        write_build_manifest(output_filename, key, dependencies, environment)
+
+    return result
+
+
+# The state of a batch worker. The setup
+# is done once when the worker starts.
+_batch_worker_state: dict = {}
+
+
+def _init_batch_worker(
+    visitor_class: type[BaseVisitor],
+    message_handler: BaseMessageHandler,
+    environment: Environment,
+    options: dict,
+):
+    # Files are already processed in parallel, so
+    # parsers and visitors must not start another pool.
+    environment = Environment.from_environment(environment)
+    environment["mau.parser.include_jobs"] = 1
+    environment["mau.visitor.jobs"] = 1
+    environment["mau.visitor.highlight.jobs"] = 1
+
+    _batch_worker_state["visitor_class"] = visitor_class
+    _batch_worker_state["message_handler"] = message_handler
+    _batch_worker_state["environment"] = environment
+    _batch_worker_state["options"] = options
+
+
+def _batch_worker(job: tuple[str, str | None]) -> BatchResult:
+    source_filename, output_filename = job
+
+    return process_file(
+        _batch_worker_state["visitor_class"],
+        _batch_worker_state["message_handler"],
+        _batch_worker_state["environment"],
+        source_filename,
+        output_filename,
+        **_batch_worker_state["options"],
+    )
+
+
+def process_files(
+    visitor_class: type[BaseVisitor],
+    message_handler: BaseMessageHandler,
+    environment: Environment,
+    jobs: Sequence[tuple[str, str | None]],
+    workers: int = 1,
+    build_manifest: bool = False,
+    configuration_files: Sequence[str] = (),
+) -> list[BatchResult]:
+    """Process the given list of jobs, each one a pair
+    (source filename, output filename), with the given
+    number of worker processes. Results are returned in
+    the same order of the jobs. See `process_file` for
+    `build_manifest` and `configuration_files`."""
+
+    # The options passed to `process_file`.
+    options = {
+        "build_manifest": build_manifest,
+        "configuration_files": list(configuration_files),
+    }
+
+    if workers <= 1 or len(jobs) <= 1:
+        return [
+            process_file(
+                visitor_class, message_handler, environment, source, output, **options
+            )
+            for source, output in jobs
+        ]
+
+    # Create a visitor before starting the workers.
+    # Visitors cache expensive resources (like the
+    # templates of JinjaVisitor) at module level, and
+    # workers that are forked inherit them.
+    visitor_class(message_handler, Environment.from_environment(environment))
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(jobs)),
+        initializer=_init_batch_worker,
+        initargs=(visitor_class, message_handler, environment, options),
+    ) as executor:
+        return list(executor.map(_batch_worker, jobs))
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections.abc import Iterable
+from pathlib import Path
+
+from mau.cache import mau_version, stable_hash
+from mau.environment.environment import Environment
+from mau.visitors.base_visitor import BaseVisitor
+
+# The version of the format of the manifest.
+# Manifests with a different version are ignored.
+MANIFEST_FORMAT = 1
+
+# The configuration values that don't change the
+# output: the number of processes and the caches.
+IGNORED_KEYS = (
+    "mau.parser.include_jobs",
+    "mau.parser.cache",
+    "mau.visitor.jobs",
+    "mau.visitor.render_cache",
+    "mau.visitor.templates.cache_dir",
+    "mau.visitor.highlight.jobs",
+    "mau.visitor.highlight.cache",
+)
+
+
+def manifest_filename(output_filename: str) -> str:
+    """Return the name of the build manifest of the
+    given output, a hidden file in the same directory."""
+
+    path = Path(output_filename)
+
+    return path.with_name(f".{path.name}.mau-build.json").as_posix()
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _file_record(path: str) -> list | None:
+    # The modification time, the size, and the
+    # hash of a file, or None if it doesn't exist.
+    try:
+        stat = os.stat(path)
+        return [stat.st_mtime_ns, stat.st_size, file_hash(path)]
+    except OSError:
+        return None
+
+
+def _file_unchanged(path: str, record: list | None) -> bool:
+    # The hash is computed only if the modification
+    # time or the size of the file changed, so that
+    # checking unchanged files is cheap. Files that
+    # were only touched are still unchanged.
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return record is None
+
+    if record is None:
+        return False
+
+    mtime_ns, size, digest = record
+
+    if size != stat.st_size:
+        return False
+
+    if mtime_ns == stat.st_mtime_ns:
+        return True
+
+    try:
+        return file_hash(path) == digest
+    except OSError:  # pragma: no cover
+        return False
+
+
+def templates_files(environment: Environment) -> dict[str, list[str]]:
+    """Return the files contained in the template
+    directories (`mau.visitor.templates.paths`)."""
+
+    files = {}
+
+    for directory in environment.get("mau.visitor.templates.paths", []):
+        directory = os.path.abspath(directory)
+
+        files[directory] = sorted(
+            os.path.join(dirpath, filename)
+            for dirpath, _, filenames in os.walk(directory)
+            for filename in filenames
+        )
+
+    return files
+
+
+def build_key(visitor_class: type[BaseVisitor], environment: Environment) -> str:
+    """Return a hash of what the output depends on
+    apart from files: the Mau version, the visitor,
+    and the environment. Environment files that
+    are not loaded yet are in the manifest as files,
+    so only their namespace is considered here."""
+
+    variables = {
+        key: value
+        for key, value in environment.asflatdict(load=False).items()
+        if not any(
+            key == ignored or key.startswith(f"{ignored}.") for ignored in IGNORED_KEYS
+        )
+    }
+
+    return stable_hash(
+        "build",
+        mau_version(),
+        f"{visitor_class.__module__}.{visitor_class.__qualname__}",
+        variables,
+        sorted(environment.pending()),
+    )
+
+
+def write_build_manifest(
+    output_filename: str,
+    key: str,
+    dependencies: Iterable[str],
+    environment: Environment,
+):
+    """Write the manifest of the given output, that
+    records the key of the build (see `build_key`)
+    and the state of the output and of all the files
+    it depends on, including the templates."""
+
+    templates = templates_files(environment)
+
+    files = set(dependencies)
+    for template_files in templates.values():
+        files.update(template_files)
+
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "key": key,
+        "output": _file_record(output_filename),
+        "files": {path: _file_record(path) for path in sorted(files)},
+        "templates": templates,
+    }
+
+    # The manifest is written atomically, so that
+    # an interrupted build doesn't leave a manifest
+    # that can't be read.
+    filename = manifest_filename(output_filename)
+    temp_filename = f"{filename}.tmp"
+
+    with open(temp_filename, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=1)
+
+    os.replace(temp_filename, filename)
+
+
+def is_up_to_date(output_filename: str, key: str, environment: Environment) -> bool:
+    """Return True if the manifest of the output
+    shows that building it again with the given
+    key would produce the same output."""
+
+    try:
+        with open(manifest_filename(output_filename), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    if manifest.get("format") != MANIFEST_FORMAT or manifest.get("key") != key:
+        return False
+
+    # The output might have been
+    # changed or removed by someone else.
+    if manifest["output"] is None or not _file_unchanged(
+        output_filename, manifest["output"]
+    ):
+        return False
+
+    # Adding or removing a template
+    # changes the template set.
+    if manifest["templates"] != templates_files(environment):
+        return False
+
+    return all(
+        _file_unchanged(path, record) for path, record in manifest["files"].items()
+    )
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import gc
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from collections.abc import Sequence
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+
+
+def user_cache_dir() -> Path:
+    """Return the directory where Mau stores
+    the caches that belong to the user. It can
+    be changed with the variable MAU_CACHE_DIR."""
+
+    if directory := os.environ.get("MAU_CACHE_DIR"):
+        return Path(directory)
+
+    if sys.platform == "win32":  # pragma: no cover
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    elif sys.platform == "darwin":  # pragma: no cover
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+
+    return Path(base) / "mau"
+
+
+@lru_cache(maxsize=1)
+def mau_version() -> str:
+    # Imported here as reading the
+    # metadata is slow to import.
+    from importlib import metadata
+
+    try:
+        return metadata.version("mau")
+    except metadata.PackageNotFoundError:  # pragma: no cover
+        return "unknown"
+
+
+# The exceptions raised when unpickling
+# corrupted or incompatible data.
+UNPICKLING_ERRORS = (
+    pickle.UnpicklingError,
+    AttributeError,
+    EOFError,
+    ImportError,
+    IndexError,
+    TypeError,
+    ValueError,
+)
+
+
+def load_pickle(data: bytes):
+    # Loading a tree creates a lot of objects, which
+    # triggers the garbage collector many times for
+    # nothing. Disabling it makes loading much faster.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        return pickle.loads(data)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+class DiskCache:
+    """A persistent key-value store on the file system.
+
+    Each entry is a file whose name is the key. Writes are
+    atomic, so concurrent processes can share the same
+    directory. The total size of the entries is bounded:
+    when it grows beyond the maximum, `prune` removes the
+    least recently used entries first. Reading an entry
+    updates its modification time, which is used to
+    measure recency.
+    """
+
+    def __init__(self, directory: str | Path, max_size: int = 256 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # The maximum size of the
+        # cache content in bytes.
+        self.max_size = max_size
+
+    def _path(self, key: str) -> Path:
+        # Entries are spread in subdirectories
+        # to keep directory listings short.
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+
+        try:
+            value = path.read_bytes()
+        except OSError:
+            return None
+
+        # Mark the entry as recently used.
+        try:
+            os.utime(path)
+        except OSError:  # pragma: no cover
+            pass
+
+        return value
+
+    def set(self, key: str, value: bytes):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write a temporary file and move it
+        # in place, so that readers never
+        # see a partially written entry.
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(value)
+
+            os.replace(temp_path, path)
+        except BaseException:  # pragma: no cover
+            os.unlink(temp_path)
+            raise
+
+    def prune(self) -> int:
+        # Remove the least recently used entries
+        # until the cache fits its maximum size.
+        # Return the number of removed entries.
+        entries = []
+        total_size = 0
+
+        for path in self.directory.glob("*/*"):
+            if path.name.startswith(".tmp"):
+                continue
+
+            try:
+                stat = path.stat()
+            except OSError:  # pragma: no cover
+                continue
+
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total_size += stat.st_size
+
+        removed = 0
+
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+
+            try:
+                path.unlink()
+            except OSError:  # pragma: no cover
+                continue
+
+            total_size -= size
+            removed += 1
+
+        return removed
+
+
+def stable_hash(*values, skip_attributes: Sequence[str] = ("parent",)) -> str:
+    """Return a hash of the given values that doesn't
+    change between runs of the interpreter.
+
+    Values can be strings, numbers, booleans, None,
+    lists, tuples, sets, dictionaries, enums, and objects,
+    whose attributes are hashed recursively. Attributes
+    listed in `skip_attributes` are ignored (by default
+    `parent`, which points up the tree). Objects referenced
+    more than once are hashed only the first time.
+    Dictionaries and attributes are hashed in insertion
+    order, so equal values built in a different order
+    might have different hashes."""
+
+    # The hash is computed on a list of strings
+    # joined at the end, which is much faster
+    # than updating the digest for each value.
+    parts: list[str] = []
+    append = parts.append
+    seen: dict[int, int] = {}
+
+    def _update(value):
+        cls = type(value)
+
+        # Fast paths for the most common types.
+        # Strings are prefixed by their length
+        # so that the separator can't be forged.
+        if cls is str:
+            append("s")
+            append(str(len(value)))
+            append(value)
+            return
+
+        if value is None or cls in (int, float, bool):
+            append(repr(value))
+            return
+
+        if cls is list or cls is tuple:
+            append("l")
+            append(str(len(value)))
+
+            for item in value:
+                _update(item)
+
+            return
+
+        if cls is dict:
+            append("d")
+            append(str(len(value)))
+
+            for key, item in value.items():
+                _update(key)
+                _update(item)
+
+            return
+
+        if isinstance(value, (str, int, float, bytes)):
+            append(f"{cls.__name__}:{value!r}")
+            return
+
+        if isinstance(value, Enum):
+            append(f"enum:{value!r}")
+            return
+
+        if isinstance(value, type) or callable(value):
+            append(f"callable:{value.__module__}.{value.__qualname__}")
+            return
+
+        if isinstance(value, (set, frozenset)):
+            append(f"set:{sorted(map(repr, value))}")
+            return
+
+        if id(value) in seen:
+            append(f"ref:{seen[id(value)]}")
+            return
+
+        seen[id(value)] = len(seen)
+
+        # Subclasses of containers are
+        # hashed as plain containers.
+        if isinstance(value, dict):
+            _update(dict(value))
+            return
+
+        if isinstance(value, (list, tuple)):
+            _update(list(value))
+            return
+
+        # Any other object is hashed through
+        # its class and its attributes.
+        append(f"obj:{cls.__module__}.{cls.__qualname__}")
+
+        try:
+            attributes = vars(value)
+        except TypeError:
+            attributes = {
+                name: getattr(value, name)
+                for name in getattr(cls, "__slots__", ())
+                if hasattr(value, name)
+            }
+
+            if not attributes:
+                # Objects without attributes.
+                append(repr(value))
+                return
+
+        for key, item in attributes.items():
+            if key in skip_attributes:
+                continue
+
+            append(key)
+            _update(item)
+
+    for value in values:
+        _update(value)
+
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+from functools import lru_cache
+from importlib import import_module
+
+from mau.cache import DiskCache, stable_hash, user_cache_dir
+
+# The groups of entry points used by Mau.
+ENTRY_POINT_GROUPS = ("mau.visitors", "mau.templates")
+
+
+# The suffixes of the metadata
+# directories of distributions.
+METADATA_SUFFIXES = (".dist-info", ".egg-info")
+
+
+def _metadata_stamps(entry: str) -> list:
+    # The names and the modification times of the
+    # metadata directories in an entry of sys.path.
+    # Other files are ignored, so that writing files
+    # in a directory like the current one (the entry
+    # "") doesn't change the stamps.
+    try:
+        with os.scandir(entry or ".") as entries:
+            return sorted(
+                (i.name, i.stat().st_mtime_ns)
+                for i in entries
+                if i.name.endswith(METADATA_SUFFIXES)
+            )
+    except NotADirectoryError:
+        # Zip files contain their own metadata.
+        return [os.stat(entry).st_mtime_ns]
+
+
+def _sys_path_key() -> str:
+    # Packages are found through the metadata
+    # directories stored in the entries of sys.path.
+    # Installing, upgrading, or removing a package
+    # adds, replaces, or removes one of them.
+    stamps = []
+
+    for entry in sys.path:
+        try:
+            stamps.append((entry, _metadata_stamps(entry)))
+        except OSError:
+            stamps.append((entry, None))
+
+    return stable_hash("entry-points", sys.version, ENTRY_POINT_GROUPS, stamps)
+
+
+def _scan_entry_points() -> dict[str, list[list[str]]]:  # pragma: no cover
+    # Walk the metadata of all the installed
+    # distributions. This is the slow part.
+    if sys.version_info < (3, 10):
+        from importlib_metadata import entry_points
+    else:
+        from importlib.metadata import entry_points
+
+    return {
+        group: [[i.name, i.value] for i in entry_points(group=group)]
+        for group in ENTRY_POINT_GROUPS
+    }
+
+
+def _entry_points_cache() -> DiskCache | None:
+    try:
+        return DiskCache(user_cache_dir() / "entry_points", max_size=1024 * 1024)
+    except OSError:
+        # The cache is an optimisation,
+        # Mau works without it.
+        return None
+
+
+@lru_cache(maxsize=1)
+def _discovered_entry_points() -> dict[str, list[list[str]]]:
+    # The entry points of all the groups,
+    # read from the cache if the installed
+    # packages didn't change.
+    cache = _entry_points_cache()
+    key = _sys_path_key()
+
+    if cache is not None and (value := cache.get(key)) is not None:
+        try:
+            return json.loads(value)
+        except ValueError:  # pragma: no cover
+            # A corrupted entry is a miss.
+            pass
+
+    discovered = _scan_entry_points()
+
+    if cache is not None:
+        try:
+            cache.set(key, json.dumps(discovered).encode("utf-8"))
+            cache.prune()
+        except OSError:  # pragma: no cover
+            pass
+
+    return discovered
+
+
+def discover_entry_points(group: str) -> list[tuple[str, str]]:
+    """Return the entry points of the given group as
+    pairs (name, value), where value is the import
+    target in the form `module:attribute`. The
+    entry points are not loaded."""
+
+    return [(name, value) for name, value in _discovered_entry_points()[group]]
+
+
+def load_entry_point(value: str):
+    """Import the target of an entry point
+    in the form `module:attribute [extras]`."""
+
+    module_name, _, attributes = value.partition(":")
+    target = import_module(module_name.strip())
+
+    # Extras don't change the target.
+    attributes = attributes.split("[")[0].strip()
+
+    for attribute in filter(None, attributes.split(".")):
+        target = getattr(target, attribute)
+
+    return target
@@ -3,6 +3,20 @@ from __future__ import annotations
 from .helpers import flatten_nested_dict, nest_flattened_dict
 
 
+def _overlaps(namespace: str, key: str) -> bool:
+    # True if the key is the namespace, is inside
+    # it, or contains it (e.g. `a.b` contains `a.b.c`).
+    return (
+        key == namespace
+        or key.startswith(f"{namespace}.")
+        or namespace.startswith(f"{key}.")
+    )
+
+
+def _prefixed(namespace: str | None, key: str) -> str:
+    return f"{namespace}.{key}" if namespace else key
+
+
 class Environment:
     """
     This is a class that hosts a nested configuration.
@@ -12,11 +26,20 @@ class Environment:
     variable names like `a.b.c`.
     """
 
+    # An object that records the keys read from
+    # the environment (see mau.parsers.parse_cache).
+    # It must provide a method `record_key(key)`.
+    recorder = None
+
     def __init__(self):
         # This is the internal dictionary, which
         # is always kept in its flattened version.
         self._variables: dict = {}
 
+        # Namespaces whose values are loaded the first
+        # time they are needed (see `add_lazy`).
+        self._lazy: dict = {}
+
     @classmethod
     def from_dict(cls, other: dict, namespace: str | None = None):
         env = cls()
@@ -25,16 +48,38 @@ class Environment:
 
     @classmethod
     def from_environment(cls, other: Environment, namespace: str | None = None):
-        return cls().from_dict(other.asdict(), namespace)
+        env = cls().from_dict(nest_flattened_dict(other._variables), namespace)
+
+        # The copy loads the pending namespaces
+        # of the original on its own.
+        for lazy_namespace, loader in other._lazy.items():
+            env._lazy[_prefixed(namespace, lazy_namespace)] = loader
+
+        # A copy is read on behalf of the original.
+        env.recorder = other.recorder
+
+        return env
 
     def update(self, other: Environment, namespace: str | None = None, overwrite=True):
+        # The values that are not loaded yet would
+        # have to be merged with the existing ones
+        # without overwriting them, which is the
+        # same as loading them now.
+        if not overwrite:
+            other.load_pending()
+
         # Create an environment, to get all
         # plain variables with the right
         # namespace.
         new_env = Environment.from_dict(other._variables, namespace)
 
         if overwrite:
+            self._load_overlapping(*new_env._variables)
             self._variables.update(new_env._variables)
+
+            for lazy_namespace, loader in other._lazy.items():
+                self.add_lazy(_prefixed(namespace, lazy_namespace), loader)
+
             return
 
         new_env._variables.update(self._variables)
@@ -46,12 +91,62 @@ class Environment:
         if namespace:
             other = {namespace: other}
 
-        self._variables.update(flatten_nested_dict(other))
+        flat = flatten_nested_dict(other)
+
+        self._load_overlapping(*flat)
+        self._variables.update(flat)
+
+    def add_lazy(self, namespace: str, loader):
+        """Store the values returned by `loader.load()`
+        under the namespace the first time a key of
+        that namespace is read. The values override
+        the ones already stored in the namespace, as
+        if they had been added now."""
+
+        self._load_overlapping(namespace)
+        self._lazy[namespace] = loader
+
+    def pending(self) -> dict:
+        """Return the namespaces that have not
+        been loaded yet, with their loaders."""
+
+        return dict(self._lazy)
+
+    def load_pending(self):
+        """Load all the namespaces added with `add_lazy`."""
+
+        while self._lazy:
+            self._load(next(iter(self._lazy)))
+
+    def _load(self, namespace: str):
+        # The loader is removed first, so
+        # that storing the values doesn't
+        # try to load them again.
+        loader = self._lazy.pop(namespace)
+
+        self.dupdate(loader.load(), namespace)
+
+    def _load_overlapping(self, *keys: str):
+        # Load the pending namespaces that contain
+        # or are contained in one of the keys.
+        if not self._lazy:
+            return
+
+        for namespace in list(self._lazy):
+            if namespace in self._lazy and any(_overlaps(namespace, k) for k in keys):
+                self._load(namespace)
 
     def asdict(self) -> dict[str, str | dict]:
+        self.load_pending()
+
         return nest_flattened_dict(self._variables)
 
-    def asflatdict(self) -> dict[str, str]:
+    def asflatdict(self, load: bool = True) -> dict[str, str]:
+        # The namespaces that are not loaded
+        # yet are skipped if `load` is False.
+        if load:
+            self.load_pending()
+
         return self._variables
 
     def __setitem__(self, key, value):
@@ -61,9 +156,19 @@ class Environment:
         self.dupdate({key: value})
 
     def __getitem__(self, key):
+        if self.recorder is not None:
+            self.recorder.record_key(key)
+
+        self._load_overlapping(key)
+
         return self._variables[key]
 
     def get(self, key, default=None):
+        if self.recorder is not None:
+            self.recorder.record_key(key)
+
+        self._load_overlapping(key)
+
         try:
             # If the key is present in the flat
             # index we can just return the
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import pickle
+from functools import lru_cache
+from pathlib import Path
+
+from mau.cache import (
+    UNPICKLING_ERRORS,
+    DiskCache,
+    load_pickle,
+    stable_hash,
+    user_cache_dir,
+)
+
+# The maximum size of the cache
+# of parsed data files in bytes.
+DATA_FILES_CACHE_SIZE = 64 * 1024 * 1024
+
+
+def parse_data_file(path: str | Path):
+    """Parse a YAML or JSON file. Files with the
+    extension `.json` are parsed as JSON, all
+    the others as YAML."""
+
+    path = Path(path)
+
+    # JSON is a subset of YAML, but the
+    # JSON parser is much faster.
+    if path.suffix.lower() == ".json":
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+
+    # Imported here as most runs
+    # don't load data files.
+    import yaml
+
+    # The loader based on libyaml is much faster
+    # than the pure Python one, but it's available
+    # only if PyYAML has been compiled with it.
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+    with path.open("r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=loader)
+
+
+def _data_files_cache() -> DiskCache | None:
+    try:
+        return DiskCache(user_cache_dir() / "data_files", DATA_FILES_CACHE_SIZE)
+    except OSError:
+        # The cache is an optimisation,
+        # Mau works without it.
+        return None
+
+
+def data_file_signature(path: str | Path) -> tuple[str, int, int]:
+    """Return the absolute path of the file with
+    its modification time and size. A file with
+    the same signature has the same content."""
+
+    stat = os.stat(path)
+
+    return (Path(path).absolute().as_posix(), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=32)
+def _load_data_file(path: str, mtime_ns: int, size: int, cache: bool):
+    # The content of a version of a file. This
+    # is cached in memory as environments created
+    # from the same one load the same files.
+    disk_cache = _data_files_cache() if cache else None
+    key = stable_hash("data-file", path, mtime_ns, size)
+
+    if disk_cache is not None and (value := disk_cache.get(key)) is not None:
+        # A corrupted entry is a miss.
+        with contextlib.suppress(*UNPICKLING_ERRORS):
+            return load_pickle(value)
+
+    content = parse_data_file(path)
+
+    if disk_cache is not None:
+        try:
+            disk_cache.set(key, pickle.dumps(content, protocol=pickle.HIGHEST_PROTOCOL))
+            disk_cache.prune()
+        except (OSError, pickle.PicklingError):  # pragma: no cover
+            pass
+
+    return content
+
+
+def load_data_file(path: str | Path, cache: bool = True):
+    """Parse a YAML or JSON file (see `parse_data_file`).
+    If `cache` is True the parsed data is stored in the
+    user cache, keyed by the path of the file, its
+    modification time, and its size, and parsed
+    again only if one of them changes.
+
+    The returned data might be shared
+    with other callers, so it must not
+    be changed."""
+
+    return _load_data_file(*data_file_signature(path), cache)
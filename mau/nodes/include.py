@@ -5,7 +5,7 @@ from collections.abc import Mapping, Sequence
 from mau.nodes.block import BlockNode
 from mau.nodes.footnote import FootnoteNode
 from mau.nodes.header import HeaderNode
-from mau.nodes.raw import RawLineNode, RawNode
+from mau.nodes.raw import RawContent, RawContentMixin, RawLineNode, RawNode
 from mau.nodes.node import (
     Node,
     NodeArguments,
@@ -135,7 +135,7 @@ class IncludeMauNode(Node, NodeContentMixin, NodeLabelsMixin):
         self.uri = uri
 
 
-class IncludeRawNode(Node, NodeContentMixin, NodeLabelsMixin):
+class IncludeRawNode(Node, RawContentMixin, NodeLabelsMixin):
     """Raw content included in the page.
 
     This represents raw content included
@@ -152,9 +152,10 @@ class IncludeRawNode(Node, NodeContentMixin, NodeLabelsMixin):
         parent: Node | None = None,
         arguments: NodeArguments | None = None,
         info: NodeInfo | None = None,
+        raw_content: RawContent | None = None,
     ):
         super().__init__(parent=parent, arguments=arguments, info=info)
-        NodeContentMixin.__init__(self, content)
+        RawContentMixin.__init__(self, content, raw_content)
         NodeLabelsMixin.__init__(self, labels)
 
         self.uri = uri
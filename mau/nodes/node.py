@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from collections.abc import Mapping, Sequence
+from collections.abc import Iterator, Mapping, Sequence
 from typing import TYPE_CHECKING
 
 from mau.text_buffer import Context
@@ -10,6 +10,9 @@ from .node_arguments import NodeArguments
 if TYPE_CHECKING:
     from mau.visitors.base_visitor import BaseVisitor
 
+# Node attributes that don't point down the tree.
+SKIPPED_ATTRIBUTES = ("parent", "info", "arguments")
+
 
 class NodeInfo:
     """A class to collect information about a
@@ -74,19 +77,11 @@ class Node:
         # calls one of the visitor's methods according
         # to the node content type.
 
-        # Some node types contain a dot to allow templates
-        # to be created in a hierarchy of directories
-        # but dots are not allowed in function names
-        method_name = f"_visit_{self.type.replace('-', '_')}"
-
-        # Try to call the computed method. If not
-        # available, call a default method.
-        try:
-            method = getattr(visitor, method_name)
-        except AttributeError:
-            method = getattr(visitor, "_visit_default")
+        # The visitor class knows which of
+        # its methods visits this node type.
+        method = visitor._dispatch(self.type)
 
-        return method(self, *args, **kwargs)
+        return method(visitor, self, *args, **kwargs)
 
 
 class NodeContentMixin:
@@ -132,3 +127,22 @@ class WrapperNode(Node, NodeContentMixin):
     ):
         super().__init__(parent=parent, arguments=arguments, info=info)
         NodeContentMixin.__init__(self, content)
+
+
+def child_values(node: Node) -> Iterator[Node | list]:
+    """Yield the attributes of the node that point down
+    the tree: the nodes and the lists, including those
+    stored in dictionaries (like labels). Lists are
+    yielded as they are, so they can be changed in place,
+    and might contain values that are not nodes."""
+
+    for name, value in vars(node).items():
+        if name in SKIPPED_ATTRIBUTES:
+            continue
+
+        if isinstance(value, (Node, list)):
+            yield value
+        elif isinstance(value, dict):
+            for item in value.values():
+                if isinstance(item, (Node, list)):
+                    yield item
@@ -1,7 +1,11 @@
-from collections.abc import Mapping, Sequence
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator, Mapping, Sequence
 
 from mau.nodes.node import Node, NodeInfo, NodeLabelsMixin, ValueNode
 from mau.nodes.node_arguments import NodeArguments
+from mau.text_buffer import Context
 
 
 class RawLineNode(ValueNode):
@@ -14,7 +18,129 @@ class RawLineNode(ValueNode):
     type = "raw-line"
 
 
-class RawNode(Node, NodeLabelsMixin):
+class RawContent:
+    """The content of a raw node, kept as a single
+    string instead of a node per line.
+
+    The content is either a string or the path of
+    a file, which is read the first time the content
+    is needed. Line nodes are created only when asked
+    (see `line_nodes`).
+
+    If `line_contexts` is True each line gets its own
+    context, computed from `context` (the position of
+    the first line). Otherwise all lines share it.
+    """
+
+    __slots__ = ("_text", "context", "line_contexts", "signature", "uri")
+
+    def __init__(
+        self,
+        text: str | None = None,
+        uri: str | None = None,
+        context: Context | None = None,
+        line_contexts: bool = False,
+    ):
+        self._text = text
+        self.uri = uri
+        self.context = context or Context.empty()
+        self.line_contexts = line_contexts
+
+        # The content of a file can change after
+        # the node has been created. Its size and
+        # modification time make the node different.
+        self.signature = None
+        if text is None and uri is not None:
+            stat = os.stat(uri)
+            self.signature = (stat.st_mtime_ns, stat.st_size)
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            if self.uri is None:
+                return ""
+
+            with open(self.uri, "r", encoding="utf-8") as f:
+                self._text = f.read()
+
+        return self._text
+
+    def lines(self) -> Iterator[str]:
+        # Iterate over the lines without
+        # splitting the whole content.
+        text = self.text
+        start = 0
+
+        while (end := text.find("\n", start)) != -1:
+            yield text[start:end]
+            start = end + 1
+
+        yield text[start:]
+
+    def line_nodes(self, parent: Node | None = None) -> list[RawLineNode]:
+        # Create a node for each line,
+        # as the raw engines used to do.
+        nodes = []
+
+        for number, line in enumerate(self.lines()):
+            context = self.context
+
+            if self.line_contexts:
+                context = self.context.clone()
+                context.start_line += number
+                context.end_line = context.start_line
+                context.end_column = context.start_column + len(line)
+
+            nodes.append(
+                RawLineNode(line, info=NodeInfo(context=context), parent=parent)
+            )
+
+        return nodes
+
+
+class RawContentMixin:
+    """A mixin for nodes that contain raw lines.
+    The lines can be given as a list of nodes or
+    as a RawContent, which is converted into nodes
+    only if `content` is accessed."""
+
+    def __init__(
+        self,
+        content: Sequence[RawLineNode] | None = None,
+        raw_content: RawContent | None = None,
+    ):
+        self._content = list(content) if content else None
+        self.raw_content = raw_content
+
+    @property
+    def content(self) -> list[RawLineNode]:
+        if self._content is None:
+            self._content = []
+
+            if self.raw_content is not None:
+                self._content = self.raw_content.line_nodes(self)
+
+        return self._content
+
+    @content.setter
+    def content(self, value: Sequence[RawLineNode] | None):
+        self._content = list(value) if value else []
+
+    @property
+    def has_line_nodes(self) -> bool:
+        # True if the line nodes exist.
+        return self._content is not None
+
+    @property
+    def raw_text(self) -> str:
+        # The whole content as a string.
+        if self._content is None and self.raw_content is not None:
+            return self.raw_content.text
+
+        return "\n".join(line.value for line in self.content)
+
+
+class RawNode(Node, RawContentMixin, NodeLabelsMixin):
     """This contains a list of raw lines."""
 
     type = "raw"
@@ -27,9 +153,10 @@ class RawNode(Node, NodeLabelsMixin):
         parent: Node | None = None,
         arguments: NodeArguments | None = None,
         info: NodeInfo | None = None,
+        raw_content: RawContent | None = None,
     ):
         super().__init__(parent=parent, arguments=arguments, info=info)
+        RawContentMixin.__init__(self, content, raw_content)
         NodeLabelsMixin.__init__(self, labels)
 
-        self.content = content or []
         self.classes = classes or []
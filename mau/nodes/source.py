@@ -1,7 +1,11 @@
-from collections.abc import Mapping, Sequence
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator, Mapping, Sequence
 
 from mau.nodes.node import Node, NodeInfo, NodeLabelsMixin, ValueNode
 from mau.nodes.node_arguments import NodeArguments
+from mau.text_buffer import Context
 
 
 class SourceMarkerNode(ValueNode):
@@ -33,10 +37,153 @@ class SourceLineNode(Node):
         self.marker = marker
 
 
+class SourceContent:
+    """The lines of a source block, stored as the
+    text of the block and the offsets of its lines.
+
+    Only the lines that contain a marker or a highlight
+    have an entry in `markers`, `highlights` and
+    `lengths` (the length of the line without the
+    marker). Line nodes are created only when asked
+    (see `line_nodes`).
+
+    The context is the position of the first line.
+    """
+
+    __slots__ = ("context", "highlights", "lengths", "markers", "offsets", "text")
+
+    def __init__(
+        self,
+        text: str,
+        offsets: array | None = None,
+        markers: dict[int, str] | None = None,
+        highlights: dict[int, str] | None = None,
+        lengths: dict[int, int] | None = None,
+        context: Context | None = None,
+    ):
+        self.text = text
+        self.offsets = offsets if offsets is not None else line_offsets(text)
+        self.markers = markers or {}
+        self.highlights = highlights or {}
+        self.lengths = lengths or {}
+        self.context = context or Context.empty()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def _line_end(self, index: int) -> int:
+        # The end of the whole line,
+        # including the marker.
+        if index + 1 < len(self.offsets):
+            return self.offsets[index + 1] - 1
+
+        return len(self.text)
+
+    def line_content(self, index: int) -> str:
+        start = self.offsets[index]
+
+        try:
+            return self.text[start : start + self.lengths[index]]
+        except KeyError:
+            return self.text[start : self._line_end(index)]
+
+    def lines(self) -> Iterator[tuple[str, str, str | None, str | None]]:
+        # Iterate over the lines as tuples
+        # (line number, line content,
+        # highlight style, marker).
+        markers = self.markers
+        highlights = self.highlights
+
+        for index in range(len(self.offsets)):
+            yield (
+                str(index + 1),
+                self.line_content(index),
+                highlights.get(index),
+                markers.get(index),
+            )
+
+    @property
+    def code(self) -> str:
+        # The code without markers.
+        if not self.lengths:
+            return self.text
+
+        return "\n".join(self.line_content(index) for index in range(len(self)))
+
+    def _line_context(self, index: int) -> Context:
+        # The context of the whole line.
+        context = self.context.clone()
+        context.start_line += index
+        context.end_line = context.start_line
+        context.end_column = context.start_column + (
+            self._line_end(index) - self.offsets[index]
+        )
+
+        return context
+
+    def marker_node(self, index: int) -> SourceMarkerNode | None:
+        marker = self.markers.get(index)
+
+        if not marker:
+            return None
+
+        # Remove the line from the
+        # marker context.
+        marker_context = self._line_context(index)
+        marker_context.start_column += self.lengths[index]
+
+        return SourceMarkerNode(marker, info=NodeInfo(context=marker_context))
+
+    def line_nodes(self, parent: Node | None = None) -> list[SourceLineNode]:
+        # Create a node for each line,
+        # as the source engine used to do.
+        nodes = []
+
+        for index, (line_number, line_content, highlight_style, marker) in enumerate(
+            self.lines()
+        ):
+            line_context = self._line_context(index)
+
+            # If there is a marker, remove it
+            # from the end of the line context,
+            # taking into account the two colons.
+            if marker:
+                line_context.end_column -= len(marker) + 2
+
+            nodes.append(
+                SourceLineNode(
+                    line_number,
+                    line_content=line_content,
+                    highlight_style=highlight_style,
+                    marker=self.marker_node(index),
+                    info=NodeInfo(context=line_context),
+                    parent=parent,
+                )
+            )
+
+        return nodes
+
+
+def line_offsets(text: str) -> array:
+    # The offsets of the
+    # beginning of each line.
+    offsets = array("L", [0])
+    position = text.find("\n")
+
+    while position != -1:
+        offsets.append(position + 1)
+        position = text.find("\n", position + 1)
+
+    return offsets
+
+
 class SourceNode(Node, NodeLabelsMixin):
     """A block of verbatim text or source code.
 
     This node contains verbatim text or source code.
+    The lines can be given as a list of nodes or as
+    a SourceContent, which is converted into nodes
+    only if `content` is accessed.
     """
 
     type = "source"
@@ -50,6 +197,7 @@ class SourceNode(Node, NodeLabelsMixin):
         parent: Node | None = None,
         arguments: NodeArguments | None = None,
         info: NodeInfo | None = None,
+        source_content: SourceContent | None = None,
     ):
         super().__init__(parent=parent, arguments=arguments, info=info)
 
@@ -57,4 +205,36 @@ class SourceNode(Node, NodeLabelsMixin):
 
         self.language = language
         self.classes = classes or []
-        self.content = content or []
+        self._content = list(content) if content else None
+        self.source_content = source_content
+
+        # The lines of the code highlighted by the
+        # visitor, if requested (see SourceHighlighter).
+        self.highlighted_lines: list[str] | None = None
+
+    @property
+    def content(self) -> list[SourceLineNode]:
+        if self._content is None:
+            self._content = []
+
+            if self.source_content is not None:
+                self._content = self.source_content.line_nodes(self)
+
+        return self._content
+
+    @content.setter
+    def content(self, value: Sequence[SourceLineNode] | None):
+        self._content = list(value) if value else []
+
+    @property
+    def has_line_nodes(self) -> bool:
+        # True if the line nodes exist.
+        return self._content is not None
+
+    @property
+    def code(self) -> str:
+        # The code without markers.
+        if self._content is None and self.source_content is not None:
+            return self.source_content.code
+
+        return "\n".join(line.line_content for line in self.content)
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass, field
 from functools import partial
+from typing import TYPE_CHECKING
 
 from mau.environment.environment import Environment
 from mau.lexers.document_lexer import DocumentLexer
@@ -20,7 +22,12 @@ from mau.parsers.document_processors.block import block_processor
 from mau.parsers.document_processors.control import control_processor
 from mau.parsers.document_processors.header import header_processor
 from mau.parsers.document_processors.horizontal_rule import horizontal_rule_processor
-from mau.parsers.document_processors.include import IncludeCall, include_processor
+from mau.parsers.document_processors.include import (
+    IncludeCall,
+    ScheduledInclude,
+    include_processor,
+    resolve_scheduled_includes,
+)
 from mau.parsers.document_processors.label import label_processor
 from mau.parsers.document_processors.list import list_processor
 from mau.parsers.document_processors.paragraph import paragraph_processor
@@ -31,11 +38,18 @@ from mau.parsers.managers.blockgroup_manager import BlockGroupManager
 from mau.parsers.managers.footnotes_manager import FootnotesManager
 from mau.parsers.managers.header_links_manager import HeaderLinksManager
 from mau.parsers.managers.toc_manager import TocManager
+from mau.parsers.parse_cache import get_parse_cache, read_unrecorded
 from mau.parsers.preprocess_variables_parser import PreprocessVariablesParser
 from mau.parsers.text_parser import TextParser
+from mau.parsers.tree_simplifier import TreeSimplifier
 from mau.text_buffer import Context
 from mau.token import Token, TokenType
 
+if TYPE_CHECKING:
+    from mau.parsers.include_scheduler import IncludeScheduler
+
+logger = logging.getLogger(__name__)
+
 DEFAULT_STYLE_ALIASES = {
     "+": "add",
     "-": "remove",
@@ -59,6 +73,10 @@ class DocumentParserOutput:
     # The list of included calls.
     include_calls: list[IncludeCall] = field(default_factory=list)
 
+    # The number of nodes removed
+    # by the simplification pass.
+    simplified_nodes: int = 0
+
 
 # The DocumentParser is in charge of parsing
 # the whole input, calling other parsers
@@ -74,6 +92,8 @@ class DocumentParser(BaseParser):
         environment: Environment | None = None,
         parent_node=None,
         forbidden_includes: list[str] | None = None,
+        include_memo: dict | None = None,
+        nested: bool = False,
     ):
         super().__init__(tokens, message_handler, environment, parent_node)
 
@@ -115,13 +135,37 @@ class DocumentParser(BaseParser):
         self.latest_ordered_list_index = 0
 
         # This is a list of files that cannot
-        # be included by this file. This is a
-        # simple mechanism to avoid infinite
+        # be included by this file, that is the
+        # stack of files that included it. This
+        # is a simple mechanism to avoid infinite
         # recursive inclusion.
         # This is a list as we need to keep the
         # order of calls.
         self.forbidden_includes = forbidden_includes or []
 
+        # The included files already parsed in
+        # this run, shared by all the parsers
+        # of the included files. See `_parse_mau`
+        # in the include processor.
+        self.include_memo = include_memo if include_memo is not None else {}
+
+        # Parsers of parts of a document (blocks
+        # and included files) are nested. Passes
+        # on the whole tree, like the simplification,
+        # run only in the parser of the document.
+        self.nested = nested
+
+        # The number of processes used to parse
+        # included files. With more than one,
+        # included files are parsed concurrently
+        # and their content is added to the
+        # tree when the parser is finalised.
+        self.include_jobs = read_unrecorded(
+            self.environment, "mau.parser.include_jobs", 1
+        )
+        self.include_scheduler: IncludeScheduler | None = None
+        self.scheduled_includes: list[ScheduledInclude] = []
+
         # This is the final output of the parser
         self.output = DocumentParserOutput()
 
@@ -132,6 +176,49 @@ class DocumentParser(BaseParser):
 
         self.parent_node = document_node_class()
 
+    @classmethod
+    def lex_and_parse(
+        cls,
+        text: str,
+        message_handler: BaseMessageHandler,
+        environment: Environment | None,
+        start_line: int = 0,
+        start_column: int = 0,
+        source_filename: str | None = None,
+        **kwds,
+    ):
+        # If a parse cache is configured
+        # (`mau.parser.cache.path`) the parsed
+        # document might come from there.
+        parse_cache = get_parse_cache(environment) if environment else None
+
+        # Only whole files (documents and included
+        # files) are cached. Parts of a document,
+        # like the content of blocks, are cached
+        # as part of it.
+        if parse_cache is None or start_line or start_column:
+            return super().lex_and_parse(
+                text,
+                message_handler,
+                environment,
+                start_line,
+                start_column,
+                source_filename,
+                **kwds,
+            )
+
+        return parse_cache.lex_and_parse(
+            cls,
+            super().lex_and_parse,
+            text,
+            message_handler,
+            environment,
+            start_line,
+            start_column,
+            source_filename,
+            **kwds,
+        )
+
     def _process_functions(self):
         # All the functions that this parser provides.
 
@@ -227,7 +314,28 @@ class DocumentParser(BaseParser):
 
         return True
 
+    def get_include_scheduler(self) -> IncludeScheduler:
+        # The pools are started when the
+        # first included file is found.
+        if self.include_scheduler is None:
+            from mau.parsers.include_scheduler import IncludeScheduler
+
+            self.include_scheduler = IncludeScheduler(
+                self.include_jobs, self.message_handler
+            )
+
+        return self.include_scheduler
+
     def finalise(self):
+        # Collect the included files
+        # parsed by the workers.
+        if self.include_scheduler is not None:
+            try:
+                resolve_scheduled_includes(self)
+            finally:
+                self.include_scheduler.shutdown()
+                self.include_scheduler = None
+
         super().finalise()
 
         # This processes all footnotes stored in
@@ -268,3 +376,28 @@ class DocumentParser(BaseParser):
             plain_entries=self.toc_manager.headers,
             nested_entries=self.toc_manager.nested_headers,
         )
+
+        # Simplify the final tree.
+        if not self.nested and self.environment.get(
+            "mau.parser.simplify.enabled", False
+        ):
+            self._simplify_tree()
+
+        return self.output
+
+    def _simplify_tree(self):
+        # Remove the nodes that add only overhead
+        # to the visitors. See TreeSimplifier.
+        simplifier = TreeSimplifier(
+            merge_text=self.environment.get("mau.parser.simplify.merge_text", True),
+            unwrap=self.environment.get("mau.parser.simplify.unwrap", True),
+            remove_empty_styles=self.environment.get(
+                "mau.parser.simplify.remove_empty_styles", False
+            ),
+        )
+
+        self.output.simplified_nodes = simplifier.process(self.output.document)
+
+        logger.debug(
+            "Tree simplification removed %d nodes", self.output.simplified_nodes
+        )
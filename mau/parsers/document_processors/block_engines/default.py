@@ -34,6 +34,9 @@ def parse_block_content(
         start_line=start_line,
         start_column=start_column,
         source_filename=source_filename,
+        forbidden_includes=parser.forbidden_includes,
+        include_memo=parser.include_memo,
+        nested=True,
     )
 
     if update:
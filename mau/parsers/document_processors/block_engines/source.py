@@ -6,40 +6,74 @@ if TYPE_CHECKING:
     from mau.parsers.document_parser import DocumentParser
 
 
+import re
+from bisect import bisect_right
+
 from mau.environment.environment import Environment
 from mau.nodes.node import Node, NodeInfo
 from mau.nodes.node_arguments import NodeArguments
-from mau.nodes.source import (
-    SourceLineNode,
-    SourceMarkerNode,
-    SourceNode,
-)
+from mau.nodes.source import SourceContent, SourceNode, line_offsets
 from mau.text_buffer import Context
 from mau.token import Token
 
 
-def create_source_line(
-    code: list[SourceLineNode],
-    line_number: str,
-    line_content: str,
-    line_context: Context,
-    parent: Node,
-    marker_node: SourceMarkerNode | None = None,
-    highlight_style: str | None = None,
-):
-    # Prepare the source line
-    source_line_node = SourceLineNode(
-        line_number,
-        line_content=line_content,
-        highlight_style=highlight_style,
-        info=NodeInfo(context=line_context),
-        parent=parent,
-    )
+def scan_source(
+    text: str,
+    context: Context,
+    marker_delimiter: str,
+    highlight_prefix: str,
+    highlight_default_style: str,
+    style_aliases: dict,
+) -> SourceContent:
+    # Find markers and highlights in the
+    # whole block with a single search.
+    # Only the lines that end with the
+    # delimiter are processed one by one.
+    offsets = line_offsets(text)
+
+    markers: dict[int, str] = {}
+    highlights: dict[int, str] = {}
+    lengths: dict[int, int] = {}
+
+    pattern = re.compile(f"^.*{re.escape(marker_delimiter)}$", re.MULTILINE)
+
+    for match in pattern.finditer(text):
+        line_content = match.group()
+
+        # Split without the final delimiter
+        splits = line_content[:-1].split(marker_delimiter)
 
-    if marker_node:
-        source_line_node.marker = marker_node
+        if len(splits) < 2:
+            # It's a trap! There are no separators left.
+            # Just keep the line as it is.
+            continue
 
-    code.append(source_line_node)
+        index = bisect_right(offsets, match.start()) - 1
+
+        # Get the callout and the line
+        marker = splits[-1]
+        lengths[index] = len(marker_delimiter.join(splits[:-1]))
+
+        if marker.startswith(highlight_prefix):
+            highlight_style = marker[1:] or highlight_default_style
+
+            # Replate the highlight style
+            # if it is an alias.
+            highlights[index] = style_aliases.get(highlight_style, highlight_style)
+
+            continue
+
+        if marker:
+            markers[index] = marker
+
+    return SourceContent(
+        text,
+        offsets=offsets,
+        markers=markers,
+        highlights=highlights,
+        lengths=lengths,
+        context=context,
+    )
 
 
 def parse_source_engine(
@@ -83,101 +117,17 @@ def parse_source_engine(
     arguments.set_names(["language"])
     language = arguments.named_args.pop("language", "text")
 
-    # A list of content lines (raw).
-    content_lines = content.value.split("\n")
-
-    # A list of code lines (after processing).
-    code: list[SourceLineNode] = []
-
-    node = SourceNode(language)
-
-    for number, line_content in enumerate(content_lines, start=1):
-        line_number = str(number)
-
-        line_context = content.context.clone()
-        line_context.start_line += number - 1
-        line_context.end_line = line_context.start_line
-        line_context.end_column = line_context.start_column + len(line_content)
-
-        marker: str | None = None
-        highlight_style: str | None = None
-
-        if not line_content.endswith(marker_delimiter):
-            create_source_line(
-                code,
-                line_number,
-                line_content,
-                line_context,
-                parent=node,
-            )
-            continue
-
-        # Split without the final delimiter
-        splits = line_content[:-1].split(marker_delimiter)
-
-        if len(splits) < 2:
-            # It's a trap! There are no separators left.
-            # Just add the line as it is.
-            create_source_line(
-                code,
-                line_number,
-                line_content,
-                line_context,
-                parent=node,
-            )
-            continue
-
-        # Get the callout and the line
-        marker = splits[-1]
-        line_content = marker_delimiter.join(splits[:-1])
-
-        if marker.startswith(highlight_prefix):
-            highlight_style = marker[1:] or highlight_default_style
-
-            # Replate the highlight style
-            # if it is an alias.
-            highlight_style = style_aliases.get(highlight_style, highlight_style)
-
-            marker = None
-
-        marker_node: SourceMarkerNode | None = None
+    source_content = scan_source(
+        content.value,
+        content.context,
+        marker_delimiter,
+        highlight_prefix,
+        highlight_default_style,
+        style_aliases,
+    )
 
-        # If there is a marker, change the line
-        # context to remove the marker.
-        if marker:
-            # Take into account the two colons.
-            marker_length = len(marker) + 2
-
-            # Calculate the line length.
-            line_length = len(line_content)
-
-            # Clone the line context.
-            marker_context = line_context.clone()
-
-            # Remove the marker from the end
-            # of the line context.
-            line_context.end_column -= marker_length
-
-            # Remove the line from the
-            # marker context.
-            marker_context.start_column += line_length
-
-            marker_node = SourceMarkerNode(
-                marker,
-                info=NodeInfo(context=marker_context),
-            )
-
-        create_source_line(
-            code,
-            line_number,
-            line_content,
-            line_context,
-            parent=node,
-            marker_node=marker_node,
-            highlight_style=highlight_style,
-        )
-
-    node.content = code
-    node.info = NodeInfo(context=content.context)
-
-    return node
+    return SourceNode(
+        language,
+        info=NodeInfo(context=content.context),
+        source_content=source_content,
+    )
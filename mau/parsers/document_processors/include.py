@@ -6,10 +6,15 @@ if TYPE_CHECKING:
     from mau.parsers.document_parser import DocumentParser
 
 
+import copy
+import os
+import pickle
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 
+from mau.cache import load_pickle, stable_hash
 from mau.environment.environment import Environment
-from mau.nodes.raw import RawLineNode
+from mau.nodes.raw import RawContent
 from mau.nodes.include import (
     BlockGroupNode,
     FootnotesNode,
@@ -23,12 +28,14 @@ from mau.nodes.include import (
     INCLUDE_MAU_HELP,
     INCLUDE_RAW_HELP,
 )
-from mau.nodes.node import NodeInfo
+from mau.nodes.node import Node, NodeInfo
 from mau.nodes.node_arguments import NodeArguments
 from mau.parsers.arguments_parser import (
     process_arguments_with_variables,
 )
 from mau.parsers.base_parser import create_parser_exception
+from mau.parsers.include_scheduler import IncludeResult
+from mau.parsers.parse_cache import ParseRecorder, record_file_read
 from mau.text_buffer import Context
 from mau.token import TokenType
 
@@ -53,6 +60,78 @@ class IncludeCall:
     info: NodeInfo | None = None
 
 
+@dataclass
+class ScheduledInclude:
+    # An included file that is being parsed
+    # by a worker (see `_parse_mau`).
+
+    # The node that receives the content.
+    node: IncludeMauNode
+
+    # The position in the include calls of the
+    # parser where the calls made by the
+    # included file have to be inserted.
+    position: int
+
+    # The future returned by the scheduler.
+    future: Future
+
+    uri: str
+    memo_key: tuple
+    recorder: ParseRecorder | None
+    context: Context
+
+
+def _file_stamp(path: str) -> tuple[int, int] | None:
+    # The modification time and the size
+    # of a file, or None if it doesn't exist.
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+@dataclass
+class IncludeMemoEntry:
+    # An included file already parsed
+    # (see `_parse_mau`). The memo can be
+    # kept across runs (see mau.watch), so
+    # the entry is valid only while the
+    # files it includes don't change.
+
+    # A copy of the top-level nodes of
+    # the file (see `_freeze_nodes`).
+    nodes: bytes | list[Node]
+
+    # The include calls made by the file,
+    # including the nested ones.
+    include_calls: list[IncludeCall]
+
+    # What the parse of the file depends on,
+    # if the parse cache is recording it.
+    keys: set[str] = field(default_factory=set)
+    files: dict[str, str] = field(default_factory=dict)
+
+    # The modification time and the size of the
+    # files included directly or indirectly.
+    # The key of the entry covers only the
+    # file itself (see `_include_memo_key`).
+    stamps: dict[str, tuple[int, int] | None] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not self.stamps:
+            paths = {call.callee_uri for call in self.include_calls}
+            paths.update(self.files)
+
+            self.stamps = {path: _file_stamp(path) for path in paths}
+
+    def is_current(self) -> bool:
+        # True if none of the included files changed.
+        return all(_file_stamp(path) == stamp for path, stamp in self.stamps.items())
+
+
 def include_processor(parser: DocumentParser):
     # Parse content in the form
     #
@@ -177,21 +256,22 @@ def _parse_mau(
             help_text=INCLUDE_MAU_HELP,
         )
 
-    # Add this very file to the list of forbidden
-    # inclusions. It's 1984 and Farenheit 451
+    # The files that are being included to reach
+    # this one, from the main document down to
+    # the current file. It's 1984 and Farenheit 451
     # all together!
-    # We check if the element is already there to
-    # prevent double inclusion but still preserve
-    # the order.
-    if context.source not in parser.forbidden_includes:
-        parser.forbidden_includes.append(context.source)
+    # The list is copied, so that files included
+    # by siblings (diamond inclusions) are allowed.
+    include_stack = list(parser.forbidden_includes)
+    if context.source not in include_stack:
+        include_stack.append(context.source)
 
     # Make sure we are not trying to include a file that
     # included this file. It's called infinite recursion,
     # sweetheart.
-    if uri in parser.forbidden_includes:
+    if uri in include_stack:
         raise create_parser_exception(
-            f"To avoid recursion, you cannot include the following files: {parser.forbidden_includes}.",
+            f"To avoid recursion, you cannot include the following files: {include_stack}.",
             context,
         )
 
@@ -208,23 +288,9 @@ def _parse_mau(
         new_key = key.removeprefix("call:")
         call_arguments[new_key] = arguments.named_args.pop(key)
 
-    # Add the included URI to the list of forbidden
-    # inclusions. More censorship!
-    # We check if the element is already there to
-    # prevent double inclusion but still preserve
-    # the order.
-    if uri not in parser.forbidden_includes:
-        parser.forbidden_includes.append(uri)
-
-    # Open the given URI and read the text.
-    try:
-        with open(uri, "r", encoding="utf-8") as f:
-            text = f.read()
-    except FileNotFoundError as exc:
-        raise create_parser_exception(
-            f"File '{uri}' cannot be read.",
-            context,
-        ) from exc
+    # The included file can't include
+    # any file in the stack, itself included.
+    include_stack.append(uri)
 
     if pass_environment == "true":
         # The parsing environment is
@@ -238,21 +304,79 @@ def _parse_mau(
     # Update the environment with call variables.
     environment.dupdate(call_arguments)
 
-    # Unpack the token initial position.
-    start_line, start_column = context.start_position
+    # If the parse cache is recording what the
+    # document depends on, record what the
+    # included file depends on separately,
+    # so that it can be memoised.
+    recorder = None
+    if parser.environment.recorder is not None:
+        recorder = ParseRecorder(parser.environment.recorder)
+
+    environment.recorder = recorder
+
+    # The same file included with the same
+    # arguments and environment was already
+    # parsed in this run.
+    memo_key = _include_memo_key(uri, call_arguments, environment)
+    memo_entry = parser.include_memo.get(memo_key) if memo_key else None
+
+    if memo_entry is not None and not memo_entry.is_current():
+        # A file included by this one changed.
+        del parser.include_memo[memo_key]
+        memo_entry = None
+
+    if memo_entry is not None and not any(
+        call.callee_uri in include_stack for call in memo_entry.include_calls
+    ):
+        if recorder is not None:
+            recorder.merge(memo_entry.keys, memo_entry.files)
+
+        nodes = _clone_nodes(memo_entry.nodes)
+        include_calls = memo_entry.include_calls
+    elif memo_key and (
+        future := _schedule_include(parser, memo_key, uri, environment, include_stack)
+    ):
+        # The file is parsed by a worker while this
+        # parser goes on. The content of the node
+        # is set when the parser is finalised.
+        node = IncludeMauNode(uri)
+
+        parser.output.include_calls.append(
+            IncludeCall(
+                caller_uri=context.source,
+                callee_uri=uri,
+                call_arguments=call_arguments,
+                info=NodeInfo(context=context),
+            )
+        )
 
-    # Get the token source.
-    source_filename = uri
+        parser.scheduled_includes.append(
+            ScheduledInclude(
+                node=node,
+                position=len(parser.output.include_calls),
+                future=future,
+                uri=uri,
+                memo_key=memo_key,
+                recorder=recorder,
+                context=context,
+            )
+        )
 
-    content_parser = parser.lex_and_parse(
-        text=text,
-        message_handler=parser.message_handler,
-        environment=environment,
-        start_line=0,
-        start_column=0,
-        source_filename=source_filename,
-        forbidden_includes=parser.forbidden_includes,
-    )
+        return node
+    else:
+        # Open the given URI and read the text.
+        try:
+            with open(uri, "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError as exc:
+            raise create_parser_exception(
+                f"File '{uri}' cannot be read.",
+                context,
+            ) from exc
+
+        nodes, include_calls = _parse_included_text(
+            parser, text, uri, environment, include_stack, memo_key, recorder
+        )
 
     # Add the include call to the parser output.
     # The key is (includer file, included file)
@@ -268,14 +392,177 @@ def _parse_mau(
     # Inherit all the calls made by the recursive
     # parser that processed the content to the
     # included file.
-    parser.output.include_calls.extend(content_parser.output.include_calls)
+    parser.output.include_calls.extend(include_calls)
 
     return IncludeMauNode(
         uri,
-        content=content_parser.nodes,
+        content=nodes,
+    )
+
+
+def _schedule_include(
+    parser: DocumentParser,
+    memo_key: tuple,
+    uri: str,
+    environment: Environment,
+    include_stack: list[str],
+) -> Future | None:
+    # Send the file to the workers
+    # if the parser is configured
+    # to use them.
+    if parser.include_jobs <= 1:
+        return None
+
+    # The stack is part of the key, as the
+    # same file included from different
+    # files might be a recursive inclusion
+    # only for some of them.
+    return parser.get_include_scheduler().schedule(
+        (*memo_key, *include_stack), uri, environment, include_stack
     )
 
 
+def _parse_included_text(
+    parser: DocumentParser,
+    text: str,
+    uri: str,
+    environment: Environment,
+    include_stack: list[str],
+    memo_key: tuple | None,
+    recorder: ParseRecorder | None,
+) -> tuple[list[Node], list[IncludeCall]]:
+    # Parse the text of an included file
+    # and store the result in the memo.
+
+    # The parsed document depends on this file.
+    record_file_read(environment, uri, text)
+
+    # Get the token source.
+    source_filename = uri
+
+    content_parser = parser.lex_and_parse(
+        text=text,
+        message_handler=parser.message_handler,
+        environment=environment,
+        start_line=0,
+        start_column=0,
+        source_filename=source_filename,
+        forbidden_includes=include_stack,
+        include_memo=parser.include_memo,
+        nested=True,
+    )
+
+    nodes = content_parser.nodes
+    include_calls = content_parser.output.include_calls
+
+    # Store a copy of the nodes, as the
+    # ones returned here become part
+    # of the document and can be changed.
+    if memo_key:
+        parser.include_memo[memo_key] = IncludeMemoEntry(
+            nodes=_freeze_nodes(nodes),
+            include_calls=list(include_calls),
+            keys=set(recorder.keys) if recorder else set(),
+            files=dict(recorder.files) if recorder else {},
+        )
+
+    return nodes, include_calls
+
+
+def resolve_scheduled_includes(parser: DocumentParser):
+    """Wait for the included files scheduled by the
+    parser and splice their content into the nodes
+    and their include calls into the output."""
+
+    # The calls are inserted from the last one,
+    # so the positions of the others don't change.
+    for scheduled in reversed(parser.scheduled_includes):
+        nodes, include_calls = _collect_scheduled_include(parser, scheduled)
+
+        scheduled.node.content = nodes
+
+        position = scheduled.position
+        parser.output.include_calls[position:position] = include_calls
+
+    parser.scheduled_includes = []
+
+
+def _collect_scheduled_include(
+    parser: DocumentParser, scheduled: ScheduledInclude
+) -> tuple[list[Node], list[IncludeCall]]:
+    try:
+        result: IncludeResult = scheduled.future.result().result()
+    except FileNotFoundError as exc:
+        raise create_parser_exception(
+            f"File '{scheduled.uri}' cannot be read.",
+            scheduled.context,
+        ) from exc
+
+    if scheduled.recorder is not None:
+        scheduled.recorder.merge(result.keys, result.files)
+
+    # Each include gets its own copy of the
+    # content, even when the same future
+    # is shared by multiple includes.
+    nodes, include_calls = load_pickle(result.data)
+
+    parser.include_memo[scheduled.memo_key] = IncludeMemoEntry(
+        nodes=result.data,
+        include_calls=list(include_calls),
+        keys=set(result.keys),
+        files=dict(result.files),
+    )
+
+    return nodes, include_calls
+
+
+def _include_memo_key(
+    uri: str, call_arguments: dict, environment: Environment
+) -> tuple | None:
+    # The key of an included file in the memo.
+    # Files that can't be found are not memoised,
+    # and reading them reports the error.
+    # The key covers only the file itself, the
+    # files it includes are checked when the
+    # entry is used (see `IncludeMemoEntry`).
+    try:
+        stat = os.stat(uri)
+    except OSError:
+        return None
+
+    return (
+        uri,
+        stat.st_mtime_ns,
+        stat.st_size,
+        stable_hash(call_arguments),
+        # The files that are not loaded yet are
+        # hashed through their signature.
+        stable_hash(environment.asflatdict(load=False), environment.pending()),
+    )
+
+
+def _freeze_nodes(nodes: list[Node]) -> bytes | list[Node]:
+    # Store a copy of a list of top-level nodes
+    # and their subtrees. A pickled copy is much
+    # faster to clone than a list of nodes.
+    try:
+        return pickle.dumps(nodes, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+        return copy.deepcopy(nodes)
+
+
+def _clone_nodes(frozen: bytes | list[Node]) -> list[Node]:
+    # Create a new copy of the stored nodes.
+    # The copies of the nodes get a copy of
+    # their parent (the document node of the
+    # included file), so they are independent
+    # from the originals and from each other.
+    if isinstance(frozen, bytes):
+        return load_pickle(frozen)
+
+    return copy.deepcopy(frozen)
+
+
 def _parse_raw(
     parser: DocumentParser, arguments: NodeArguments, context: Context
 ) -> IncludeMauNode:
@@ -289,6 +576,25 @@ def _parse_raw(
             context,
         )
 
+    # Big files can be read only when the
+    # content is rendered. The file is still
+    # a dependency of the document.
+    if parser.environment.get("mau.parser.lazy_raw_includes", False):
+        if not os.path.isfile(uri):
+            raise create_parser_exception(
+                f"File '{uri}' cannot be read.",
+                context,
+                help_text=INCLUDE_RAW_HELP,
+            )
+
+        record_file_read(parser.environment, uri, None)
+
+        return IncludeRawNode(
+            uri,
+            info=NodeInfo(context=context),
+            raw_content=RawContent(uri=uri, context=context),
+        )
+
     # Open the given URI and read the text.
     try:
         with open(uri, "r", encoding="utf-8") as f:
@@ -300,30 +606,18 @@ def _parse_raw(
             help_text=INCLUDE_RAW_HELP,
         ) from exc
 
-    # A list of content lines (raw).
-    content_lines = content.split("\n")
-
-    # A list of raw content lines.
-    raw_lines: list[RawLineNode] = []
-
-    # Create the include node.
-    node = IncludeRawNode(uri, info=NodeInfo(context=context))
+    # The parsed document depends on this file.
+    record_file_read(parser.environment, uri, content)
 
-    # Create a raw line for each line
-    # in the inlcuded file.
-    for content_line in content_lines:
-        raw_lines.append(
-            RawLineNode(
-                content_line,
-                info=NodeInfo(context=context),
-                parent=node,
-            )
-        )
-
-    # Assign the raw lines to the include node.
-    node.content = raw_lines
-
-    return node
+    # The content is stored as it is, and the
+    # raw lines are created only if a visitor
+    # needs them. All of them get the context
+    # of the include.
+    return IncludeRawNode(
+        uri,
+        info=NodeInfo(context=context),
+        raw_content=RawContent(content, context=context),
+    )
 
 
 def _parse_toc(
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import pickle
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from mau.environment.environment import Environment
+from mau.message import BaseMessageHandler
+from mau.parsers.parse_cache import ParseRecorder, file_digest
+
+
+@dataclass
+class IncludeResult:
+    # The output of the parse of
+    # an included file in a worker.
+
+    # The top-level nodes and the include
+    # calls of the file, pickled together.
+    data: bytes
+
+    # What the parse of the file depends
+    # on (see mau.parsers.parse_cache).
+    keys: set[str] = field(default_factory=set)
+    files: dict[str, str] = field(default_factory=dict)
+
+
+# The state of a worker process that parses
+# included files. It is initialised once
+# per process.
+_include_worker_state: dict = {}
+
+
+def _init_include_worker(message_handler: BaseMessageHandler):
+    _include_worker_state["message_handler"] = message_handler
+
+
+def _parse_include_worker(
+    text: str,
+    uri: str,
+    variables: bytes,
+    include_stack: list[str],
+) -> IncludeResult:
+    # Parse an included file in a worker.
+    # Imported here as the parser
+    # imports the include processor.
+    from mau.parsers.document_parser import DocumentParser
+
+    environment = Environment()
+    flat_variables, pending = pickle.loads(variables)
+    environment.asflatdict().update(flat_variables)
+
+    for namespace, loader in pending.items():
+        environment.add_lazy(namespace, loader)
+
+    # The worker must not start another pool.
+    environment["mau.parser.include_jobs"] = 1
+
+    recorder = ParseRecorder()
+    recorder.record_file(uri, file_digest(text))
+    environment.recorder = recorder
+
+    parser = DocumentParser.lex_and_parse(
+        text,
+        _include_worker_state["message_handler"],
+        environment,
+        source_filename=uri,
+        forbidden_includes=include_stack,
+        nested=True,
+    )
+
+    data = pickle.dumps(
+        (parser.nodes, parser.output.include_calls),
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+
+    return IncludeResult(data=data, keys=recorder.keys, files=recorder.files)
+
+
+class IncludeScheduler:
+    """Parses included Mau files concurrently.
+
+    Files are read by a pool of threads, then each
+    file is parsed by a pool of processes as soon
+    as it has been read. The parser that schedules
+    an include gets a future and collects the result
+    when it is finalised (see `_parse_mau` in the
+    include processor).
+
+    The same file scheduled twice with the same
+    key shares the same future.
+    """
+
+    def __init__(self, jobs: int, message_handler: BaseMessageHandler):
+        # Imported here as starting processes
+        # requires the multiprocessing machinery,
+        # which is slow to import.
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        self.jobs = jobs
+
+        self.read_executor = ThreadPoolExecutor(max_workers=jobs)
+        self.parse_executor = ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_include_worker,
+            initargs=(message_handler,),
+        )
+
+        # The futures of the scheduled files.
+        self.futures: dict[tuple, Future] = {}
+
+    def schedule(
+        self,
+        key: tuple,
+        uri: str,
+        environment: Environment,
+        include_stack: list[str],
+    ) -> Future | None:
+        """Schedule the parse of the given file. The
+        future resolves to another future, that of the
+        parse, or raises the error that occurred
+        while the file was read. If the environment
+        can't be sent to a worker (e.g. it contains
+        a function) return None."""
+
+        try:
+            return self.futures[key]
+        except KeyError:
+            pass
+
+        try:
+            # The namespaces that are not loaded yet
+            # are sent as they are and loaded by the
+            # worker if needed.
+            variables = pickle.dumps(
+                (environment.asflatdict(load=False), environment.pending()),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return None
+
+        future = self.read_executor.submit(
+            self._read_and_submit, uri, variables, list(include_stack)
+        )
+
+        self.futures[key] = future
+
+        return future
+
+    def _read_and_submit(
+        self,
+        uri: str,
+        variables: bytes,
+        include_stack: list[str],
+    ) -> Future:
+        with open(uri, "r", encoding="utf-8") as f:
+            text = f.read()
+
+        return self.parse_executor.submit(
+            _parse_include_worker, text, uri, variables, include_stack
+        )
+
+    def shutdown(self):
+        self.read_executor.shutdown()
+        self.parse_executor.shutdown()
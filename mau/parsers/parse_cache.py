@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from collections.abc import Callable
+from pathlib import Path
+
+from mau.cache import (
+    UNPICKLING_ERRORS,
+    DiskCache,
+    load_pickle,
+    mau_version,
+    stable_hash,
+)
+from mau.environment.environment import Environment
+
+
+def file_digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def file_signature(path: str) -> tuple[int, int]:
+    # The modification time and the size of a file,
+    # used for files whose content is read later.
+    stat = os.stat(path)
+
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class ParseRecorder:
+    """Collects what a parse depends on: the keys
+    read from the environment and the files read
+    by includes (with a digest of their content,
+    or their signature if they are read later).
+    Recorders of nested parses (included files)
+    report to the recorder of the outer parse."""
+
+    def __init__(self, parent: ParseRecorder | None = None):
+        self.parent = parent
+        self.keys: set[str] = set()
+        self.files: dict[str, str | tuple[int, int]] = {}
+
+    def record_key(self, key: str):
+        recorder: ParseRecorder | None = self
+
+        while recorder is not None:
+            recorder.keys.add(key)
+            recorder = recorder.parent
+
+    def record_file(self, path: str, digest: str | tuple[int, int]):
+        recorder: ParseRecorder | None = self
+
+        while recorder is not None:
+            recorder.files.setdefault(path, digest)
+            recorder = recorder.parent
+
+    def merge(self, keys, files: dict[str, str | tuple[int, int]]):
+        # Add the dependencies of a parse
+        # that has been served by the cache.
+        for key in keys:
+            self.record_key(key)
+
+        for path, digest in files.items():
+            self.record_file(path, digest)
+
+
+def record_file_read(environment: Environment, path: str, text: str | None):
+    """Record that the current parse read the given file.
+    Include processors call this after reading a file.
+    Files that are read only when the output is rendered
+    (`text` is None) are dependencies as well, and are
+    recorded with their signature (see `file_signature`)."""
+
+    if environment.recorder is None:
+        return
+
+    if text is None:
+        environment.recorder.record_file(path, file_signature(path))
+    else:
+        environment.recorder.record_file(path, file_digest(text))
+
+
+class ParseCache:
+    """A persistent cache of parsed documents.
+
+    Entries are stored in two steps. The manifest,
+    keyed by the parser class, the Mau version, the
+    text and its position, lists the sets of environment
+    keys that parses of that text read. Each set leads
+    to an entry keyed by the values of those keys,
+    which contains the parser output, the changes the
+    parse made to the environment, and the digests of
+    the included files, that are checked on each hit.
+
+    The storage is a DiskCache, so entries are written
+    atomically and the cache can be shared by concurrent
+    processes. If two processes update the same manifest
+    at the same time one of the updates can be lost,
+    which only causes a cache miss later.
+    """
+
+    # The maximum number of key sets
+    # stored for the same text.
+    max_variants = 8
+
+    def __init__(self, directory: str | Path, max_size: int = 256 * 1024 * 1024):
+        self.storage = DiskCache(directory, max_size)
+
+        self.hits = 0
+        self.misses = 0
+
+    def _text_key(
+        self, parser_class, text, source_filename, start_line, start_column, nested
+    ):
+        # Nested parses (included files) don't run the
+        # passes on the whole tree, so their output is
+        # different from the one of the document.
+        return stable_hash(
+            f"{parser_class.__module__}.{parser_class.__qualname__}",
+            mau_version(),
+            text,
+            source_filename,
+            start_line,
+            start_column,
+            nested,
+        )
+
+    @staticmethod
+    def _entry_key(text_key: str, keys, environment: Environment) -> str:
+        # The values are read directly, so
+        # that this doesn't record anything.
+        values = [(key, _environment_value(environment, key)) for key in keys]
+
+        return stable_hash(text_key, values)
+
+    def _load(self, key: str):
+        value = self.storage.get(key)
+
+        if value is None:
+            return None
+
+        try:
+            return load_pickle(value)
+        except UNPICKLING_ERRORS:  # pragma: no cover
+            # A corrupted entry is a miss.
+            return None
+
+    def _store(self, key: str, value) -> bool:
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+            # Some values (for example functions defined
+            # in the configuration) cannot be stored.
+            return False
+
+        self.storage.set(key, data)
+
+        return True
+
+    def lex_and_parse(
+        self,
+        parser_class,
+        parse: Callable,
+        text: str,
+        message_handler,
+        environment: Environment,
+        start_line: int = 0,
+        start_column: int = 0,
+        source_filename: str | None = None,
+        **kwds,
+    ):
+        """Lex and parse the text with `parse` (a function with
+        the signature of `BaseParser.lex_and_parse`), unless
+        the cache contains the output of the same parse."""
+
+        text_key = self._text_key(
+            parser_class,
+            text,
+            source_filename,
+            start_line,
+            start_column,
+            kwds.get("nested", False),
+        )
+
+        variants = self._load(text_key) or []
+
+        for keys in variants:
+            entry = self._load(self._entry_key(text_key, keys, environment))
+
+            if entry is None or not _files_unchanged(entry["files"]):
+                continue
+
+            # The cached parse might include a file
+            # that is forbidden here. Parsing the text
+            # again reports the error.
+            forbidden_includes = kwds.get("forbidden_includes") or []
+            if any(
+                call.callee_uri in forbidden_includes
+                for call in entry["output"].include_calls
+            ):
+                break
+
+            self.hits += 1
+
+            return self._restore(
+                parser_class, entry, keys, message_handler, environment, **kwds
+            )
+
+        self.misses += 1
+
+        # Parse the text recording what the
+        # parse reads from the environment.
+        # Namespaces that are not loaded yet
+        # are left as they are.
+        before = dict(environment.asflatdict(load=False))
+        pending = environment.pending()
+        outer_recorder = environment.recorder
+        recorder = ParseRecorder(outer_recorder)
+
+        environment.recorder = recorder
+        try:
+            parser = parse(
+                text,
+                message_handler,
+                environment,
+                start_line,
+                start_column,
+                source_filename,
+                **kwds,
+            )
+        finally:
+            environment.recorder = outer_recorder
+
+        # The changes the parse made to the environment
+        # are replayed when the entry is used.
+        # Values loaded from pending namespaces
+        # are not changes made by the parse.
+        changes = {
+            key: value
+            for key, value in environment.asflatdict(load=False).items()
+            if (key not in before or before[key] is not value)
+            and not any(
+                key == namespace or key.startswith(f"{namespace}.")
+                for namespace in pending
+            )
+        }
+
+        keys = sorted(recorder.keys)
+
+        # The key of the entry depends on the
+        # values the environment had before
+        # the parse changed it.
+        before_environment = Environment()
+        before_environment.dupdate(before)
+
+        for namespace, loader in pending.items():
+            before_environment.add_lazy(namespace, loader)
+
+        entry = {
+            "nodes": parser.nodes,
+            "output": parser.output,
+            "changes": changes,
+            "files": recorder.files,
+        }
+
+        if (
+            self._store(self._entry_key(text_key, keys, before_environment), entry)
+            and keys not in variants
+        ):
+            variants = [keys, *variants][: self.max_variants]
+            self._store(text_key, variants)
+
+        # Keep the cache within its maximum size
+        # once the whole document has been parsed.
+        if outer_recorder is None:
+            self.prune()
+
+        return parser
+
+    def _restore(self, parser_class, entry, keys, message_handler, environment, **kwds):
+        # Build a parser that contains the cached
+        # output, as if it had parsed the text.
+        parser = parser_class([], message_handler, environment, **kwds)
+        parser.nodes = entry["nodes"]
+        parser.output = entry["output"]
+
+        # The document node is the parent of all the
+        # top-level nodes and needs to be the same
+        # object the parser would have created.
+        if parser.output.document is not None:
+            parser.parent_node = parser.output.document
+
+        environment.asflatdict(load=False).update(entry["changes"])
+
+        # An outer parse depends on
+        # everything this one read.
+        if environment.recorder is not None:
+            environment.recorder.merge(keys, entry["files"])
+
+        return parser
+
+    def prune(self) -> int:
+        return self.storage.prune()
+
+
+def read_unrecorded(environment: Environment, key: str, default=None):
+    """Read a value of the environment without recording
+    the read. This is used for the configuration values
+    that don't change the parsed tree."""
+
+    recorder = environment.recorder
+    environment.recorder = None
+
+    try:
+        return environment.get(key, default)
+    finally:
+        environment.recorder = recorder
+
+
+def _environment_value(environment: Environment, key: str):
+    value = read_unrecorded(environment, key)
+
+    if isinstance(value, Environment):
+        return value.asflatdict()
+
+    return value
+
+
+def _files_unchanged(files: dict[str, str | tuple[int, int]]) -> bool:
+    for path, digest in files.items():
+        # Files read later are checked
+        # without reading them.
+        if isinstance(digest, tuple):
+            try:
+                if file_signature(path) != digest:
+                    return False
+            except OSError:
+                return False
+
+            continue
+
+        try:
+            with open(path, encoding="utf-8") as included_file:
+                text = included_file.read()
+        except OSError:
+            return False
+
+        if file_digest(text) != digest:
+            return False
+
+    return True
+
+
+# The caches used by the parsers,
+# indexed by their configuration.
+_parse_caches: dict[tuple, ParseCache] = {}
+
+
+def get_parse_cache(environment: Environment) -> ParseCache | None:
+    """Return the parse cache configured in the
+    environment (`mau.parser.cache.*`), if any."""
+
+    # This is read without recording,
+    # as the configuration of the cache
+    # doesn't change the parsed tree.
+    if not read_unrecorded(environment, "mau.parser.cache.enabled", True):
+        return None
+
+    path = read_unrecorded(environment, "mau.parser.cache.path")
+    if not path:
+        return None
+
+    max_size = read_unrecorded(
+        environment, "mau.parser.cache.max_size", 256 * 1024 * 1024
+    )
+
+    key = (Path(path).absolute().as_posix(), max_size)
+
+    try:
+        return _parse_caches[key]
+    except KeyError:
+        pass
+
+    cache = _parse_caches[key] = ParseCache(path, max_size)
+
+    return cache
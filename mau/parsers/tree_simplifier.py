@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from mau.nodes.inline import StyleNode, TextNode
+from mau.nodes.node import Node, NodeInfo, WrapperNode, child_values
+from mau.nodes.node_arguments import NodeArguments
+from mau.text_buffer import Context
+
+
+@dataclass
+class TreeSimplifier:
+    """A pass that simplifies a parsed tree
+    removing nodes that add only overhead
+    to the visitors.
+
+    * `merge_text` merges adjacent text nodes into
+      a single one, merging their contexts.
+    * `unwrap` replaces plain wrapper nodes (of type
+      `wrapper`, without arguments) with their content.
+    * `remove_empty_styles` removes style nodes
+      without content.
+
+    The output doesn't change as long as text is
+    rendered as it is (e.g. `{{ value }}`), which is
+    why merging text nodes is safe for the core visitors.
+    Templates for styles usually add markup even when
+    the content is empty, so removing empty styles is
+    disabled by default.
+    """
+
+    merge_text: bool = True
+    unwrap: bool = True
+    remove_empty_styles: bool = False
+
+    def process(self, node: Node | None) -> int:
+        # Simplify the tree starting from the
+        # given node and return the number
+        # of removed nodes.
+        self._seen: set[int] = set()
+        self._removed = 0
+
+        if node is not None:
+            self._simplify_node(node)
+
+        return self._removed
+
+    def _simplify_node(self, node: Node):
+        # Nodes can be referenced more than once
+        # (for example by the ToC or by header
+        # links), but are simplified only once.
+        if id(node) in self._seen:
+            return
+
+        self._seen.add(id(node))
+
+        for value in child_values(node):
+            if isinstance(value, Node):
+                self._simplify_node(value)
+            else:
+                self._simplify_list(node, value)
+
+    def _simplify_list(self, owner: Node, nodes: list):
+        # Lists that don't contain nodes
+        # (e.g. a list of strings) are skipped.
+        if not any(isinstance(i, Node) for i in nodes):
+            return
+
+        for node in nodes:
+            if isinstance(node, Node):
+                self._simplify_node(node)
+
+        result: list = []
+
+        for node in nodes:
+            self._append(owner, result, node)
+
+        # The list is changed in place, as
+        # other objects might refer to it.
+        nodes[:] = result
+
+    def _append(self, owner: Node, result: list, node):
+        # Add the node to the simplified list.
+        if self.unwrap and self._is_plain_wrapper(node):
+            # The content replaces the wrapper
+            # and is adopted by its parent.
+            self._removed += 1
+
+            for child in node.content:
+                child.parent = owner
+                self._append(owner, result, child)
+
+            return
+
+        if self.remove_empty_styles and type(node) is StyleNode and not node.content:
+            self._removed += 1
+
+            return
+
+        if self.merge_text and result and self._can_merge(result[-1], node):
+            result[-1] = self._merge_text_nodes(result[-1], node)
+            self._removed += 1
+
+            return
+
+        result.append(node)
+
+    @staticmethod
+    def _is_plain_wrapper(node) -> bool:
+        return (
+            type(node) is WrapperNode
+            and node.type == "wrapper"
+            and node.arguments == NodeArguments()
+        )
+
+    @staticmethod
+    def _can_merge(first, second) -> bool:
+        # Only plain text nodes can be merged.
+        return (
+            type(first) is TextNode
+            and type(second) is TextNode
+            and first.arguments == NodeArguments()
+            and second.arguments == NodeArguments()
+        )
+
+    @staticmethod
+    def _merge_text_nodes(first: TextNode, second: TextNode) -> TextNode:
+        context = Context.merge_contexts(first.info.context, second.info.context)
+
+        return TextNode(
+            first.value + second.value,
+            parent=first.parent,
+            info=NodeInfo(context=context),
+        )
@@ -1,5 +1,7 @@
-from collections.abc import Mapping, Sequence
-from typing import Type
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Mapping, MutableMapping, Sequence
+from typing import Any, ClassVar, Type
 
 from mau.environment.environment import Environment
 from mau.message import (
@@ -73,11 +75,232 @@ def create_visitor_exception(
     return MauException(message)
 
 
+class NodeData(MutableMapping):
+    """The data extracted from a node by a visitor.
+
+    This mapping behaves like a dictionary, but some
+    of its values can be lazy, that is computed only
+    when they are accessed for the first time.
+    Lazy values are created by functions that receive
+    the mapping itself, and can use the visited node,
+    the visitor, and the keyword arguments of the visit
+    (attributes `node`, `visitor`, and `kwargs`).
+    """
+
+    __slots__ = ("_lazy", "_values", "kwargs", "node", "visitor")
+
+    def __init__(
+        self,
+        values: dict | None = None,
+        lazy_values: dict[str, Callable[[NodeData], Any]] | None = None,
+        node: Node | None = None,
+        visitor: BaseVisitor | None = None,
+        kwargs: dict | None = None,
+    ):
+        self.node = node
+        self.visitor = visitor
+        self.kwargs = kwargs or {}
+
+        # The values that have already been computed.
+        self._values: dict[str, Any] = values or {}
+
+        # The functions that compute the lazy values.
+        self._lazy: dict[str, Callable[[NodeData], Any]] = lazy_values or {}
+
+    def set_lazy(self, key: str, factory: Callable[[NodeData], Any]):
+        # Store a function that will compute
+        # the value of the key when needed.
+        self._values.pop(key, None)
+        self._lazy[key] = factory
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+
+        # This raises KeyError if the
+        # key is not a lazy value either.
+        factory = self._lazy.pop(key)
+
+        value = self._values[key] = factory(self)
+
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self._lazy.pop(key, None)
+        self._values[key] = value
+
+    def __delitem__(self, key: str):
+        if self._lazy.pop(key, None) is None:
+            del self._values[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values or key in self._lazy
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._values
+        yield from list(self._lazy)
+
+    def __len__(self) -> int:
+        return len(self._values) + len(self._lazy)
+
+    def update(self, other=(), /, **kwargs):
+        # This is faster than the generic
+        # implementation of MutableMapping.
+        other = dict(other, **kwargs)
+
+        for key in other.keys() & self._lazy.keys():
+            del self._lazy[key]
+
+        self._values.update(other)
+
+    def copy(self) -> NodeData:
+        # A shallow copy that shares the
+        # lazy functions but not their results.
+        # Jinja copies the variables when it
+        # rewrites the traceback of an error.
+        return NodeData(
+            dict(self._values),
+            dict(self._lazy),
+            node=self.node,
+            visitor=self.visitor,
+            kwargs=self.kwargs,
+        )
+
+    def __reduce__(self):
+        # Pickle only the values that have been
+        # computed. The lazy functions and the
+        # visitor cannot be sent to other processes.
+        return (NodeData, (dict(self._values),))
+
+    def asdict(self) -> dict:
+        # Compute all lazy values and return
+        # the whole structure as plain
+        # dictionaries and lists.
+        return materialize(self)
+
+    def __repr__(self):
+        return repr(self.asdict())
+
+
+def materialize(
+    value: Any,
+    skip_keys: Sequence[str] = (),
+    contexts: dict[tuple, int] | None = None,
+) -> Any:
+    """Convert all the mappings contained
+    in the given value into plain dictionaries,
+    computing the lazy values of NodeData objects.
+
+    Keys listed in `skip_keys` are removed from all
+    mappings, and their lazy values are never computed.
+    If `contexts` is a dictionary, each value of the
+    key `_context` is replaced by its index in it,
+    so that equal contexts are stored only once."""
+
+    if not skip_keys and contexts is None:
+        return _materialize(value)
+
+    if isinstance(value, Mapping):
+        result = {}
+
+        for key in value:
+            if key in skip_keys:
+                continue
+
+            item = value[key]
+
+            if key == "_context" and contexts is not None and item:
+                context_key = tuple(item.items())
+                item = contexts.setdefault(context_key, len(contexts))
+            else:
+                item = materialize(item, skip_keys, contexts)
+
+            result[key] = item
+
+        return result
+
+    if isinstance(value, list):
+        return [materialize(i, skip_keys, contexts) for i in value]
+
+    return value
+
+
+def _materialize(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {k: _materialize(v) for k, v in value.items()}
+
+    if isinstance(value, list):
+        return [_materialize(i) for i in value]
+
+    return value
+
+
+# These functions compute the lazy
+# values of the visited nodes.
+
+
+def _lazy_context(data: NodeData) -> dict:
+    return data.node.info.context.asdict()
+
+
+def _lazy_named_args(data: NodeData) -> Mapping:
+    return data.node.arguments.named_args
+
+
+def _lazy_parent(data: NodeData) -> Mapping:
+    return data.visitor._get_node_data(data.node.parent)
+
+
+def _lazy_content(data: NodeData) -> Any:
+    return data.visitor.visitlist(data.node, data.node.content, **data.kwargs)
+
+
+def _lazy_labels(data: NodeData) -> Any:
+    return data.visitor.visitdictlist(data.node, data.node.labels, **data.kwargs)
+
+
 class BaseVisitor:
     # The output format that identifies this visitor.
     format_code = "python"
     extension = ""
 
+    # The dispatch table maps node types to
+    # the methods that visit them. Each visitor
+    # class has its own table, so subclasses and
+    # plugin visitors never share entries. The
+    # table is filled the first time a node
+    # type is visited.
+    _dispatch_table: ClassVar[dict[str, Callable]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch_table = {}
+
+    @classmethod
+    def _dispatch(cls, node_type: str) -> Callable:
+        # Find the method that visits nodes
+        # of the given type and store it
+        # in the dispatch table.
+        try:
+            return cls._dispatch_table[node_type]
+        except KeyError:
+            pass
+
+        # Some node types contain a dash,
+        # but dashes are not allowed
+        # in function names.
+        method_name = f"_visit_{node_type.replace('-', '_')}"
+
+        # Use the default method if the
+        # visitor doesn't have a specific one.
+        method = getattr(cls, method_name, cls._visit_default)
+
+        cls._dispatch_table[node_type] = method
+
+        return method
+
     def __init__(
         self,
         message_handler: BaseMessageHandler,
@@ -110,6 +333,14 @@ class BaseVisitor:
 
         return result
 
+    def process_iter(self, node: Node | None, **kwargs) -> Iterator:
+        # This is the streaming version of `process`.
+        # It yields the output in chunks, so visitors
+        # that can render a document piece by piece
+        # don't need to keep the whole output in memory.
+        # The base visitor produces a single chunk.
+        yield self.process(node, **kwargs)
+
     def _preprocess(self, node: Node | None, **kwargs):
         # The base visitor has no
         # preprocess code.
@@ -144,10 +375,10 @@ class BaseVisitor:
 
     def visit(self, node: Node | None, **kwargs):
         # Simple implementation of the visitor pattern.
-        # Here, the visitor passes itself to the node
-        # through the method `accept`
-        # The node calls a suitable method of the
-        # visitor, and the result is returned here.
+        # The method that visits the node is found
+        # in the dispatch table of the visitor class,
+        # which avoids building the name of the method
+        # and looking it up for every node.
         #
         # All visitor functions return a dictionary with
         # the key "data" that contains the result of the visit.
@@ -157,7 +388,12 @@ class BaseVisitor:
         if node is None:
             return {}
 
-        result = node.accept(self, **kwargs)
+        try:
+            method = self._dispatch_table[node.type]
+        except KeyError:
+            method = self._dispatch(node.type)
+
+        result = method(self, node, **kwargs)
 
         # Get the internal tags from
         # the output. Check if they activate
@@ -190,39 +426,44 @@ class BaseVisitor:
             for k, nodes in nodes_dict.items()
         }
 
-    def _add_visit_content(self, result: dict, node: Node, **kwargs):
-        result.update(
-            {
-                "content": self.visitlist(node, node.content, **kwargs),
-            }
-        )
+    def _add_visit_content(self, result: NodeData, node: Node, **kwargs):
+        # The content is visited only if needed.
+        result.set_lazy("content", _lazy_content)
 
-    def _add_visit_labels(self, result: dict, node: Node, **kwargs):
-        result.update(
-            {
-                "labels": self.visitdictlist(node, node.labels, **kwargs),
-            }
-        )
+    def _add_visit_labels(self, result: NodeData, node: Node, **kwargs):
+        # The labels are visited only if needed.
+        result.set_lazy("labels", _lazy_labels)
 
-    def _get_node_data(self, node: Node, **kwargs) -> dict:
+    def _get_node_data(self, node: Node, **kwargs) -> NodeData:
         if not node:
-            return {}
+            return NodeData()
 
-        return {
-            "_type": node.type,
-            "_context": node.info.context.asdict(),
-            "unnamed_args": node.arguments.unnamed_args,
-            "named_args": node.arguments.named_args,
-            "tags": node.arguments.tags,
-            "internal_tags": node.arguments.internal_tags,
-            "subtype": node.arguments.subtype,
-        }
+        return NodeData(
+            {
+                "_type": node.type,
+                "unnamed_args": node.arguments.unnamed_args,
+                "tags": node.arguments.tags,
+                "internal_tags": node.arguments.internal_tags,
+                "subtype": node.arguments.subtype,
+            },
+            # These values are computed only if needed.
+            {
+                "_context": _lazy_context,
+                "named_args": _lazy_named_args,
+            },
+            node=node,
+            visitor=self,
+            kwargs=kwargs,
+        )
 
-    def _visit_default(self, node: Node, **kwargs) -> dict:
+    def _visit_default(self, node: Node, **kwargs) -> NodeData:
         # This is the default code to visit a node.
 
-        data = self._get_node_data(node)
-        data["parent"] = self._get_node_data(node.parent)
+        data = self._get_node_data(node, **kwargs)
+
+        # The data of the parent node
+        # are computed only if needed.
+        data.set_lazy("parent", _lazy_parent)
 
         return data
 
@@ -0,0 +1,242 @@
+import struct
+
+from mau.visitors.data_visitor import DataVisitor
+
+# The visitor encodes the tree with MessagePack
+# (https://msgpack.org), a compact binary format
+# that can be read in most languages. Only the
+# types needed by the visitor are supported.
+
+_UINT8 = struct.Struct(">B")
+_UINT16 = struct.Struct(">H")
+_UINT32 = struct.Struct(">I")
+_UINT64 = struct.Struct(">Q")
+_INT8 = struct.Struct(">b")
+_INT16 = struct.Struct(">h")
+_INT32 = struct.Struct(">i")
+_INT64 = struct.Struct(">q")
+_FLOAT64 = struct.Struct(">d")
+
+
+def _pack_length(parts: list, length: int, fix: int, fix_max: int, codes: bytes):
+    # Store the header of a sequence of the given
+    # length, using the shortest available code.
+    # The codes are those for 8 (or 16), 16,
+    # and 32 bits lengths, in this order.
+    if length < fix_max:
+        parts.append(_UINT8.pack(fix | length))
+    elif codes[0] and length < 0x100:
+        parts.append(bytes((codes[0], length)))
+    elif length < 0x10000:
+        parts.append(bytes((codes[1],)) + _UINT16.pack(length))
+    elif length < 0x100000000:
+        parts.append(bytes((codes[2],)) + _UINT32.pack(length))
+    else:
+        raise ValueError(f"Object too large for MessagePack ({length})")
+
+
+def _pack_int(parts: list, value: int):
+    if 0 <= value < 0x80:
+        parts.append(_UINT8.pack(value))
+    elif -0x20 <= value < 0:
+        parts.append(_INT8.pack(value))
+    elif 0 <= value < 0x100:
+        parts.append(b"\xcc" + _UINT8.pack(value))
+    elif 0 <= value < 0x10000:
+        parts.append(b"\xcd" + _UINT16.pack(value))
+    elif 0 <= value < 0x100000000:
+        parts.append(b"\xce" + _UINT32.pack(value))
+    elif 0 <= value < 0x10000000000000000:
+        parts.append(b"\xcf" + _UINT64.pack(value))
+    elif -0x80 <= value < 0:
+        parts.append(b"\xd0" + _INT8.pack(value))
+    elif -0x8000 <= value < 0:
+        parts.append(b"\xd1" + _INT16.pack(value))
+    elif -0x80000000 <= value < 0:
+        parts.append(b"\xd2" + _INT32.pack(value))
+    elif -0x8000000000000000 <= value < 0:
+        parts.append(b"\xd3" + _INT64.pack(value))
+    else:
+        raise ValueError(f"Integer out of range for MessagePack ({value})")
+
+
+def pack(value) -> bytes:
+    """Encode the given value with MessagePack.
+
+    Supported types are None, booleans, integers,
+    floats, strings, bytes, lists, tuples, and
+    dictionaries."""
+
+    parts: list[bytes] = []
+    append = parts.append
+
+    # Keys and short values are repeated
+    # many times in the tree, so their
+    # encoding is computed only once.
+    strings: dict[str, bytes] = {}
+
+    def _pack(value):
+        cls = type(value)
+
+        if cls is str:
+            try:
+                append(strings[value])
+                return
+            except KeyError:
+                pass
+
+            encoded = value.encode()
+            string_parts: list[bytes] = []
+            _pack_length(string_parts, len(encoded), 0xA0, 0x20, b"\xd9\xda\xdb")
+            string_parts.append(encoded)
+
+            result = b"".join(string_parts)
+            if len(encoded) < 64:
+                strings[value] = result
+
+            append(result)
+        elif value is None:
+            append(b"\xc0")
+        elif value is True:
+            append(b"\xc3")
+        elif value is False:
+            append(b"\xc2")
+        elif cls is int:
+            _pack_int(parts, value)
+        elif cls is float:
+            append(b"\xcb" + _FLOAT64.pack(value))
+        elif cls is dict:
+            _pack_length(parts, len(value), 0x80, 0x10, b"\x00\xde\xdf")
+
+            for key, item in value.items():
+                _pack(key)
+                _pack(item)
+        elif cls is list or cls is tuple:
+            _pack_length(parts, len(value), 0x90, 0x10, b"\x00\xdc\xdd")
+
+            for item in value:
+                _pack(item)
+        elif cls is bytes:
+            _pack_length(parts, len(value), 0, 0, b"\xc4\xc5\xc6")
+            append(value)
+        elif isinstance(value, (str, int, float, bytes, list, tuple, dict)):
+            # Subclasses of the supported
+            # types are stored as the base type.
+            for base in (str, bool, int, float, bytes, list, dict):
+                if isinstance(value, base):
+                    _pack(base(value))
+                    return
+
+            _pack(list(value))
+        else:
+            raise TypeError(f"Cannot encode {cls.__name__} with MessagePack")
+
+    _pack(value)
+
+    return b"".join(parts)
+
+
+def unpack(data: bytes):
+    """Decode a value encoded with MessagePack.
+    Extension types are not supported."""
+
+    view = memoryview(data)
+    position = 0
+
+    def _read(size: int) -> memoryview:
+        nonlocal position
+
+        if position + size > len(view):
+            raise ValueError("Truncated MessagePack data")
+
+        chunk = view[position : position + size]
+        position += size
+
+        return chunk
+
+    def _read_struct(unpacker: struct.Struct):
+        return unpacker.unpack(_read(unpacker.size))[0]
+
+    def _unpack():
+        code = _read(1)[0]
+
+        if code < 0x80:
+            return code
+
+        if code >= 0xE0:
+            return code - 0x100
+
+        if 0xA0 <= code < 0xC0:
+            return str(_read(code & 0x1F), "utf-8")
+
+        if 0x90 <= code < 0xA0:
+            return [_unpack() for _ in range(code & 0x0F)]
+
+        if 0x80 <= code < 0x90:
+            return {_unpack(): _unpack() for _ in range(code & 0x0F)}
+
+        if code == 0xC0:
+            return None
+
+        if code == 0xC2:
+            return False
+
+        if code == 0xC3:
+            return True
+
+        if code in _INTEGERS:
+            return _read_struct(_INTEGERS[code])
+
+        if code == 0xCA:
+            return struct.unpack(">f", _read(4))[0]
+
+        if code == 0xCB:
+            return _read_struct(_FLOAT64)
+
+        if code in _STRINGS:
+            return str(_read(_read_struct(_STRINGS[code])), "utf-8")
+
+        if code in _BINARIES:
+            return bytes(_read(_read_struct(_BINARIES[code])))
+
+        if code in _ARRAYS:
+            return [_unpack() for _ in range(_read_struct(_ARRAYS[code]))]
+
+        if code in _MAPS:
+            return {_unpack(): _unpack() for _ in range(_read_struct(_MAPS[code]))}
+
+        raise ValueError(f"Unsupported MessagePack code {code:#x}")
+
+    value = _unpack()
+
+    if position != len(view):
+        raise ValueError("Extra data after MessagePack value")
+
+    return value
+
+
+_INTEGERS = {
+    0xCC: _UINT8,
+    0xCD: _UINT16,
+    0xCE: _UINT32,
+    0xCF: _UINT64,
+    0xD0: _INT8,
+    0xD1: _INT16,
+    0xD2: _INT32,
+    0xD3: _INT64,
+}
+_STRINGS = {0xD9: _UINT8, 0xDA: _UINT16, 0xDB: _UINT32}
+_BINARIES = {0xC4: _UINT8, 0xC5: _UINT16, 0xC6: _UINT32}
+_ARRAYS = {0xDC: _UINT16, 0xDD: _UINT32}
+_MAPS = {0xDE: _UINT16, 0xDF: _UINT32}
+
+
+class BinaryVisitor(DataVisitor):
+    """A visitor that outputs the tree
+    encoded with MessagePack."""
+
+    format_code = "msgpack"
+    extension = "msgpack"
+
+    def serialize(self, data):
+        return pack(data)
@@ -0,0 +1,47 @@
+from abc import ABC, abstractmethod
+
+from mau.visitors.base_visitor import BaseVisitor, materialize
+
+
+class DataVisitor(BaseVisitor, ABC):
+    """A visitor that outputs the visited tree as
+    plain data (dictionaries, lists, and scalars)
+    serialised by the method `serialize`.
+
+    The configuration can make the output smaller:
+
+    * `mau.visitor.strip_parent` removes the data
+      of the parent from each node.
+    * `mau.visitor.intern_contexts` stores each context
+      once in a side table. The output becomes a mapping
+      with the keys `contexts` (the table) and `tree`
+      (the data), and the key `_context` of each node
+      contains an index in the table.
+    """
+
+    @abstractmethod
+    def serialize(self, data): ...
+
+    def _tree_data(self, result):
+        skip_keys = ()
+        if self.environment.get("mau.visitor.strip_parent", False):
+            skip_keys = ("parent",)
+
+        if not self.environment.get("mau.visitor.intern_contexts", False):
+            # The visitor creates lazy mappings,
+            # while serialisers need the
+            # full structure.
+            return materialize(result, skip_keys)
+
+        contexts: dict[tuple, int] = {}
+        tree = materialize(result, skip_keys, contexts)
+
+        return {
+            "contexts": [dict(context) for context in contexts],
+            "tree": tree,
+        }
+
+    def _postprocess(self, result, **kwargs):
+        result = super()._postprocess(result, **kwargs)
+
+        return self.serialize(self._tree_data(result))
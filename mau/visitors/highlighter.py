@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from importlib.util import find_spec
+
+from mau.cache import DiskCache, stable_hash
+from mau.nodes.node import Node, child_values
+from mau.nodes.source import SourceNode
+
+logger = logging.getLogger(__name__)
+
+
+def highlight_code(
+    language: str, code: str, formatter: str, options: dict
+) -> list[str] | None:
+    """Highlight the code with Pygments and return
+    the highlighted lines. Return None if the
+    language is not supported."""
+
+    # Pygments is imported only if
+    # highlighting is requested.
+    from pygments import highlight
+    from pygments.formatters import get_formatter_by_name
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+
+    try:
+        # Empty lines at the beginning and at the
+        # end of the code must be kept, or the
+        # highlighted lines won't match the code.
+        lexer = get_lexer_by_name(language, stripnl=False)
+    except ClassNotFound:
+        return None
+
+    output = highlight(code, lexer, get_formatter_by_name(formatter, **options))
+
+    # Pygments adds a final newline
+    # if the code doesn't end with one.
+    if not code.endswith("\n"):
+        output = output.removesuffix("\n")
+
+    lines = output.split("\n")
+
+    # The formatter might not keep the
+    # lines of the code (e.g. if it adds
+    # a header), so its output is useless.
+    if len(lines) != code.count("\n") + 1:
+        return None
+
+    return lines
+
+
+def _highlight_worker(request: tuple) -> list[str] | None:
+    return highlight_code(*request)
+
+
+@dataclass
+class SourceHighlighter:
+    """A pass that highlights the code of all the
+    source nodes of a document with Pygments.
+
+    The highlighter runs once for each unique
+    combination of language and code, and the
+    result is stored in the node as a list of
+    highlighted lines (`highlighted_lines`).
+
+    * `formatter` and `options` select the Pygments
+      formatter and its options. The HTML formatter
+      outputs only the highlighted code by default.
+    * `cache` is an optional DiskCache, where the
+      results are stored by a hash of the language,
+      the code, the formatter, and the options.
+    * `jobs` is the number of processes used to
+      highlight the code that is not in the cache.
+    """
+
+    formatter: str = "html"
+    options: dict = field(default_factory=dict)
+    cache: DiskCache | None = None
+    jobs: int = 1
+
+    hits: int = 0
+    misses: int = 0
+
+    @staticmethod
+    def is_available() -> bool:
+        return find_spec("pygments") is not None
+
+    def _options(self) -> dict:
+        if self.formatter == "html":
+            return {"nowrap": True, **self.options}
+
+        return self.options
+
+    def _cache_key(self, language: str, code: str, options: dict) -> str:
+        from pygments import __version__ as pygments_version
+
+        return stable_hash(
+            "highlight", pygments_version, language, code, self.formatter, options
+        )
+
+    def process(self, node: Node | None) -> int:
+        # Highlight the source nodes found in
+        # the tree starting from the given node.
+        # Return the number of highlighted nodes.
+        requests: dict[tuple[str, str], list[SourceNode]] = {}
+
+        for source_node in find_source_nodes(node):
+            code = source_node.code
+
+            if not code:
+                continue
+
+            language = source_node.language or "text"
+            requests.setdefault((language, code), []).append(source_node)
+
+        options = self._options()
+        results: dict[tuple[str, str], list[str] | None] = {}
+        misses: list[tuple[str, str]] = []
+
+        for key in requests:
+            cached = self._cache_get(*key, options)
+
+            if cached is None:
+                misses.append(key)
+                continue
+
+            results[key] = cached
+
+        self.hits += len(results)
+        self.misses += len(misses)
+
+        for key, lines in zip(misses, self._highlight(misses, options)):
+            results[key] = lines
+
+            if lines is not None and self.cache is not None:
+                self.cache.set(
+                    self._cache_key(*key, options), "\n".join(lines).encode("utf-8")
+                )
+
+        highlighted = 0
+
+        for key, source_nodes in requests.items():
+            lines = results[key]
+
+            if lines is None:
+                continue
+
+            for source_node in source_nodes:
+                source_node.highlighted_lines = lines
+                highlighted += 1
+
+        logger.info(
+            "Highlighted %d source nodes (%d cached, %d highlighted)",
+            highlighted,
+            len(results) - len(misses),
+            len(misses),
+        )
+
+        return highlighted
+
+    def _cache_get(self, language: str, code: str, options: dict) -> list[str] | None:
+        if self.cache is None:
+            return None
+
+        value = self.cache.get(self._cache_key(language, code, options))
+
+        if value is None:
+            return None
+
+        return value.decode("utf-8").split("\n")
+
+    def _highlight(
+        self, keys: list[tuple[str, str]], options: dict
+    ) -> list[list[str] | None]:
+        requests = [
+            (language, code, self.formatter, options) for language, code in keys
+        ]
+
+        if self.jobs <= 1 or len(requests) < 2:
+            return [_highlight_worker(request) for request in requests]
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Highlighting is CPU-bound,
+        # so it runs in processes.
+        with ProcessPoolExecutor(max_workers=min(self.jobs, len(requests))) as executor:
+            chunksize = max(1, len(requests) // (self.jobs * 4))
+
+            return list(executor.map(_highlight_worker, requests, chunksize=chunksize))
+
+
+def find_source_nodes(node: Node | None) -> list[SourceNode]:
+    # Find all the source nodes in the tree.
+    # Nodes can be referenced more than once
+    # (for example by the ToC), but are
+    # returned only once.
+    found: list[SourceNode] = []
+    seen: set[int] = set()
+    stack = [node] if node is not None else []
+
+    while stack:
+        current = stack.pop()
+
+        if id(current) in seen:
+            continue
+
+        seen.add(id(current))
+
+        if isinstance(current, SourceNode):
+            found.append(current)
+
+            # Source nodes contain only lines.
+            continue
+
+        children: list[Node] = []
+
+        for value in child_values(current):
+            if isinstance(value, Node):
+                children.append(value)
+            else:
+                children.extend(item for item in value if isinstance(item, Node))
+
+        # Visit the children in order.
+        stack.extend(reversed(children))
+
+    return found
@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Mapping
+from html import escape
+from typing import ClassVar
+
+from mau.nodes.node import Node
+from mau.nodes.raw import RawLineNode
+from mau.nodes.source import SourceLineNode
+from mau.visitors.jinja_visitor import JinjaVisitor, template_signature
+
+# The HTML tags used for inline styles.
+STYLE_TAGS = {
+    "star": "strong",
+    "underscore": "em",
+    "caret": "sup",
+    "tilde": "sub",
+}
+
+
+def html_attributes(**attributes) -> str:
+    """Build a string of HTML attributes. Attributes
+    whose value is None or an empty string or list
+    are skipped. Lists are joined with spaces, which
+    is useful for classes. Names ending with an
+    underscore (like `class_`) lose it."""
+
+    result = []
+
+    for name, value in attributes.items():
+        if value is None or value == "" or value == []:
+            continue
+
+        if isinstance(value, (list, tuple)):
+            value = " ".join(value)
+
+        result.append(f' {name.removesuffix("_")}="{escape(str(value))}"')
+
+    return "".join(result)
+
+
+class HtmlVisitor(JinjaVisitor):
+    """A visitor that renders HTML without templates.
+
+    Each node type is rendered by a method called
+    `_html_TYPE` (dashes in the type become underscores)
+    that receives the node and the visited data, and
+    returns a string. Subclasses can override any of
+    them. User-provided templates are still supported:
+    if a template matches a node, it is rendered with
+    Jinja as JinjaVisitor would do.
+    """
+
+    format_code = "html"
+
+    # The table that maps node types to HTML
+    # methods. Like the dispatch table of the
+    # visitor, each class has its own.
+    _html_dispatch_table: ClassVar[dict[str, Callable]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._html_dispatch_table = {}
+
+    @classmethod
+    def _html_dispatch(cls, node_type: str) -> Callable:
+        # Find the method that renders nodes of the
+        # given type and store it in the table.
+        try:
+            return cls._html_dispatch_table[node_type]
+        except KeyError:
+            pass
+
+        method_name = f"_html_{node_type.replace('-', '_')}"
+        method = getattr(cls, method_name, cls._html_default)
+
+        cls._html_dispatch_table[node_type] = method
+
+        return method
+
+    def _find_user_template(self, node: Node):
+        # Find a user-provided template that matches
+        # the node. The result, None included, is
+        # cached like the one of JinjaVisitor.
+        if not self.templates.get(node.template_type):
+            return None
+
+        signature = template_signature(node)
+        prefixes = tuple(self.template_prefixes)
+        cache_key = (signature, prefixes)
+
+        try:
+            return self.templates_cache[cache_key]
+        except KeyError:
+            pass
+
+        template = self._resolve_template(signature, prefixes)
+        self.templates_cache[cache_key] = template
+
+        return template
+
+    def _render_node(self, node: Node, data: Mapping) -> str:
+        # Templates provided by the user
+        # take precedence over the methods.
+        if self._find_user_template(node):
+            return super()._render_node(node, data)
+
+        return self._html_dispatch(node.type)(self, node, data)
+
+    def _render_node_iter(self, node: Node, data: Mapping) -> Iterator[str]:
+        if self._find_user_template(node):
+            yield from super()._render_node_iter(node, data)
+            return
+
+        yield self._html_dispatch(node.type)(self, node, data)
+
+    def _render_raw_lines(self, node: Node) -> str | None:
+        # Without a template for the lines, their
+        # value is the output and they can be
+        # joined directly.
+        probe = RawLineNode("", parent=node)
+
+        if (
+            self._find_user_template(probe)
+            or self._html_dispatch("raw-line") is not HtmlVisitor._html_raw_line
+            or node.raw_content is None
+            or node.has_line_nodes
+        ):
+            return super()._render_raw_lines(node)
+
+        join_with = self.join_with.get(node.type, self.join_with_default)
+
+        return join_with.join(node.raw_content.lines())
+
+    def _render_source_lines(self, node: Node) -> str | None:
+        # Without a template for the lines, they
+        # can be rendered without creating nodes.
+        probe = SourceLineNode("", "", parent=node)
+
+        if (
+            self._find_user_template(probe)
+            or self._html_dispatch("source-line") is not HtmlVisitor._html_source_line
+            or node.source_content is None
+            or node.has_line_nodes
+        ):
+            return super()._render_source_lines(node)
+
+        highlighted_lines = node.highlighted_lines or []
+        rendered_lines = []
+
+        for index, (_, line_content, highlight_style, marker) in enumerate(
+            node.source_content.lines()
+        ):
+            data = {
+                "line_content": line_content,
+                "highlight_style": highlight_style,
+                "marker": self._html_source_marker(node, {"value": marker})
+                if marker
+                else "",
+            }
+
+            if highlighted_lines:
+                data["highlighted_line"] = highlighted_lines[index]
+
+            rendered_lines.append(self._html_source_line(node, data))
+
+        join_with = self.join_with.get(node.type, self.join_with_default)
+
+        return join_with.join(rendered_lines)
+
+    def _html_default(self, node: Node, data: Mapping) -> str:
+        # Nodes without a specific method
+        # render their content, if any.
+        return data.get("content", "")
+
+    def _html_document(self, node: Node, data: Mapping) -> str:
+        return data["content"]
+
+    def _html_text(self, node: Node, data: Mapping) -> str:
+        return escape(data["value"], quote=False)
+
+    def _html_word(self, node: Node, data: Mapping) -> str:
+        return escape(data["value"], quote=False)
+
+    def _html_verbatim(self, node: Node, data: Mapping) -> str:
+        return f"<code>{escape(data['value'], quote=False)}</code>"
+
+    def _html_style(self, node: Node, data: Mapping) -> str:
+        tag = STYLE_TAGS.get(data["style"], "span")
+
+        return f"<{tag}>{data['content']}</{tag}>"
+
+    def _html_header(self, node: Node, data: Mapping) -> str:
+        # HTML has only six levels of headers.
+        level = min(data["level"], 6)
+        attributes = html_attributes(id=data["internal_id"])
+
+        return f"<h{level}{attributes}>{data['content']}</h{level}>"
+
+    def _html_macro(self, node: Node, data: Mapping) -> str:
+        # Unknown macros are not rendered.
+        return ""
+
+    def _html_macro_class(self, node: Node, data: Mapping) -> str:
+        attributes = html_attributes(class_=data["classes"])
+
+        return f"<span{attributes}>{data['content']}</span>"
+
+    def _html_macro_link(self, node: Node, data: Mapping) -> str:
+        attributes = html_attributes(href=data["target"])
+
+        return f"<a{attributes}>{data['content'] or escape(data['target'])}</a>"
+
+    def _html_macro_unicode(self, node: Node, data: Mapping) -> str:
+        return f"&#x{data['value']};"
+
+    def _html_macro_raw(self, node: Node, data: Mapping) -> str:
+        return data["value"]
+
+    def _html_macro_image(self, node: Node, data: Mapping) -> str:
+        attributes = html_attributes(
+            src=data["uri"],
+            alt=data["alt_text"],
+            width=data["width"],
+            height=data["height"],
+        )
+
+        return f"<img{attributes} />"
+
+    def _html_macro_header(self, node: Node, data: Mapping) -> str:
+        header = data["header"]
+        attributes = html_attributes(href=f"#{header.get('internal_id', '')}")
+        content = data["content"] or header.get("content", "")
+
+        return f"<a{attributes}>{content}</a>"
+
+    def _html_macro_footnote(self, node: Node, data: Mapping) -> str:
+        footnote = data["footnote"]
+
+        if not footnote:
+            return ""
+
+        attributes = html_attributes(
+            id=f"ref-{footnote['internal_id']}",
+            href=f"#{footnote['internal_id']}",
+        )
+
+        return f"<sup>[<a{attributes}>{escape(footnote['public_id'])}</a>]</sup>"
+
+    def _html_footnotes_item(self, node: Node, data: Mapping) -> str:
+        footnote = data["footnote"]
+
+        if not footnote:
+            return ""
+
+        item_attributes = html_attributes(id=footnote["internal_id"])
+        link_attributes = html_attributes(href=f"#ref-{footnote['internal_id']}")
+
+        return (
+            f"<div{item_attributes}>"
+            f"<a{link_attributes}>{escape(footnote['public_id'])}</a> "
+            f"{footnote['content']}"
+            "</div>"
+        )
+
+    def _html_footnotes(self, node: Node, data: Mapping) -> str:
+        return f'<div class="footnotes">{data["footnotes"]}</div>'
+
+    def _html_toc_item(self, node: Node, data: Mapping) -> str:
+        header = data["header"]
+        attributes = html_attributes(href=f"#{header.get('internal_id', '')}")
+        entries = f"<ul>{data['entries']}</ul>" if data["entries"] else ""
+
+        return f"<li><a{attributes}>{header.get('content', '')}</a>{entries}</li>"
+
+    def _html_toc(self, node: Node, data: Mapping) -> str:
+        return f'<div class="toc"><ul>{data["nested_entries"]}</ul></div>'
+
+    def _html_blockgroup(self, node: Node, data: Mapping) -> str:
+        blocks = "".join(data["blocks"].values())
+
+        return f'<div class="blockgroup">{blocks}</div>'
+
+    def _html_title(self, data: Mapping) -> str:
+        # The label `title` is rendered
+        # before the node it belongs to.
+        title = data.get("labels", {}).get("title")
+
+        return f'<div class="title">{title}</div>' if title else ""
+
+    def _html_block(self, node: Node, data: Mapping) -> str:
+        classes = ["block"] + list(data["classes"])
+        if data["subtype"]:
+            classes.append(data["subtype"])
+
+        attributes = html_attributes(class_=classes)
+
+        return (
+            f"<div{attributes}>{self._html_title(data)}"
+            f'<div class="content">{data["content"]}</div></div>'
+        )
+
+    def _html_horizontal_rule(self, node: Node, data: Mapping) -> str:
+        return "<hr />"
+
+    def _html_include_image(self, node: Node, data: Mapping) -> str:
+        attributes = html_attributes(src=data["uri"], alt=data["alt_text"])
+        figure_attributes = html_attributes(class_=data["classes"])
+        title = data.get("labels", {}).get("title")
+        caption = f"<figcaption>{title}</figcaption>" if title else ""
+
+        return f"<figure{figure_attributes}><img{attributes} />{caption}</figure>"
+
+    def _html_include_mau(self, node: Node, data: Mapping) -> str:
+        return data["content"]
+
+    def _html_include_raw(self, node: Node, data: Mapping) -> str:
+        return data["content"]
+
+    def _html_list_item(self, node: Node, data: Mapping) -> str:
+        return f"<li>{data['content']}</li>"
+
+    def _html_list(self, node: Node, data: Mapping) -> str:
+        if data["ordered"]:
+            start = data["start"] if data["start"] != 1 else None
+            attributes = html_attributes(start=start)
+
+            return f"{self._html_title(data)}<ol{attributes}>{data['content']}</ol>"
+
+        return f"{self._html_title(data)}<ul>{data['content']}</ul>"
+
+    def _html_paragraph(self, node: Node, data: Mapping) -> str:
+        return f"{self._html_title(data)}<p>{data['lines']}</p>"
+
+    def _html_paragraph_line(self, node: Node, data: Mapping) -> str:
+        return data["content"]
+
+    def _html_source_marker(self, node: Node, data: Mapping) -> str:
+        return escape(data["value"], quote=False)
+
+    def _html_source_line(self, node: Node, data: Mapping) -> str:
+        # The highlighted line is already escaped.
+        line = data.get("highlighted_line")
+
+        if line is None:
+            line = escape(data["line_content"], quote=False)
+
+        if data["highlight_style"]:
+            line = f'<span class="hl-{escape(data["highlight_style"])}">{line}</span>'
+
+        # The marker is already rendered.
+        if data["marker"]:
+            line = f'{line} <span class="callout">{data["marker"]}</span>'
+
+        return line
+
+    def _html_source(self, node: Node, data: Mapping) -> str:
+        language = data["language"]
+        code_attributes = html_attributes(
+            class_=f"language-{language}" if language else None
+        )
+        attributes = html_attributes(class_=["source"] + list(data["classes"]))
+
+        return (
+            f"<div{attributes}>{self._html_title(data)}"
+            f"<pre><code{code_attributes}>{data['content']}</code></pre></div>"
+        )
+
+    def _html_raw_line(self, node: Node, data: Mapping) -> str:
+        return data["value"]
+
+    def _html_raw(self, node: Node, data: Mapping) -> str:
+        return data["content"]
@@ -1,23 +1,35 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import hashlib
 import itertools
 import logging
-import sys
-from collections import defaultdict
-from collections.abc import Sequence
+import os
+import re
+import threading
+from collections import ChainMap, defaultdict
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Callable
 
 import jinja2
+from jinja2 import nodes as jinja_nodes
+from jinja2.bccache import Bucket
 
+from mau.cache import DiskCache, stable_hash
+from mau.entry_points import discover_entry_points, load_entry_point
 from mau.environment.environment import Environment
-from mau.message import BaseMessageHandler
+from mau.message import BaseMessageHandler, MauException
 from mau.nodes.node import Node
+from mau.nodes.raw import RawLineNode
+from mau.nodes.source import SourceLineNode
 from mau.visitors.base_visitor import (
     BaseVisitor,
+    NodeData,
+    _lazy_content,
     create_visitor_exception,
 )
+from mau.visitors.highlighter import SourceHighlighter
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +38,25 @@ class TemplateNotFound(ValueError):
     pass
 
 
+# The part of a node that is relevant
+# when matching templates, in the form
+# (template_type, subtype, sorted tags, parent type).
+TemplateSignature = tuple[str, str | None, tuple[str, ...], str | None]
+
+
+def template_signature(node: Node) -> TemplateSignature:
+    # Extract from the node all the values
+    # that template claims can test.
+    # Nodes that share the same signature
+    # are matched by the same template.
+    return (
+        node.template_type,
+        node.arguments.subtype,
+        tuple(sorted(set(node.arguments.tags))),
+        node.parent.type if node.parent else None,
+    )
+
+
 @dataclass
 class Template:
     # This object represents a template
@@ -106,40 +137,46 @@ class Template:
     def match(self, node: Node, prefix: str | None = None) -> bool:
         # Check if the given node matches the
         # template claims.
-        if self.type and self.type != node.template_type:
-            return False
+        return self.match_signature(template_signature(node), prefix)
 
-        if prefix and not self.prefix == prefix:
-            return False
+    def match_signature(
+        self, signature: TemplateSignature, prefix: str | None = None
+    ) -> bool:
+        # Check if the given node signature
+        # matches the template claims.
+        template_type, subtype, tags, ptype = signature
 
-        if self.subtype and self.subtype != node.arguments.subtype:
+        if self.type and self.type != template_type:
             return False
 
-        if self.ptype and not node.parent:
+        if prefix and not self.prefix == prefix:
             return False
 
-        if self.ptype and self.ptype != node.parent.type:
+        if self.subtype and self.subtype != subtype:
             return False
 
-        if self.tags and not set(self.tags).issubset(set(node.arguments.tags)):
+        if self.ptype and self.ptype != ptype:
             return False
 
+        # Check that all the template tags are
+        # among the node tags without creating
+        # any intermediate set.
+        for tag in self.tags:
+            if tag not in tags:
+                return False
+
         return True
 
 
 def _load_available_template_providers():  # pragma: no cover
     # Load all the template providers belonging
-    # to the group "mau.templates".
-
-    if sys.version_info < (3, 10):
-        from importlib_metadata import entry_points
-    else:
-        from importlib.metadata import entry_points
-
-    discovered_plugins = entry_points(group="mau.templates")
+    # to the group "mau.templates". The entry points
+    # are discovered through a cache, see
+    # mau.entry_points.
+    discovered_plugins = discover_entry_points("mau.templates")
 
     # Load the available plugins
-    return {i.name: i.load() for i in discovered_plugins}
+    return {name: load_entry_point(value) for name, value in discovered_plugins}
 
 
 def load_templates_from_providers(environment: Environment) -> Environment:
@@ -271,6 +308,253 @@ def load_templates_from_filesystem(
     return templates
 
 
+@dataclass
+class TemplateSet:
+    # The templates loaded for a given
+    # configuration and the Jinja
+    # environment that hosts them.
+    jinja_environment: jinja2.Environment
+
+    # The list of templates for each
+    # node type, sorted in order
+    # of specificity.
+    templates: dict[str, list[Template]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+
+    # The templates claiming a prefix,
+    # indexed by node type and then
+    # by prefix, in order of specificity.
+    # It allows the prefixed searches to
+    # test only the templates that claim
+    # that prefix.
+    templates_index: dict[str, dict[str, list[Template]]] = field(
+        default_factory=lambda: defaultdict(lambda: defaultdict(list))
+    )
+
+    # The cache of resolved templates, in the form
+    # {(signature, prefixes): template}.
+    # Documents contain a small number of distinct
+    # signatures, so most lookups are served here.
+    templates_cache: dict[tuple, Template] = field(default_factory=dict)
+
+    # The state of the template directories
+    # when the templates were loaded.
+    paths_stamp: tuple = ()
+
+    # A hash of the name and content
+    # of all the templates.
+    fingerprint: str = ""
+
+    # True if any template might read
+    # the source position of the nodes.
+    uses_context: bool = False
+
+    # The trivial templates that can be rendered
+    # without Jinja, in the form {name: parts},
+    # where parts is a tuple of (is_name, value)
+    # pairs, or None for regular templates.
+    inline_templates: dict[str, tuple | None] = field(default_factory=dict)
+
+
+# The process-wide registry of template sets,
+# indexed by the configuration that produced them.
+# Visitors created with the same configuration
+# reuse the templates and the Jinja environment
+# instead of loading them again.
+_templates_registry: dict[tuple, TemplateSet] = {}
+_templates_registry_lock = threading.Lock()
+
+
+def clear_templates_registry():
+    # Remove all the template sets from the registry.
+    with _templates_registry_lock:
+        _templates_registry.clear()
+
+
+def _templates_paths_stamp(paths: Sequence[str]) -> tuple:
+    # Collect the modification times of all
+    # directories and files in the given paths.
+    # A change in the result means that some
+    # templates were added, removed, or edited.
+    stamp = []
+
+    for path in paths:
+        for dirpath, _, filenames in os.walk(path):
+            stamp.append((dirpath, os.stat(dirpath).st_mtime_ns))
+
+            for filename in filenames:
+                stat = os.stat(os.path.join(dirpath, filename))
+                stamp.append((filename, stat.st_mtime_ns, stat.st_size))
+
+    return tuple(stamp)
+
+
+class TemplatesBytecodeCache(jinja2.FileSystemBytecodeCache):
+    # A file system bytecode cache that stores
+    # compiled templates under a key derived
+    # from the template name, its content, and
+    # the options of the Jinja environment.
+    # Template sets loaded from different
+    # sources can share the same directory
+    # without overwriting each other.
+
+    def __init__(self, directory: str, options_key: str = ""):
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+        super().__init__(directory, pattern="__mau_%s.cache")
+
+        # A string that represents the options
+        # used to compile the templates.
+        self.options_key = options_key
+
+    def get_bucket(
+        self,
+        environment: jinja2.Environment,
+        name: str,
+        filename: str | None,
+        source: str,
+    ) -> Bucket:
+        key = hashlib.sha1(f"{self.options_key}\0{name}\0{source}".encode()).hexdigest()
+
+        bucket = Bucket(environment, key, self.get_source_checksum(source))
+        self.load_bytecode(bucket)
+
+        return bucket
+
+
+# Markers used in fragments output mode. Each one
+# stands for a rendered fragment stored by the
+# visitor and contains its index. The characters
+# come from the Unicode private use area, so they
+# do not clash with the text of the document.
+FRAGMENT_MARKER_START = "\ue000"
+FRAGMENT_MARKER_END = "\ue001"
+FRAGMENT_MARKER_RE = re.compile(f"{FRAGMENT_MARKER_START}([0-9]+){FRAGMENT_MARKER_END}")
+
+
+# The placeholder for the content of the
+# document used when the output is streamed.
+STREAM_CONTENT_MARKER = "\ue002"
+
+
+def expand_fragments(text: str, fragments: Sequence[str]) -> list[str]:
+    """Replace the fragment markers contained in the text
+    with the stored fragments, recursively. Return the
+    list of pieces that compose the final output."""
+
+    pieces: list[str] = []
+
+    # Splitting on the marker regular expression
+    # returns text and fragment indexes alternately.
+    # This uses an explicit stack so that deeply
+    # nested documents don't hit the recursion limit.
+    stack = [enumerate(FRAGMENT_MARKER_RE.split(text))]
+
+    while stack:
+        for position, piece in stack[-1]:
+            if position % 2:
+                fragment = fragments[int(piece)]
+                stack.append(enumerate(FRAGMENT_MARKER_RE.split(fragment)))
+                break
+
+            if piece:
+                pieces.append(piece)
+        else:
+            stack.pop()
+
+    return pieces
+
+
+# The state of a worker process that renders
+# the children of a document in parallel.
+# It is initialised once per process.
+_render_worker_state: dict = {}
+
+
+def _init_render_worker(
+    visitor_class: type[JinjaVisitor],
+    message_handler: BaseMessageHandler,
+    environment: Environment,
+    document: Node,
+    kwargs: dict,
+):
+    # Each worker uses a single visitor and
+    # receives the whole document once, so that
+    # tasks only need to carry the index of a node.
+    # The worker must not start another pool.
+    environment = Environment.from_environment(environment)
+    environment["mau.visitor.jobs"] = 1
+
+    _render_worker_state["visitor"] = visitor_class(message_handler, environment)
+    _render_worker_state["document"] = document
+    _render_worker_state["kwargs"] = kwargs
+
+
+def _render_worker_node(index: int) -> str:
+    # Render one of the children
+    # of the document in a worker.
+    visitor = _render_worker_state["visitor"]
+    node = _render_worker_state["document"].content[index]
+
+    return visitor.visit(node, **_render_worker_state["kwargs"])
+
+
+def _lazy_config(data: NodeData) -> dict:
+    return data.visitor.environment.asdict()
+
+
+def _lazy_source_code(data: NodeData) -> str:
+    return data.node.code
+
+
+def _lazy_source_highlighted(data: NodeData) -> str | None:
+    highlighted_lines = data.node.highlighted_lines
+
+    if highlighted_lines is None:
+        return None
+
+    return "\n".join(highlighted_lines)
+
+
+def _lazy_source_content(data: NodeData) -> str:
+    # Render the lines of a source node, without
+    # creating a node per line if possible.
+    rendered = data.visitor._render_source_lines(data.node)
+
+    if rendered is None:
+        return _lazy_content(data)
+
+    return rendered
+
+
+def _highlighted_line(node: Node) -> str | None:
+    # The highlighted version of a source line,
+    # if the source node has been highlighted.
+    parent = node.parent
+    highlighted_lines = getattr(parent, "highlighted_lines", None)
+
+    if not highlighted_lines:
+        return None
+
+    return highlighted_lines[int(node.line_number) - 1]
+
+
+def _lazy_raw_text(data: NodeData) -> str:
+    return data.node.raw_text
+
+
+def _lazy_raw_content(data: NodeData) -> str:
+    # Render the lines of a raw node, without
+    # creating a node per line if possible.
+    rendered = data.visitor._render_raw_lines(data.node)
+
+    if rendered is None:
+        return _lazy_content(data)
+
+    return rendered
+
+
 class JinjaVisitor(BaseVisitor):
     format_code = "jinja"
     extension = ".j2"
@@ -297,6 +581,97 @@ class JinjaVisitor(BaseVisitor):
         # Load the template prefixes from the configuration.
         self.template_prefixes = environment.get("mau.visitor.templates.prefixes", [])
 
+        # Get the templates for the current configuration.
+        # Visitors created with the same configuration
+        # share the same template set.
+        template_set = self._get_template_set()
+
+        # This dictionary contains list of templates
+        # for each node type. The list is sorted
+        # in order of specificity.
+        self.templates = template_set.templates
+
+        # This dictionary indexes templates by
+        # node type and then by prefix.
+        self.templates_index = template_set.templates_index
+
+        # The cache of resolved templates.
+        self.templates_cache = template_set.templates_cache
+
+        # This is the Jinja environment.
+        self._dict_env = template_set.jinja_environment
+
+        # The analysis of trivial templates.
+        self._inline_templates = template_set.inline_templates
+
+        # In fragments output mode, rendered nodes
+        # bigger than the minimum size are stored
+        # here and replaced by a marker, so that
+        # parent templates do not copy them again.
+        # The final output is joined only once
+        # in _postprocess. The list exists only
+        # while the visitor processes a document.
+        # Templates must output rendered values
+        # as they are: filters that change them
+        # (e.g. `upper` or `length`) would see
+        # markers instead of the text.
+        self._fragments: list[str] | None = None
+        self._fragments_min_size: int = self.environment.get(
+            "mau.visitor.fragments.min_size", 256
+        )
+
+        # The persistent cache of rendered
+        # top-level nodes, if configured.
+        self._render_cache = self._create_render_cache()
+        self._templates_fingerprint = template_set.fingerprint
+        self._templates_use_context = template_set.uses_context
+
+    def _templates_paths(self) -> tuple[str, ...]:
+        # The absolute paths of the
+        # configured template directories.
+        return tuple(
+            Path(path_str).absolute().as_posix()
+            for path_str in self.environment.get("mau.visitor.templates.paths", [])
+        )
+
+    def _templates_registry_key(self, templates_paths: tuple[str, ...]) -> tuple:
+        # The values of the configuration
+        # that affect the loaded templates.
+        custom_templates = self.environment.get(
+            "mau.visitor.templates.custom", Environment()
+        )
+
+        return (
+            self.__class__,
+            self.extension,
+            tuple(self.environment.get("mau.visitor.templates.providers", [])),
+            templates_paths,
+            repr(sorted(custom_templates.asflatdict().items())),
+            self.environment.get("mau.visitor.templates.cache_dir"),
+        )
+
+    def _get_template_set(self) -> TemplateSet:
+        # Find the template set for the current
+        # configuration in the registry. If it is
+        # not there, or if the template directories
+        # changed since it was loaded, load it again.
+        templates_paths = self._templates_paths()
+
+        key = self._templates_registry_key(templates_paths)
+        paths_stamp = _templates_paths_stamp(templates_paths)
+
+        with _templates_registry_lock:
+            template_set = _templates_registry.get(key)
+
+            if template_set is None or template_set.paths_stamp != paths_stamp:
+                template_set = self._load_template_set()
+                template_set.paths_stamp = paths_stamp
+
+                _templates_registry[key] = template_set
+
+        return template_set
+
+    def _load_template_set(self) -> TemplateSet:
         # Load default templates.
         # A custom implementation of this visitor might
         # provide default templates that can be overridden
@@ -316,7 +691,7 @@ class JinjaVisitor(BaseVisitor):
 
         # Load custom templates provided as a dictionary.
         templates_env.update(
-            environment.get(
+            self.environment.get(
                 "mau.visitor.templates.custom",
                 Environment(),
             )
@@ -357,30 +732,316 @@ class JinjaVisitor(BaseVisitor):
         # Order templates by specificity
         templates.sort(key=lambda t: t.specificity, reverse=True)
 
-        # This dictionary contains list of templates
-        # for each node type. The list is sorted
-        # in order of specificity.
-        self.templates = defaultdict(list)
+        template_set = TemplateSet(
+            jinja_environment=jinja2.Environment(
+                # A dictionary in the form {'name': 'source'}
+                # that Jinja will use to host templates.
+                loader=jinja2.DictLoader({t.name: t.content for t in templates}),
+                bytecode_cache=self._create_bytecode_cache(),
+                **self.jinja_environment_options,
+            )
+        )
+
+        template_set.fingerprint = stable_hash(
+            [(t.name, t.content) for t in templates],
+            repr(sorted(self.jinja_environment_options.items())),
+        )
+        template_set.uses_context = any("_context" in t.content for t in templates)
+
         for template in templates:
-            self.templates[template.type].append(template)
+            template_set.templates[template.type].append(template)
 
-        # A dictionary in the form {'name': 'source'}
-        # that Jinja will use to host templates.
-        jinja_templates = {t.name: t.content for t in templates}
+            if template.prefix:
+                template_set.templates_index[template.type][template.prefix].append(
+                    template
+                )
 
-        # This is the Jinja environment.
-        # We prepare it with all the templates we loaded
-        # in the previous section of the function.
-        self._dict_env = jinja2.Environment(
-            loader=jinja2.DictLoader(jinja_templates),
-            **self.jinja_environment_options,
+        return template_set
+
+    def _create_bytecode_cache(self) -> jinja2.BytecodeCache | None:
+        # If a cache directory has been configured,
+        # compiled templates are stored there and
+        # loaded by later runs without compiling
+        # the source again.
+        cache_dir = self.environment.get("mau.visitor.templates.cache_dir")
+
+        if not cache_dir:
+            return None
+
+        return TemplatesBytecodeCache(
+            cache_dir,
+            options_key=repr(sorted(self.jinja_environment_options.items())),
         )
 
+    def _create_render_cache(self) -> DiskCache | None:
+        # If a render cache directory has been
+        # configured, the output of top-level nodes
+        # is stored there and reused by later runs
+        # when neither the nodes, the templates,
+        # nor the configuration have changed.
+        cache_dir = self.environment.get("mau.visitor.render_cache.path")
+
+        if not cache_dir or not self.environment.get(
+            "mau.visitor.render_cache.enabled", True
+        ):
+            return None
+
+        return DiskCache(
+            cache_dir,
+            max_size=self.environment.get(
+                "mau.visitor.render_cache.max_size", 256 * 1024 * 1024
+            ),
+        )
+
+    def compile_templates(self) -> int:
+        # Load all the templates through the
+        # Jinja environment. This compiles the
+        # source of each template and, if a
+        # bytecode cache has been configured,
+        # stores the result in it.
+        # Returns the number of templates.
+        names = self._dict_env.list_templates()
+
+        for name in names:
+            self._dict_env.get_template(name)
+
+        return len(names)
+
+    def _analyse_inline_template(self, template_full_name: str) -> tuple | None:
+        # Find out if the template is trivial, that is if it
+        # only outputs static text and plain variables, like
+        # `{{ value }}` or `<p>{{ content }}</p>`.
+        # Return the parts of the template in the form
+        # ((is_name, value), ...) or None if the template
+        # needs Jinja. Options that change how values are
+        # printed (autoescape, finalize, undefined)
+        # require Jinja.
+        if (
+            self._dict_env.autoescape
+            or self._dict_env.finalize
+            or self._dict_env.undefined is not jinja2.Undefined
+        ):
+            return None
+
+        try:
+            source = self._dict_env.loader.get_source(
+                self._dict_env, template_full_name
+            )[0]
+            ast = self._dict_env.parse(source)
+        except jinja2.exceptions.TemplateError:
+            return None
+
+        parts = []
+
+        for output in ast.body:
+            if not isinstance(output, jinja_nodes.Output):
+                return None
+
+            for node in output.nodes:
+                if isinstance(node, jinja_nodes.TemplateData):
+                    parts.append((False, node.data))
+                elif (
+                    isinstance(node, jinja_nodes.Name)
+                    and node.ctx == "load"
+                    and node.name != "config"
+                    and node.name not in self._dict_env.globals
+                ):
+                    parts.append((True, node.name))
+                else:
+                    return None
+
+        return tuple(parts)
+
+    def _inline_template_parts(self, template_full_name: str) -> tuple | None:
+        # The analysis of the template (see
+        # `_analyse_inline_template`), cached.
+        try:
+            return self._inline_templates[template_full_name]
+        except KeyError:
+            pass
+
+        parts = self._analyse_inline_template(template_full_name)
+        self._inline_templates[template_full_name] = parts
+
+        return parts
+
+    def _render_inline(self, template_full_name: str, data: Mapping) -> str | None:
+        # Render a trivial template without Jinja.
+        # Return None if the template is not trivial.
+        # Trivial templates only use variables from
+        # the node data. Like in Jinja, variables
+        # that are not defined are rendered as
+        # empty strings.
+        parts = self._inline_template_parts(template_full_name)
+
+        if parts is None:
+            return None
+
+        pieces = []
+
+        for is_name, value in parts:
+            if is_name:
+                try:
+                    value = str(data[value])
+                except KeyError:
+                    value = ""
+
+            pieces.append(value)
+
+        return "".join(pieces)
+
+    def _visit_raw(self, node: Node, **kwargs) -> dict:
+        result = super()._visit_raw(node, **kwargs)
+        self._add_visit_raw_content(result, node, **kwargs)
+
+        return result
+
+    def _visit_include_raw(self, node: Node, **kwargs) -> dict:
+        result = super()._visit_include_raw(node, **kwargs)
+        self._add_visit_raw_content(result, node, **kwargs)
+
+        return result
+
+    def _add_visit_raw_content(self, result: NodeData, node: Node, **kwargs):
+        # Templates of raw nodes get the whole
+        # content as `text`, which is the fastest
+        # way to output it. The rendered lines
+        # are still available as `content`.
+        result.set_lazy("text", _lazy_raw_text)
+        result.set_lazy("content", _lazy_raw_content)
+
+    def _render_raw_lines(self, node: Node) -> str | None:
+        # Render the lines of a raw node that
+        # has not created its line nodes, if the
+        # template of the lines is trivial and uses
+        # only the value (e.g. `{{ value }}`).
+        # Return None if the lines need to be
+        # rendered as nodes.
+        if node.raw_content is None or node.has_line_nodes:
+            return None
+
+        # All the lines of the node have
+        # the same template signature.
+        try:
+            template = self._find_matching_template(RawLineNode("", parent=node), {})
+        except MauException:
+            return None
+
+        parts = self._inline_template_parts(template.name)
+
+        if parts is None or any(
+            is_name and value != "value" for is_name, value in parts
+        ):
+            return None
+
+        join_with = self.join_with.get(node.type, self.join_with_default)
+
+        return join_with.join(
+            "".join(line if is_name else value for is_name, value in parts)
+            for line in node.raw_content.lines()
+        )
+
+    def _visit_source(self, node: Node, **kwargs) -> dict:
+        result = super()._visit_source(node, **kwargs)
+
+        # Templates of source nodes get the code
+        # without markers as `code`. The rendered
+        # lines are still available as `content`.
+        result.set_lazy("code", _lazy_source_code)
+        result.set_lazy("content", _lazy_source_content)
+
+        # The highlighted code, if the
+        # highlighting stage is enabled.
+        result.set_lazy("highlighted", _lazy_source_highlighted)
+
+        return result
+
+    def _visit_source_line(self, node: Node, **kwargs) -> dict:
+        result = super()._visit_source_line(node, **kwargs)
+
+        result["highlighted_line"] = _highlighted_line(node)
+
+        return result
+
+    # The values of a source line that can
+    # be rendered without creating its node.
+    source_line_keys = frozenset(
+        [
+            "line_number",
+            "line_content",
+            "highlight_style",
+            "marker",
+            "highlighted_line",
+        ]
+    )
+
+    def _render_source_lines(self, node: Node) -> str | None:
+        # Render the lines of a source node that
+        # has not created its line nodes, if the
+        # template of the lines is trivial and uses
+        # only the values of the line.
+        # Return None if the lines need to be
+        # rendered as nodes.
+        source_content = node.source_content
+
+        if source_content is None or node.has_line_nodes:
+            return None
+
+        # All the lines of the node have
+        # the same template signature.
+        try:
+            template = self._find_matching_template(
+                SourceLineNode("", "", parent=node), {}
+            )
+        except MauException:
+            return None
+
+        parts = self._inline_template_parts(template.name)
+
+        if parts is None or any(
+            is_name and value not in self.source_line_keys for is_name, value in parts
+        ):
+            return None
+
+        highlighted_lines = node.highlighted_lines
+        rendered_lines = []
+
+        for index, (line_number, line_content, highlight_style, marker) in enumerate(
+            source_content.lines()
+        ):
+            values = {
+                "line_number": line_number,
+                "line_content": line_content,
+                "highlight_style": highlight_style,
+                "marker": "",
+                "highlighted_line": (
+                    highlighted_lines[index] if highlighted_lines else None
+                ),
+            }
+
+            # Markers are rendered by their template.
+            if marker:
+                values["marker"] = self.visit(source_content.marker_node(index))
+
+            rendered_lines.append(
+                "".join(
+                    str(values[value]) if is_name else value for is_name, value in parts
+                )
+            )
+
+        join_with = self.join_with.get(node.type, self.join_with_default)
+
+        return join_with.join(rendered_lines)
+
     def _render(
-        self, node: Node, environment: Environment, template_full_name, **kwargs
+        self,
+        node: Node,
+        environment: Environment,
+        template_full_name: str,
+        data: Mapping,
     ) -> str:
         # This renders a template using the current
-        # environment and the given parameters.
+        # environment and the given data.
 
         # Get the template from the Jinja environment.
         try:
@@ -388,61 +1049,304 @@ class JinjaVisitor(BaseVisitor):
         except jinja2.exceptions.TemplateNotFound as exception:
             raise TemplateNotFound(exception) from exception
 
+        # The variables available to the template.
+        # The Jinja context reads them through the
+        # chain, so lazy values in the node data
+        # and the configuration are computed only
+        # if the template uses them.
+        variables = ChainMap(data, self._config_data(), template.globals)
+
         # Render the template using the values
         # retrieved visiting the node.
         try:
-            rendered_template = template.render(
-                config=self.environment.asdict(), **kwargs
-            )
-        except jinja2.exceptions.UndefinedError as exception:  # pragma: no cover
+            if self._dict_env.is_async:  # pragma: no cover
+                rendered_template = template.render(dict(variables))
+            else:
+                context = template.new_context(variables, shared=True)
+
+                try:
+                    rendered_template = self._dict_env.concat(
+                        template.root_render_func(context)
+                    )
+                except Exception:  # noqa: BLE001
+                    # Like Template.render, this rewrites the
+                    # traceback and raises the exception again.
+                    self._dict_env.handle_exception()
+        except jinja2.exceptions.UndefinedError as exception:
             raise create_visitor_exception(
-                text=f"Error rendering node with template {template_full_name}: {str(exception)}",
+                text=f"Error rendering node with template {template_full_name}: {exception}",
                 node=node,
-                data=kwargs,
+                data=data,
                 environment=environment,
             ) from exception
 
         return rendered_template
 
+    def _render_iter(
+        self,
+        node: Node,
+        template_full_name: str,
+        data: Mapping,
+    ) -> Iterator[str]:
+        # This renders a template like `_render`,
+        # but yields the output pieces as Jinja
+        # produces them, without joining them.
+        try:
+            template = self._dict_env.get_template(template_full_name)
+        except jinja2.exceptions.TemplateNotFound as exception:
+            raise TemplateNotFound(exception) from exception
+
+        variables = ChainMap(data, self._config_data(), template.globals)
+        context = template.new_context(variables, shared=True)
+
+        try:
+            try:
+                yield from template.root_render_func(context)
+            except Exception:  # noqa: BLE001
+                # See `_render`.
+                self._dict_env.handle_exception()
+        except jinja2.exceptions.UndefinedError as exception:
+            raise create_visitor_exception(
+                text=f"Error rendering node with template {template_full_name}: {exception}",
+                node=node,
+                data=data,
+                environment=self.environment,
+            ) from exception
+
+    def process_iter(self, node: Node | None, **kwargs) -> Iterator[str]:
+        # Stream the output of a document.
+        # The document template is rendered
+        # with a placeholder instead of the content.
+        # Its output is split around the placeholder
+        # and the top-level children are rendered
+        # one at a time in between, so the whole
+        # output never lives in memory.
+
+        # Only documents can be streamed. Visitors
+        # that postprocess the output need all of it.
+        if (
+            node is None
+            or node.type != "document"
+            or type(self)._postprocess is not JinjaVisitor._postprocess
+        ):
+            yield self.process(node, **kwargs)
+            return
+
+        node = self._preprocess(node, **kwargs)
+
+        # Visit the document node without its content.
+        data = BaseVisitor.visit(self, node, **kwargs)
+        data["content"] = STREAM_CONTENT_MARKER
+
+        for piece in self._render_node_iter(node, data):
+            # The template might not use the content,
+            # or use it more than once.
+            head, *tails = piece.split(STREAM_CONTENT_MARKER)
+
+            if head:
+                yield self._stream_chunk(head)
+
+            for tail in tails:
+                yield from self._stream_content(node, **kwargs)
+
+                if tail:
+                    yield self._stream_chunk(tail)
+
+        # Stop collecting fragments.
+        self._fragments = None
+
+    def _stream_content(self, node: Node, **kwargs) -> Iterator[str]:
+        # Render the children of the node one at
+        # a time, joined as `visitlist` would do.
+        join_with = self.join_with.get(node.type, self.join_with_default)
+
+        # In fragments output mode, the fragments
+        # created by a child are referenced only
+        # by its own output, so they can be dropped
+        # once it has been expanded.
+        fragments_count = len(self._fragments or [])
+
+        for index, rendered in enumerate(self._visit_document_content(node, **kwargs)):
+            if index and join_with:
+                yield join_with
+
+            yield self._stream_chunk(rendered)
+
+            if self._fragments:
+                del self._fragments[fragments_count:]
+
+    def _visit_document_content(self, node: Node, **kwargs) -> Iterator[str]:
+        # Render the top-level children of a document,
+        # using the render cache if it is configured.
+        # Visits with keyword arguments are not cached,
+        # as they can change the output in ways that
+        # can't be hashed.
+        cache = self._render_cache if not kwargs else None
+
+        keys: list[str] = []
+        cached: list[str | None] = [None] * len(node.content)
+
+        if cache:
+            keys = self._render_cache_keys(node)
+            cached = [cache.get(key) for key in keys]
+            cached = [None if v is None else v.decode("utf-8") for v in cached]
+
+        # Render only the nodes that are not in the cache.
+        missing = [index for index, value in enumerate(cached) if value is None]
+        rendered = self._render_document_children(node, missing, **kwargs)
+
+        for index, value in enumerate(cached):
+            if value is None:
+                value = next(rendered)
+
+                if cache:
+                    cache.set(keys[index], self._stream_chunk(value).encode("utf-8"))
+
+            yield value
+
+        if cache:
+            cache.prune()
+
+    def _render_cache_keys(self, node: Node) -> list[str]:
+        # The key of a top-level node combines the visitor,
+        # the templates, the whole configuration (that
+        # templates can read through `config`), the parent
+        # document, and the structure of the node subtree.
+        # The source position of the nodes is considered
+        # only if some template might use it, otherwise
+        # editing a section would invalidate all the
+        # following ones.
+        skip_attributes = ("parent",)
+        if not self._templates_use_context:
+            skip_attributes = ("parent", "info")
+
+        base_key = stable_hash(
+            f"{self.__class__.__module__}.{self.__class__.__qualname__}",
+            self._templates_fingerprint,
+            self.template_prefixes,
+            self.environment.asflatdict(load=False),
+            self.environment.pending(),
+            node.type,
+            node.arguments,
+            skip_attributes=skip_attributes,
+        )
+
+        return [
+            stable_hash(base_key, child, skip_attributes=skip_attributes)
+            for child in node.content
+        ]
+
+    def _render_document_children(
+        self, node: Node, indices: Sequence[int], **kwargs
+    ) -> Iterator[str]:
+        # Render the top-level children of a
+        # document with the given indices.
+        # When the TOC and the footnotes have been
+        # resolved by the parser, the children are
+        # independent, so they can be rendered
+        # in parallel by a pool of processes.
+        jobs = self.environment.get("mau.visitor.jobs", 1)
+
+        if jobs <= 1 or len(indices) < 2:
+            for index in indices:
+                yield self.visit(node.content[index], **kwargs)
+
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Workers are initialised once with the
+        # visitor class, the environment and the
+        # document. Results come back in order.
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_render_worker,
+            initargs=(
+                self.__class__,
+                self.message_handler,
+                self.environment,
+                node,
+                kwargs,
+            ),
+        ) as executor:
+            chunksize = max(1, len(indices) // (jobs * 4))
+
+            yield from executor.map(_render_worker_node, indices, chunksize=chunksize)
+
+    def _stream_chunk(self, chunk: str) -> str:
+        # In fragments output mode,
+        # expand the markers of the chunk.
+        if self._fragments:
+            chunk = "".join(expand_fragments(chunk, self._fragments))
+
+        return chunk
+
+    def _config_data(self) -> NodeData:
+        # The configuration is passed to templates
+        # as the variable `config`, and it is
+        # computed only if the template uses it.
+        return NodeData(lazy_values={"config": _lazy_config}, visitor=self)
+
     def _debug_additional_info(self, node: Node, result: dict):  # pragma: no cover
         node_templates = self.templates[node.template_type()]
 
         return {"Available templates": [t.name for t in node_templates]}
 
     def _find_matching_template(self, node: Node, data: dict) -> Template:
-        # Find all templates available for
-        # this type of node in specificity order.
-        templates = self.templates[node.template_type]
-
-        # The list of all matching templates.
-        matching_templates: list[Template] = []
-
-        # Test all templates to find the matching ones.
-        # The test is performed on all given prefixes first.
-        for prefix in self.template_prefixes:
-            matching_templates.extend(
-                [t for t in templates if t.match(node, prefix)],
-            )
+        # Templates are matched only on the node
+        # signature and the active prefixes,
+        # so the result can be cached.
+        signature = template_signature(node)
+        prefixes = tuple(self.template_prefixes)
+        cache_key = (signature, prefixes)
+
+        try:
+            return self.templates_cache[cache_key]
+        except KeyError:
+            pass
 
-        # Now let's add the matching templates without prefix.
-        matching_templates.extend([t for t in templates if t.match(node)])
+        template = self._resolve_template(signature, prefixes)
 
         # If there are no matching templates
         # we are in trouble. Let's print out
         # a message to help the user to debug.
-        if not matching_templates:
+        if template is None:
             raise create_visitor_exception(
                 text="Cannot find a suitable template.",
                 node=node,
                 data=data,
                 environment=self.environment,
                 additional_info={
-                    "Templates found": templates,
+                    "Templates found": self.templates[node.template_type],
                 },
             )
 
-        # Select the first template that matches.
-        return matching_templates[0]
+        self.templates_cache[cache_key] = template
+
+        return template
+
+    def _resolve_template(
+        self, signature: TemplateSignature, prefixes: Sequence[str]
+    ) -> Template | None:
+        # Find the first template that matches
+        # the given signature. Templates are
+        # tested in order of specificity.
+        template_type = signature[0]
+
+        # The test is performed on all given prefixes first,
+        # and considers only the templates claiming the prefix.
+        prefixed_templates = self.templates_index[template_type]
+        for prefix in prefixes:
+            for template in prefixed_templates[prefix]:
+                if template.match_signature(signature, prefix):
+                    return template
+
+        # Now let's test the templates without prefix.
+        for template in self.templates[template_type]:
+            if template.match_signature(signature):
+                return template
+
+        return None
 
     def visit(self, node: Node | None, **kwargs):
         # Visit the node and extract a dictionary of
@@ -461,18 +1365,113 @@ class JinjaVisitor(BaseVisitor):
         # Visit the node.
         data = super().visit(node, **kwargs)
 
-        # Find a matching template.
+        rendered = self._render_node(node, data)
+
+        # Store big fragments and
+        # return a marker instead.
+        if self._fragments is not None and len(rendered) >= self._fragments_min_size:
+            return self._add_fragment(rendered)
+
+        return rendered
+
+    def _render_node(self, node: Node, data: Mapping) -> str:
+        # Render the data of a node
+        # with the matching template.
         template = self._find_matching_template(node, data)
 
-        return self._render(node, self.environment, template.name, **data)
+        # Trivial templates are rendered directly.
+        rendered = self._render_inline(template.name, data)
+
+        if rendered is None:
+            rendered = self._render(node, self.environment, template.name, data)
+
+        return rendered
+
+    def _render_node_iter(self, node: Node, data: Mapping) -> Iterator[str]:
+        # Render the data of a node with the
+        # matching template, yielding the
+        # output pieces as they are produced.
+        template = self._find_matching_template(node, data)
+
+        yield from self._render_iter(node, template.name, data)
+
+    def _add_fragment(self, fragment: str) -> str:
+        # Store the fragment and return
+        # the marker that replaces it.
+        self._fragments.append(fragment)
+
+        index = len(self._fragments) - 1
+
+        return f"{FRAGMENT_MARKER_START}{index}{FRAGMENT_MARKER_END}"
+
+    def _preprocess(self, node: Node | None, **kwargs):
+        node = super()._preprocess(node, **kwargs)
+
+        # Start collecting fragments if
+        # the output mode is enabled.
+        if self.environment.get("mau.visitor.fragments.enabled", False):
+            self._fragments = []
+
+        if self.environment.get("mau.visitor.highlight.enabled", False):
+            self._highlight_sources(node)
+
+        return node
+
+    def _highlight_sources(self, node: Node | None):
+        # Highlight the code of all the source
+        # nodes before rendering, so that templates
+        # get the highlighted lines. See SourceHighlighter.
+        if not SourceHighlighter.is_available():
+            logger.warning("Highlighting requires Pygments, which is not installed")
+            return
+
+        cache = None
+        cache_dir = self.environment.get("mau.visitor.highlight.cache.path")
+
+        if cache_dir and self.environment.get(
+            "mau.visitor.highlight.cache.enabled", True
+        ):
+            cache = DiskCache(
+                cache_dir,
+                max_size=self.environment.get(
+                    "mau.visitor.highlight.cache.max_size", 64 * 1024 * 1024
+                ),
+            )
+
+        highlighter = SourceHighlighter(
+            formatter=self.environment.get("mau.visitor.highlight.formatter", "html"),
+            options=self.environment.get(
+                "mau.visitor.highlight.options", Environment()
+            ).asdict(),
+            cache=cache,
+            jobs=self.environment.get("mau.visitor.highlight.jobs", 1),
+        )
+
+        highlighter.process(node)
+
+        if cache is not None:
+            cache.prune()
+
+    def _postprocess(self, result, **kwargs):
+        # Replace all the markers with the
+        # fragments and join the output once.
+        if self._fragments is not None:
+            fragments, self._fragments = self._fragments, None
+            result = "".join(expand_fragments(result, fragments))
+
+        return super()._postprocess(result, **kwargs)
 
     def visitlist(self, current_node: Node, nodes_list: Sequence[Node], **kwargs):
         # Find the string this visitor uses to join
         # children according to the current node type.
         join_with = self.join_with.get(current_node.type, self.join_with_default)
 
-        # Visit all nodes in the list.
-        visited_nodes = [self.visit(node, **kwargs) for node in nodes_list]
+        # Visit all nodes in the list. The content
+        # of a document can be rendered in parallel.
+        if current_node.type == "document" and nodes_list is current_node.content:
+            visited_nodes = list(self._visit_document_content(current_node, **kwargs))
+        else:
+            visited_nodes = [self.visit(node, **kwargs) for node in nodes_list]
 
         # Join the results if needed.
         if join_with is not None:
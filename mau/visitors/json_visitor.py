@@ -0,0 +1,12 @@
+import json
+
+from mau.visitors.data_visitor import DataVisitor
+
+
+class JsonVisitor(DataVisitor):
+    format_code = "json"
+    extension = "json"
+
+    def serialize(self, data):
+        # The output is as compact as possible.
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
@@ -1,18 +1,20 @@
 import yaml
 
-from mau.visitors.base_visitor import BaseVisitor
+from mau.visitors.data_visitor import DataVisitor
 
+# libyaml is much faster than the pure Python
+# implementation, but it might not be installed.
+SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
-class NoAliasDumper(yaml.SafeDumper):
+
+class NoAliasDumper(SafeDumper):
     def ignore_aliases(self, data):
         return True
 
 
-class YamlVisitor(BaseVisitor):
+class YamlVisitor(DataVisitor):
     format_code = "yaml"
     extension = "yaml"
 
-    def _postprocess(self, result, *args, **kwargs):
-        result = super()._postprocess(result, *args, **kwargs)
-
-        return yaml.dump(result, Dumper=NoAliasDumper)
+    def serialize(self, data):
+        return yaml.dump(data, Dumper=NoAliasDumper)
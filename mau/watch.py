@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+
+from mau import ConfigurationError
+from mau.batch import (
+    BatchResult,
+    error_text,
+    process_text,
+    processing_errors,
+    write_output_file,
+)
+from mau.environment.environment import Environment
+from mau.message import BaseMessageHandler, MauException
+from mau.visitors.base_visitor import BaseVisitor
+
+logger = logging.getLogger(__name__)
+
+
+def file_stamp(path: str) -> tuple[int, int] | None:
+    # The modification time and the size
+    # of a file, or None if it doesn't exist.
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class FileWatcher:
+    """Detects changes in files and directories
+    by polling their modification time and size.
+
+    Files are watched even if they don't exist,
+    so that creating them is a change. The content
+    of directories is watched recursively, so adding,
+    removing, or changing a file is a change.
+    """
+
+    def __init__(self):
+        self.files: set[str] = set()
+        self.directories: set[str] = set()
+
+        # The last stamps of all the watched paths.
+        self.stamps: dict[str, tuple[int, int] | None] = {}
+
+    def watch(self, files: Iterable[str], directories: Iterable[str] = ()):
+        """Replace the watched paths and
+        take a snapshot of their state."""
+
+        self.files = {os.path.abspath(i) for i in files}
+        self.directories = {os.path.abspath(i) for i in directories}
+
+        # Paths that were already watched keep
+        # their last stamp, so that changes made
+        # since the last check are not missed.
+        self.stamps = {
+            path: self.stamps.get(path, stamp)
+            for path, stamp in self._snapshot().items()
+        }
+
+    def _snapshot(self) -> dict[str, tuple[int, int] | None]:
+        stamps = {path: file_stamp(path) for path in self.files}
+
+        for directory in self.directories:
+            for dirpath, _, filenames in os.walk(directory):
+                stamps[dirpath] = file_stamp(dirpath)
+
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    stamps[path] = file_stamp(path)
+
+        return stamps
+
+    def changes(self) -> set[str]:
+        """Return the paths that changed
+        since the last call (or `watch`)."""
+
+        stamps = self._snapshot()
+
+        changed = {
+            path
+            for path in stamps.keys() | self.stamps.keys()
+            if stamps.get(path) != self.stamps.get(path)
+        }
+
+        self.stamps = stamps
+
+        return changed
+
+
+@dataclass
+class WatchTarget:
+    # A file rebuilt by the watcher.
+    source_filename: str
+    output_filename: str
+
+    # The absolute paths of the files
+    # read to build the output.
+    dependencies: set[str] = field(default_factory=set)
+
+    # True if the last build failed. Dirty
+    # targets are built again at every change.
+    dirty: bool = False
+
+
+class WatchBuilder:
+    """Builds a set of files and rebuilds them when
+    the files they depend on change (see `run`).
+
+    * `environment_factory` creates the environment.
+      It is called again when one of the
+      `configuration_files` changes.
+    * `jobs` is a list of pairs (source filename,
+      output filename).
+
+    The process is kept alive between builds, so the
+    templates loaded by visitors stay in memory, and
+    included files that didn't change are not parsed
+    again (the memo of included files is kept).
+    Outputs are written only if their content changed.
+
+    Errors in the documents, in the templates, and in
+    the configuration are logged, and the watcher keeps
+    polling, so that they can be fixed between saves.
+    """
+
+    def __init__(
+        self,
+        visitor_class: type[BaseVisitor],
+        message_handler: BaseMessageHandler,
+        environment_factory: Callable[[], Environment],
+        jobs: Sequence[tuple[str, str]],
+        configuration_files: Sequence[str] = (),
+    ):
+        self.visitor_class = visitor_class
+        self.message_handler = message_handler
+        self.environment_factory = environment_factory
+        self.configuration_files = {os.path.abspath(i) for i in configuration_files}
+
+        self.targets = [
+            WatchTarget(source_filename, output_filename)
+            for source_filename, output_filename in jobs
+        ]
+
+        self.environment = environment_factory()
+
+        # The parsed included files, shared
+        # by all the builds. The keys contain
+        # the modification time of the file.
+        self.include_memo: dict = {}
+
+        self.watcher = FileWatcher()
+
+    def templates_directories(self) -> list[str]:
+        return [
+            str(path)
+            for path in self.environment.get("mau.visitor.templates.paths", [])
+        ]
+
+    def build(self, targets: Sequence[WatchTarget] | None = None) -> list[BatchResult]:
+        """Build the given targets (all of them by default)
+        and start watching their dependencies."""
+
+        if targets is None:
+            targets = self.targets
+
+        results = [self.build_target(target) for target in targets]
+
+        self._prune_include_memo()
+
+        dependencies = set(self.configuration_files)
+        for target in self.targets:
+            dependencies.update(target.dependencies)
+
+        self.watcher.watch(dependencies, self.templates_directories())
+
+        return results
+
+    def build_target(self, target: WatchTarget) -> BatchResult:
+        result = self._build_target(target)
+
+        target.dirty = not result.success
+
+        return result
+
+    def _build_target(self, target: WatchTarget) -> BatchResult:
+        result = BatchResult(source_filename=target.source_filename)
+
+        # The source is a dependency even if it can't be
+        # read, so that creating it triggers a build.
+        target.dependencies = {os.path.abspath(target.source_filename)}
+
+        try:
+            with open(target.source_filename, encoding="utf-8") as source_file:
+                text = source_file.read()
+        except OSError as exc:
+            result.error = (
+                f"Cannot read file '{target.source_filename}': {exc.strerror}"
+            )
+            logger.error(result.error)
+            return result
+        except UnicodeDecodeError as exc:
+            result.error = (
+                f"Cannot decode file '{target.source_filename}': {exc.reason}"
+            )
+            logger.error(result.error)
+            return result
+
+        try:
+            output = process_text(
+                self.visitor_class,
+                self.message_handler,
+                Environment.from_environment(self.environment),
+                text,
+                target.source_filename,
+                target.dependencies,
+                self.include_memo,
+            )
+
+            written = write_output_file(output, target.output_filename, if_changed=True)
+        except MauException as exc:
+            result.error = exc.message.text
+            return result
+        except processing_errors() as exc:
+            result.error = error_text(exc)
+            logger.error("%s: %s", target.source_filename, result.error)
+            return result
+
+        result.output_filename = target.output_filename
+
+        if written:
+            logger.info("Written %s", target.output_filename)
+        else:
+            logger.info("Unchanged %s", target.output_filename)
+
+        return result
+
+    def _prune_include_memo(self):
+        # Remove the included files that changed
+        # since they were parsed, or that include
+        # files that changed. The first items
+        # of a key are the path, the modification
+        # time, and the size of the file.
+        for key, entry in list(self.include_memo.items()):
+            if file_stamp(key[0]) != (key[1], key[2]) or not entry.is_current():
+                del self.include_memo[key]
+
+    def affected_targets(self, changes: set[str]) -> list[WatchTarget]:
+        # The targets that must be rebuilt
+        # after the given paths changed.
+        if changes & self.configuration_files:
+            # The configuration might change
+            # anything, so everything is rebuilt
+            # with a new environment.
+            try:
+                self.environment = self.environment_factory()
+            except (ConfigurationError, OSError) as exc:
+                # Nothing is built until the
+                # configuration is fixed.
+                logger.error("Cannot load the configuration: %s", exc)
+                return []
+
+            self.include_memo.clear()
+
+            return self.targets
+
+        templates_directories = [
+            os.path.join(os.path.abspath(i), "") for i in self.templates_directories()
+        ]
+
+        if any(
+            os.path.join(path, "").startswith(directory)
+            for path in changes
+            for directory in templates_directories
+        ):
+            return self.targets
+
+        return [
+            target
+            for target in self.targets
+            if target.dirty or target.dependencies & changes
+        ]
+
+    def poll(self) -> list[BatchResult]:
+        """Check the watched files once and rebuild
+        the targets affected by the changes."""
+
+        changes = self.watcher.changes()
+
+        if not changes:
+            return []
+
+        for path in sorted(changes):
+            logger.info("Changed %s", path)
+
+        return self.build(self.affected_targets(changes))
+
+    def run(self, interval: float = 0.5, iterations: int | None = None):
+        """Build all the targets, then poll the files every
+        `interval` seconds and rebuild what changed. Stop
+        after the given number of iterations, if any."""
+
+        self.build()
+
+        count = 0
+        while iterations is None or count < iterations:
+            time.sleep(interval)
+            self.poll()
+
+            count += 1
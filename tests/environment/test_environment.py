@@ -371,3 +371,102 @@ def test_update_no_overwrite_with_namespace():
     environment.update(other, namespace, overwrite=False)
 
     assert environment.asdict() == {"somespace": {"var1": "valueX", "var2": "value2"}}
+
+
+class Loader:
+    def __init__(self, values):
+        self.values = values
+        self.calls = 0
+
+    def load(self):
+        self.calls += 1
+        return self.values
+
+
+def test_add_lazy():
+    # Test that the values of a lazy
+    # namespace are loaded the first
+    # time one of them is read.
+    loader = Loader({"var1": "value1", "var2": "value2"})
+
+    environment = Environment.from_dict({"other": "value"})
+    environment.add_lazy("parent.child", loader)
+
+    assert environment.get("other") == "value"
+    assert environment.pending() == {"parent.child": loader}
+    assert loader.calls == 0
+
+    assert environment["parent.child.var1"] == "value1"
+    assert environment.pending() == {}
+    assert loader.calls == 1
+
+    assert environment.get("parent.child.var2") == "value2"
+    assert loader.calls == 1
+
+
+def test_add_lazy_namespace_lookup():
+    # Test that reading a namespace that
+    # contains a lazy one loads it.
+    environment = Environment()
+    environment.add_lazy("parent.child", Loader({"var1": "value1"}))
+
+    assert environment.get("parent").asdict() == {"child": {"var1": "value1"}}
+
+
+def test_add_lazy_overrides_existing_values():
+    environment = Environment.from_dict({"parent": {"var1": "old", "var2": "old"}})
+    environment.add_lazy("parent", Loader({"var1": "value1"}))
+
+    assert environment.asdict() == {"parent": {"var1": "value1", "var2": "old"}}
+
+
+def test_add_lazy_values_set_later_override_the_loader():
+    environment = Environment()
+    environment.add_lazy("parent", Loader({"var1": "value1", "var2": "value2"}))
+
+    environment["parent.var1"] = "custom"
+
+    assert environment.asflatdict() == {
+        "parent.var1": "custom",
+        "parent.var2": "value2",
+    }
+
+
+def test_add_lazy_asflatdict_without_loading():
+    loader = Loader({"var1": "value1"})
+
+    environment = Environment.from_dict({"other": "value"})
+    environment.add_lazy("parent", loader)
+
+    assert environment.asflatdict(load=False) == {"other": "value"}
+    assert loader.calls == 0
+
+
+def test_add_lazy_from_environment():
+    # Test that a copy of an environment
+    # gets the namespaces that are not
+    # loaded yet, without loading them.
+    loader = Loader({"var1": "value1"})
+
+    environment_src = Environment()
+    environment_src.add_lazy("parent", loader)
+
+    environment_dst = Environment.from_environment(environment_src, "namespace")
+
+    assert loader.calls == 0
+    assert environment_dst.pending() == {"namespace.parent": loader}
+    assert environment_dst.get("namespace.parent.var1") == "value1"
+    assert environment_src.pending() == {"parent": loader}
+
+
+def test_add_lazy_update():
+    loader = Loader({"var1": "value1"})
+
+    environment_src = Environment()
+    environment_src.add_lazy("parent", loader)
+
+    environment_dst = Environment.from_dict({"parent": {"var1": "old"}})
+    environment_dst.update(environment_src)
+
+    assert loader.calls == 0
+    assert environment_dst.get("parent.var1") == "value1"
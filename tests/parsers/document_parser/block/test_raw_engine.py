@@ -111,3 +111,28 @@ def test_raw_parenthood_labels():
     # raw it has been assigned to.
     check_parent(raw_node, label_title_nodes)
     check_parent(raw_node, label_role_nodes)
+
+
+def test_raw_engine_stores_content_as_text():
+    source = """
+    [engine=raw]
+    ----
+    Raw content
+    on multiple lines
+    ----
+    """
+
+    parser = runner(source)
+    node = parser.nodes[0]
+
+    # Line nodes are created only when needed.
+    assert node.has_line_nodes is False
+    assert node.raw_text == "Raw content\non multiple lines"
+    assert node.has_line_nodes is False
+
+    assert [line.value for line in node.content] == [
+        "Raw content",
+        "on multiple lines",
+    ]
+    assert all(line.parent is node for line in node.content)
+    assert node.has_line_nodes is True
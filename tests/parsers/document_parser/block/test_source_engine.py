@@ -724,3 +724,37 @@ def test_source_parenthood_labels():
     # source it has been assigned to.
     check_parent(source_node, label_title_nodes)
     check_parent(source_node, label_role_nodes)
+
+
+def test_source_engine_stores_code_once():
+    source = """
+    [engine=source]
+    ----
+    import sys
+    import os:mark1:
+    import enum:@:
+    ----
+    """
+
+    parser = runner(source)
+    node = parser.nodes[0]
+
+    # Line nodes are created only when needed.
+    assert node.has_line_nodes is False
+    assert node.source_content.markers == {1: "mark1"}
+    assert node.source_content.highlights == {2: "default"}
+    assert node.code == "import sys\nimport os\nimport enum"
+    assert list(node.source_content.lines()) == [
+        ("1", "import sys", None, None),
+        ("2", "import os", None, "mark1"),
+        ("3", "import enum", "default", None),
+    ]
+    assert node.has_line_nodes is False
+
+    assert [line.line_content for line in node.content] == [
+        "import sys",
+        "import os",
+        "import enum",
+    ]
+    assert all(line.parent is node for line in node.content)
+    assert node.has_line_nodes is True
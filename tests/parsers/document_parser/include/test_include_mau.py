@@ -805,3 +805,129 @@ def test_include_mau_loop_is_forbidden():
         == f"To avoid recursion, you cannot include the following files: ['{TEST_CONTEXT_SOURCE}', '/path/to/it', '/another/path']."
     )
     assert exc.value.message.context == Context(0, 0, 0, 6, source="/another/path")
+
+
+def test_include_mau_diamond_inclusion_is_allowed():
+    # This tests that a file can be included
+    # by two sibling files, as only the files
+    # that are including it are forbidden.
+
+    source = """
+    << mau:/path/to/first
+
+    << mau:/path/to/second
+    """
+
+    MAU_TEXT_FIRST = dedent("""
+    << mau:/path/to/shared
+    """)
+
+    MAU_TEXT_SECOND = dedent("""
+    << mau:/path/to/shared
+    """)
+
+    MAU_TEXT_SHARED = dedent("""
+    This is a paragraph.
+    """)
+
+    with patch(
+        "builtins.open",
+        side_effect=[
+            mock_open(read_data=MAU_TEXT_FIRST).return_value,
+            mock_open(read_data=MAU_TEXT_SHARED).return_value,
+            mock_open(read_data=MAU_TEXT_SECOND).return_value,
+            mock_open(read_data=MAU_TEXT_SHARED).return_value,
+        ],
+    ):
+        parser = runner(source)
+
+    assert [(i.caller_uri, i.callee_uri) for i in parser.output.include_calls] == [
+        (TEST_CONTEXT_SOURCE, "/path/to/first"),
+        ("/path/to/first", "/path/to/shared"),
+        (TEST_CONTEXT_SOURCE, "/path/to/second"),
+        ("/path/to/second", "/path/to/shared"),
+    ]
+
+
+def test_include_mau_repeated_inclusion_is_memoised(tmp_path):
+    # This tests that a file included more
+    # than once with the same arguments
+    # is read and parsed only once.
+
+    shared = tmp_path / "shared.mau"
+    shared.write_text("This is a paragraph.")
+
+    source = f"""
+    << mau:{shared}
+
+    << mau:{shared}
+
+    << mau:{shared}, call:name=value
+    """
+
+    with patch(
+        "mau.parsers.document_processors.include.open", create=True, wraps=open
+    ) as mock_file:
+        parser = runner(source)
+
+    # The call with different arguments
+    # is parsed separately.
+    assert mock_file.call_count == 2
+    assert len(parser.output.include_calls) == 3
+
+    first, second, third = parser.nodes
+
+    # The memoised content is a copy.
+    compare_nodes_sequence(second.content, first.content)
+    compare_nodes_sequence(third.content, first.content)
+    assert second.content[0] is not first.content[0]
+    assert second.content[0].parent is not first.content[0].parent
+    assert second.content[0].lines[0].parent is second.content[0]
+
+
+def test_include_mau_memo_checks_the_file(tmp_path):
+    # This tests that a file changed
+    # during the run is parsed again.
+
+    shared = tmp_path / "shared.mau"
+    shared.write_text("This is a paragraph.")
+
+    parser = init_parser(f"<< mau:{shared}")
+    parser.parse()
+
+    shared.write_text("This is another paragraph with more text.")
+
+    second_parser = init_parser(f"<< mau:{shared}")
+    second_parser.include_memo = parser.include_memo
+    second_parser.parse()
+
+    assert (
+        second_parser.nodes[0].content[0].lines[0].content[0].value
+        == "This is another paragraph with more text."
+    )
+
+
+def test_include_mau_memo_checks_nested_files(tmp_path):
+    # This tests that a memoised file is parsed
+    # again if a file it includes changed, even
+    # if the file itself didn't change.
+
+    nested = tmp_path / "nested.mau"
+    nested.write_text("This is a paragraph.")
+
+    shared = tmp_path / "shared.mau"
+    shared.write_text(f"<< mau:{nested}")
+
+    parser = init_parser(f"<< mau:{shared}")
+    parser.parse()
+
+    nested.write_text("This is another paragraph with more text.")
+
+    second_parser = init_parser(f"<< mau:{shared}")
+    second_parser.include_memo = parser.include_memo
+    second_parser.parse()
+
+    assert (
+        second_parser.nodes[0].content[0].content[0].lines[0].content[0].value
+        == "This is another paragraph with more text."
+    )
@@ -13,6 +13,7 @@ from mau.nodes.node_arguments import NodeArguments
 from mau.nodes.paragraph import ParagraphLineNode, ParagraphNode
 from mau.parsers.document_parser import DocumentParser
 from mau.parsers.document_processors.include import IncludeCall
+from mau.parsers.parse_cache import ParseRecorder, file_signature
 from mau.test_helpers import (
     TEST_CONTEXT_SOURCE,
     compare_nodes_sequence,
@@ -113,3 +114,56 @@ def test_include_mau_invalid_uri():
     assert exc.value.message.type == MauMessageType.ERROR_PARSER
     assert exc.value.message.text == "File 'doesnotexist.mau' cannot be read."
     assert exc.value.message.context == generate_context(1, 0, 1, 6)
+
+
+def test_include_raw_lazy(tmp_path):
+    included = tmp_path / "included.txt"
+    included.write_text("Line 1\nLine 2")
+
+    source = f"""
+    << raw:{included}
+    """
+
+    environment = Environment.from_dict({"parser": {"lazy_raw_includes": True}}, "mau")
+
+    with patch("builtins.open", side_effect=AssertionError) as mock_file:
+        parser = runner(source, environment)
+
+    # The file is not read by the parser.
+    mock_file.assert_not_called()
+
+    node = parser.nodes[0]
+    assert node.raw_content.uri == str(included)
+    assert node.raw_text == "Line 1\nLine 2"
+    assert [line.value for line in node.content] == ["Line 1", "Line 2"]
+
+
+def test_include_raw_lazy_records_the_file(tmp_path):
+    included = tmp_path / "included.txt"
+    included.write_text("Line 1\nLine 2")
+
+    source = f"""
+    << raw:{included}
+    """
+
+    environment = Environment.from_dict({"parser": {"lazy_raw_includes": True}}, "mau")
+    environment.recorder = ParseRecorder()
+
+    runner(source, environment)
+
+    # The file is a dependency even if it is
+    # read only when the output is rendered.
+    assert environment.recorder.files == {str(included): file_signature(included)}
+
+
+def test_include_raw_lazy_invalid_uri():
+    source = """
+    << raw:doesnotexist.mau
+    """
+
+    environment = Environment.from_dict({"parser": {"lazy_raw_includes": True}}, "mau")
+
+    with pytest.raises(MauException) as exc:
+        runner(source, environment)
+
+    assert exc.value.message.text == "File 'doesnotexist.mau' cannot be read."
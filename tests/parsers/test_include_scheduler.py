@@ -0,0 +1,92 @@
+import pytest
+
+from mau.environment.environment import Environment
+from mau.message import MauException
+from mau.parsers.document_parser import DocumentParser
+from mau.parsers.include_scheduler import IncludeScheduler
+from mau.test_helpers import NullMessageHandler, compare_nodes_sequence
+
+
+def write_book(tmp_path):
+    shared = tmp_path / "shared.mau"
+    shared.write_text("Shared *content*.")
+
+    for index in range(3):
+        chapter = tmp_path / f"chapter{index}.mau"
+        chapter.write_text(
+            f"= Chapter {index}\n\nText of chapter {index}.\n\n<< mau:{shared}\n"
+        )
+
+    return "\n\n".join(f"<< mau:{tmp_path}/chapter{index}.mau" for index in range(3))
+
+
+def parse(text, include_jobs):
+    environment = Environment.from_dict(
+        {"parser": {"include_jobs": include_jobs}}, "mau"
+    )
+
+    return DocumentParser.lex_and_parse(
+        text,
+        NullMessageHandler,
+        environment,
+        source_filename="book.mau",
+    )
+
+
+def test_concurrent_includes_match_sequential_parsing(tmp_path):
+    text = write_book(tmp_path)
+
+    sequential_parser = parse(text, 1)
+    parser = parse(text, 2)
+
+    compare_nodes_sequence(parser.nodes, sequential_parser.nodes)
+    assert parser.output.include_calls == sequential_parser.output.include_calls
+    assert parser.include_scheduler is None
+
+    callees = [call.callee_uri for call in parser.output.include_calls]
+    assert callees == [
+        f"{tmp_path}/chapter0.mau",
+        f"{tmp_path}/shared.mau",
+        f"{tmp_path}/chapter1.mau",
+        f"{tmp_path}/shared.mau",
+        f"{tmp_path}/chapter2.mau",
+        f"{tmp_path}/shared.mau",
+    ]
+
+
+def test_concurrent_includes_report_missing_files(tmp_path):
+    with pytest.raises(MauException) as exc:
+        parse(f"<< mau:{tmp_path}/missing.mau", 2)
+
+    assert exc.value.message.text == f"File '{tmp_path}/missing.mau' cannot be read."
+
+
+def test_concurrent_includes_report_recursion(tmp_path):
+    first = tmp_path / "first.mau"
+    second = tmp_path / "second.mau"
+    first.write_text(f"<< mau:{second}")
+    second.write_text(f"<< mau:{first}")
+
+    with pytest.raises(MauException) as exc:
+        parse(f"<< mau:{first}", 2)
+
+    assert exc.value.message.text.startswith("To avoid recursion")
+
+
+def test_scheduler_shares_futures_and_skips_unpicklable_environments(tmp_path):
+    included = tmp_path / "included.mau"
+    included.write_text("Some text.")
+
+    scheduler = IncludeScheduler(1, NullMessageHandler)
+
+    try:
+        future = scheduler.schedule(("key",), str(included), Environment(), [])
+        assert scheduler.schedule(("key",), str(included), Environment(), []) is future
+
+        environment = Environment.from_dict({"function": lambda: None})
+        assert scheduler.schedule(("other",), str(included), environment, []) is None
+
+        result = future.result().result()
+        assert result.files == {str(included): result.files[str(included)]}
+    finally:
+        scheduler.shutdown()
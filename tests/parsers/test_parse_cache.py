@@ -0,0 +1,169 @@
+from unittest.mock import patch
+
+from mau.environment.environment import Environment
+from mau.parsers import parse_cache
+from mau.parsers.document_parser import DocumentParser
+from mau.parsers.parse_cache import ParseRecorder, get_parse_cache
+from mau.test_helpers import NullMessageHandler, compare_nodes_sequence
+
+TEXT = """
+:name:Mau
+
+= Title
+
+Hello {name}.
+"""
+
+
+def cached_environment(tmp_path, **variables):
+    environment = Environment.from_dict(
+        {"parser": {"cache": {"path": str(tmp_path / "cache")}}, **variables},
+        "mau",
+    )
+
+    return environment
+
+
+def parse(text, environment, source_filename="main.mau"):
+    return DocumentParser.lex_and_parse(
+        text,
+        NullMessageHandler,
+        environment,
+        source_filename=source_filename,
+    )
+
+
+def test_parse_recorder_propagates_to_parent():
+    parent = ParseRecorder()
+    child = ParseRecorder(parent)
+
+    child.record_key("a.b")
+    child.record_file("file.mau", "digest")
+
+    assert parent.keys == {"a.b"}
+    assert parent.files == {"file.mau": "digest"}
+
+
+def test_environment_records_keys():
+    environment = Environment.from_dict({"a": {"b": 1}, "c": 2})
+    environment.recorder = ParseRecorder()
+
+    environment.get("a.b")
+    environment["c"]
+    environment.get("d", 3)
+
+    assert environment.recorder.keys == {"a.b", "c", "d"}
+
+
+def test_get_parse_cache_requires_a_path(tmp_path):
+    assert get_parse_cache(Environment()) is None
+
+    environment = cached_environment(tmp_path)
+    assert get_parse_cache(environment) is get_parse_cache(environment)
+
+    environment["mau.parser.cache.enabled"] = False
+    assert get_parse_cache(environment) is None
+
+
+def test_parse_cache_hit_skips_parsing(tmp_path):
+    environment = cached_environment(tmp_path, envvars={"who": "world"})
+    parser = parse(TEXT, Environment.from_environment(environment))
+
+    with patch(
+        "mau.parsers.base_parser.BaseParser.lex_and_parse"
+    ) as mock_lex_and_parse:
+        cached_environment_copy = Environment.from_environment(environment)
+        cached_parser = parse(TEXT, cached_environment_copy)
+
+    mock_lex_and_parse.assert_not_called()
+    assert get_parse_cache(environment).hits == 1
+
+    compare_nodes_sequence(cached_parser.nodes, parser.nodes)
+    assert cached_parser.output.document.content == cached_parser.nodes
+
+    # Variables defined by the
+    # document are set again.
+    assert cached_environment_copy["name"] == "Mau"
+
+
+def test_parse_cache_depends_on_the_values_read(tmp_path):
+    text = "Hello {mau.envvars.who}."
+
+    environment = cached_environment(tmp_path, envvars={"who": "world"})
+    parse(text, Environment.from_environment(environment))
+
+    # A variable that the document
+    # doesn't read doesn't matter.
+    other_environment = Environment.from_environment(environment)
+    other_environment["mau.envvars.unused"] = "value"
+    parse(text, other_environment)
+
+    assert get_parse_cache(environment).hits == 1
+
+    # A different value of a variable
+    # read by the document is a miss.
+    changed_environment = Environment.from_environment(environment)
+    changed_environment["mau.envvars.who"] = "everyone"
+    parser = parse(text, changed_environment)
+
+    assert get_parse_cache(environment).hits == 1
+    assert parser.nodes[0].lines[0].content[0].value == "Hello everyone."
+
+
+def test_parse_cache_checks_included_files(tmp_path):
+    included = tmp_path / "included.mau"
+    included.write_text("Included text")
+    text = f"<< mau:{included}"
+
+    environment = cached_environment(tmp_path)
+    parse(text, Environment.from_environment(environment))
+    parser = parse(text, Environment.from_environment(environment))
+
+    assert get_parse_cache(environment).hits == 1
+    assert [call.callee_uri for call in parser.output.include_calls] == [str(included)]
+
+    # Changing the included file
+    # invalidates the document.
+    included.write_text("Changed text")
+    parser = parse(text, Environment.from_environment(environment))
+
+    value = parser.nodes[0].content[0].lines[0].content[0].value
+    assert value == "Changed text"
+
+
+def test_parse_cache_checks_lazy_raw_includes(tmp_path):
+    included = tmp_path / "included.txt"
+    included.write_text("Raw one")
+    text = f"<< raw:{included}"
+
+    environment = cached_environment(tmp_path)
+    environment["mau.parser.lazy_raw_includes"] = True
+    parse(text, Environment.from_environment(environment))
+    parse(text, Environment.from_environment(environment))
+
+    assert get_parse_cache(environment).hits == 1
+
+    # Changing the included file
+    # invalidates the document.
+    included.write_text("Raw two, longer")
+    parser = parse(text, Environment.from_environment(environment))
+
+    assert get_parse_cache(environment).hits == 1
+    assert parser.nodes[0].raw_text == "Raw two, longer"
+
+
+def test_parse_cache_skips_values_that_cannot_be_stored(tmp_path):
+    cache = parse_cache.ParseCache(tmp_path)
+
+    assert cache._store("key", lambda: None) is False
+    assert cache._load("key") is None
+
+
+def test_parse_cache_prunes_entries(tmp_path):
+    environment = cached_environment(tmp_path)
+    environment["mau.parser.cache.max_size"] = 1
+
+    with patch.object(parse_cache.ParseCache, "prune") as mock_prune:
+        parse(TEXT, Environment.from_environment(environment))
+
+    mock_prune.assert_called_once()
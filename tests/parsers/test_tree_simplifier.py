@@ -0,0 +1,134 @@
+from unittest.mock import patch
+
+from mau.environment.environment import Environment
+from mau.lexers.document_lexer import DocumentLexer
+from mau.nodes.inline import StyleNode, TextNode, VerbatimNode
+from mau.nodes.node import NodeInfo, WrapperNode
+from mau.nodes.paragraph import ParagraphLineNode
+from mau.parsers.document_parser import DocumentParser
+from mau.parsers.tree_simplifier import TreeSimplifier
+from mau.test_helpers import (
+    compare_nodes_sequence,
+    generate_context,
+    parser_runner_factory,
+)
+
+runner = parser_runner_factory(DocumentLexer, DocumentParser)
+
+
+def test_simplifier_merges_adjacent_text_nodes():
+    line = ParagraphLineNode(
+        content=[
+            TextNode("a", info=NodeInfo(context=generate_context(0, 0, 0, 1))),
+            TextNode("b", info=NodeInfo(context=generate_context(0, 1, 0, 2))),
+            VerbatimNode("c"),
+            TextNode("d"),
+        ]
+    )
+
+    assert TreeSimplifier().process(line) == 1
+
+    compare_nodes_sequence(
+        line.content,
+        [
+            TextNode("ab", info=NodeInfo(context=generate_context(0, 0, 0, 2))),
+            VerbatimNode("c"),
+            TextNode("d"),
+        ],
+    )
+
+
+def test_simplifier_merges_text_nodes_recursively():
+    style = StyleNode("star", content=[TextNode("a"), TextNode("b")])
+    line = ParagraphLineNode(content=[style])
+
+    assert TreeSimplifier().process(line) == 1
+
+    compare_nodes_sequence(style.content, [TextNode("ab")])
+
+
+def test_simplifier_unwraps_plain_wrappers():
+    line = ParagraphLineNode(
+        content=[
+            TextNode("a"),
+            WrapperNode(content=[TextNode("b"), VerbatimNode("c")]),
+        ]
+    )
+
+    # The wrapper is removed and
+    # the two text nodes merged.
+    assert TreeSimplifier().process(line) == 2
+
+    compare_nodes_sequence(line.content, [TextNode("ab"), VerbatimNode("c")])
+    assert line.content[1].parent is line
+
+
+def test_simplifier_keeps_empty_styles_by_default():
+    line = ParagraphLineNode(content=[TextNode("a"), StyleNode("star")])
+
+    assert TreeSimplifier().process(line) == 0
+
+
+def test_simplifier_removes_empty_styles():
+    line = ParagraphLineNode(
+        content=[TextNode("a"), StyleNode("star"), TextNode("b")],
+    )
+
+    assert TreeSimplifier(remove_empty_styles=True).process(line) == 2
+
+    compare_nodes_sequence(line.content, [TextNode("ab")])
+
+
+def test_simplifier_options():
+    line = ParagraphLineNode(
+        content=[TextNode("a"), WrapperNode(content=[TextNode("b")])],
+    )
+
+    assert TreeSimplifier(merge_text=False, unwrap=False).process(line) == 0
+
+
+def test_document_parser_simplification_is_disabled_by_default():
+    parser = runner("Some $text$ here")
+
+    assert parser.output.simplified_nodes == 0
+    assert len(parser.nodes[0].lines[0].content) == 3
+
+
+def test_document_parser_simplification():
+    environment = Environment()
+    environment["mau.parser.simplify.enabled"] = True
+
+    parser = runner("Some $text$ here", environment)
+
+    assert parser.output.simplified_nodes == 2
+
+    compare_nodes_sequence(
+        parser.nodes[0].lines[0].content,
+        [
+            TextNode(
+                "Some text here",
+                info=NodeInfo(context=generate_context(0, 0, 0, 16)),
+            )
+        ],
+    )
+
+
+def test_document_parser_simplifies_only_the_document():
+    environment = Environment()
+    environment["mau.parser.simplify.enabled"] = True
+
+    source = """
+    ----
+    Some $text$ here
+    ----
+    """
+
+    with patch.object(
+        TreeSimplifier, "process", autospec=True, side_effect=TreeSimplifier.process
+    ) as mock_process:
+        parser = runner(source, environment)
+
+    # The nested parser of the block
+    # doesn't simplify its nodes.
+    assert mock_process.call_count == 1
+    assert parser.output.simplified_nodes == 2
@@ -0,0 +1,236 @@
+import json
+import os
+
+from mau import Mau
+from mau.batch import (
+    common_directory,
+    expand_inputs,
+    output_filename_for,
+    process_file,
+    process_files,
+    write_output_file,
+)
+from mau.environment.environment import Environment
+from mau.test_helpers import NullMessageHandler
+from mau.visitors.binary_visitor import BinaryVisitor, unpack
+from mau.visitors.html_visitor import HtmlVisitor
+from mau.visitors.json_visitor import JsonVisitor
+
+
+def create_sources(directory, count=3):
+    sources = []
+
+    for index in range(count):
+        path = directory / f"doc{index}.mau"
+        path.write_text(f":value:{index}\n\nDocument {{value}}\n")
+        sources.append(path.as_posix())
+
+    return sources
+
+
+def test_expand_inputs(tmp_path):
+    sources = create_sources(tmp_path)
+
+    assert expand_inputs([f"{tmp_path}/*.mau"]) == sources
+
+
+def test_expand_inputs_removes_duplicates(tmp_path):
+    sources = create_sources(tmp_path)
+
+    assert expand_inputs([sources[1], f"{tmp_path}/*.mau"]) == [
+        sources[1],
+        sources[0],
+        sources[2],
+    ]
+
+
+def test_expand_inputs_keeps_missing_files():
+    assert expand_inputs(["missing.mau"]) == ["missing.mau"]
+
+
+def test_expand_inputs_manifest(tmp_path):
+    sources = create_sources(tmp_path)
+
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text(f"# A comment\n\n{sources[2]}\n{sources[0]}\n")
+
+    assert expand_inputs([], manifest.as_posix()) == [sources[2], sources[0]]
+
+
+def test_common_directory(tmp_path):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+
+    assert (
+        common_directory(
+            [(tmp_path / "a" / "b" / "x.mau").as_posix(), (tmp_path / "a" / "y.mau")]
+        )
+        == (tmp_path / "a").as_posix()
+    )
+
+
+def test_output_filename_for():
+    assert output_filename_for("dir/doc.mau", "yaml") == "dir/doc.yaml"
+    assert output_filename_for("dir/doc.mau", ".j2") == "dir/doc.j2"
+    assert output_filename_for("dir/doc.mau", "yaml", "out") == "out/doc.yaml"
+
+
+def test_output_filename_for_base_dir(tmp_path):
+    source = (tmp_path / "a" / "b" / "doc.mau").as_posix()
+
+    assert (
+        output_filename_for(source, "yaml", "out", (tmp_path / "a").as_posix())
+        == "out/b/doc.yaml"
+    )
+
+
+def test_process_file_returns_output(tmp_path):
+    sources = create_sources(tmp_path, 1)
+
+    result = process_file(JsonVisitor, NullMessageHandler(), Environment(), sources[0])
+
+    assert result.success
+    assert result.output_filename is None
+    assert json.loads(result.output)["_type"] == "document"
+
+
+def test_process_file_writes_output(tmp_path):
+    sources = create_sources(tmp_path, 1)
+    output = (tmp_path / "out" / "doc.msgpack").as_posix()
+
+    result = process_file(
+        BinaryVisitor, NullMessageHandler(), Environment(), sources[0], output
+    )
+
+    assert result.success
+    assert result.output is None
+    assert result.output_filename == output
+
+    with open(output, "rb") as output_file:
+        assert unpack(output_file.read())["_type"] == "document"
+
+
+def test_process_file_does_not_change_the_environment(tmp_path):
+    sources = create_sources(tmp_path, 1)
+    environment = Environment()
+
+    process_file(JsonVisitor, NullMessageHandler(), environment, sources[0])
+
+    assert environment.get("value") is None
+
+
+def test_process_file_missing_file():
+    result = process_file(
+        JsonVisitor, NullMessageHandler(), Environment(), "missing.mau"
+    )
+
+    assert not result.success
+    assert "missing.mau" in result.error
+
+
+def test_process_file_mau_error(tmp_path):
+    source = tmp_path / "error.mau"
+    source.write_text("{undefined}\n")
+
+    result = process_file(
+        JsonVisitor, NullMessageHandler(), Environment(), source.as_posix()
+    )
+
+    assert not result.success
+    assert result.error
+
+
+def test_process_file_template_error(tmp_path):
+    sources = create_sources(tmp_path, 1)
+    environment = Environment()
+    environment.dupdate({"text.j2": "{{ value }"}, "mau.visitor.templates.custom")
+
+    result = process_file(HtmlVisitor, NullMessageHandler(), environment, sources[0])
+
+    assert not result.success
+    assert result.error.startswith("TemplateSyntaxError: ")
+
+
+def test_process_files_undecodable_file(tmp_path):
+    sources = create_sources(tmp_path)
+    (tmp_path / "doc1.mau").write_bytes(b"Caf\xe9\n")
+    jobs = [(source, None) for source in sources]
+
+    results = process_files(
+        JsonVisitor, NullMessageHandler(), Environment(), jobs, workers=1
+    )
+
+    # The other files are processed anyway.
+    assert [result.success for result in results] == [True, False, True]
+    assert results[1].error.startswith(
+        f"Cannot decode file '{sources[1]}': invalid continuation byte"
+    )
+
+
+def test_process_files_in_parallel(tmp_path):
+    sources = create_sources(tmp_path, 4)
+    jobs = [(source, None) for source in sources] + [("missing.mau", None)]
+
+    sequential = process_files(
+        JsonVisitor, NullMessageHandler(), Environment(), jobs, workers=1
+    )
+    parallel = process_files(
+        JsonVisitor, NullMessageHandler(), Environment(), jobs, workers=2
+    )
+
+    assert sequential == parallel
+    assert [result.success for result in parallel] == [True] * 4 + [False]
+
+
+def test_mau_process_many(tmp_path):
+    sources = create_sources(tmp_path)
+    output_dir = tmp_path / "out"
+
+    mau = Mau(NullMessageHandler(), Environment())
+    results = mau.process_many(
+        JsonVisitor, sources, output_dir=output_dir.as_posix(), jobs=2
+    )
+
+    assert [result.output_filename for result in results] == [
+        (output_dir / f"doc{index}.json").as_posix() for index in range(3)
+    ]
+
+    for index, result in enumerate(results):
+        with open(result.output_filename) as output_file:
+            data = json.load(output_file)
+        assert data["content"][0]["lines"][0]["content"][0]["value"] == (
+            f"Document {index}"
+        )
+
+
+def test_mau_process_many_without_writing(tmp_path):
+    sources = create_sources(tmp_path)
+
+    mau = Mau(NullMessageHandler(), Environment())
+    results = mau.process_many(JsonVisitor, sources, write=False)
+
+    assert all(result.output for result in results)
+    assert not list(tmp_path.glob("*.json"))
+
+
+def test_write_output_file_if_changed(tmp_path):
+    output = tmp_path / "out" / "doc.html"
+
+    assert write_output_file("Some text", output.as_posix(), if_changed=True)
+    assert output.read_text() == "Some text\n"
+
+    os.utime(output, ns=(0, 0))
+
+    assert not write_output_file("Some text", output.as_posix(), if_changed=True)
+    assert output.stat().st_mtime_ns == 0
+
+    assert write_output_file("Other text", output.as_posix(), if_changed=True)
+    assert output.read_text() == "Other text\n"
+
+
+def test_write_output_file_if_changed_binary(tmp_path):
+    output = tmp_path / "doc.bin"
+
+    assert write_output_file(b"data", output.as_posix(), if_changed=True)
+    assert not write_output_file(b"data", output.as_posix(), if_changed=True)
+    assert write_output_file(b"other", output.as_posix(), if_changed=True)
+    assert output.read_bytes() == b"other"
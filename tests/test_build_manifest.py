@@ -0,0 +1,204 @@
+import json
+import os
+from unittest.mock import patch
+
+from mau import batch
+from mau.batch import process_file
+from mau.build_manifest import build_key, is_up_to_date, manifest_filename
+from mau.environment.environment import Environment
+from mau.test_helpers import NullMessageHandler
+from mau.visitors.html_visitor import HtmlVisitor
+from mau.visitors.json_visitor import JsonVisitor
+
+
+def write(path, text):
+    # Write the file and make sure that its
+    # modification time changes, as the
+    # resolution of the clock might be low.
+    stamp = path.stat().st_mtime_ns if path.exists() else 0
+
+    path.write_text(text)
+
+    if path.stat().st_mtime_ns <= stamp:
+        os.utime(path, ns=(stamp + 1_000_000, stamp + 1_000_000))
+
+
+def create_source(tmp_path):
+    write(tmp_path / "included.mau", "Included text\n")
+    write(tmp_path / "doc.mau", f"Document\n\n<< mau:{tmp_path}/included.mau\n")
+
+    return (tmp_path / "doc.mau").as_posix(), (tmp_path / "doc.html").as_posix()
+
+
+def build(source, output, environment=None, **kwds):
+    return process_file(
+        HtmlVisitor,
+        NullMessageHandler(),
+        environment or Environment(),
+        source,
+        output,
+        build_manifest=True,
+        **kwds,
+    )
+
+
+def test_manifest_filename():
+    assert manifest_filename("/path/to/doc.html") == "/path/to/.doc.html.mau-build.json"
+
+
+def test_build_writes_manifest(tmp_path):
+    source, output = create_source(tmp_path)
+
+    result = build(source, output)
+
+    assert result.success
+    assert not result.skipped
+
+    with open(manifest_filename(output), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    assert manifest["key"] == build_key(HtmlVisitor, Environment())
+    assert sorted(manifest["files"]) == [
+        (tmp_path / "doc.mau").as_posix(),
+        (tmp_path / "included.mau").as_posix(),
+    ]
+
+
+def test_build_skips_outputs_that_are_up_to_date(tmp_path):
+    source, output = create_source(tmp_path)
+    build(source, output)
+
+    with patch.object(batch, "process_text") as mock_process_text:
+        result = build(source, output)
+
+    mock_process_text.assert_not_called()
+    assert result.skipped
+    assert result.output_filename == output
+
+
+def test_build_touched_files_are_unchanged(tmp_path):
+    source, output = create_source(tmp_path)
+    build(source, output)
+
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert build(source, output).skipped
+
+
+def test_build_included_file_changed(tmp_path):
+    source, output = create_source(tmp_path)
+    build(source, output)
+
+    write(tmp_path / "included.mau", "Changed text\n")
+
+    result = build(source, output)
+
+    assert not result.skipped
+    assert "Changed text" in (tmp_path / "doc.html").read_text()
+
+
+def test_build_lazy_raw_included_file_changed(tmp_path):
+    write(tmp_path / "snippet.html", "RAW ONE\n")
+    write(tmp_path / "doc.mau", f"<< raw:{tmp_path}/snippet.html\n")
+    source, output = (
+        (tmp_path / "doc.mau").as_posix(),
+        (tmp_path / "doc.html").as_posix(),
+    )
+
+    environment = Environment.from_dict({"parser": {"lazy_raw_includes": True}}, "mau")
+    build(source, output, environment)
+
+    write(tmp_path / "snippet.html", "RAW TWO\n")
+
+    result = build(source, output, environment)
+
+    assert not result.skipped
+    assert "RAW TWO" in (tmp_path / "doc.html").read_text()
+
+
+def test_build_configuration_file_changed(tmp_path):
+    source, output = create_source(tmp_path)
+    config = tmp_path / "config.yaml"
+    write(config, "")
+
+    build(source, output, configuration_files=[config.as_posix()])
+    assert build(source, output, configuration_files=[config.as_posix()]).skipped
+
+    write(config, "key: value\n")
+
+    assert not build(source, output, configuration_files=[config.as_posix()]).skipped
+
+
+def test_build_environment_changed(tmp_path):
+    source, output = create_source(tmp_path)
+    build(source, output)
+
+    environment = Environment.from_dict({"mau.envvars.key": "value"})
+
+    assert not build(source, output, environment).skipped
+
+
+def test_build_key_ignores_jobs_and_caches():
+    environment = Environment.from_dict(
+        {
+            "mau.parser.include_jobs": 4,
+            "mau.visitor.jobs": 4,
+            "mau.visitor.render_cache.path": "/some/path",
+        }
+    )
+
+    assert build_key(HtmlVisitor, environment) == build_key(HtmlVisitor, Environment())
+
+
+def test_build_key_depends_on_the_visitor():
+    assert build_key(HtmlVisitor, Environment()) != build_key(
+        JsonVisitor, Environment()
+    )
+
+
+def test_build_templates_added(tmp_path):
+    source, output = create_source(tmp_path)
+
+    templates = tmp_path / "templates"
+    templates.mkdir()
+
+    environment = Environment.from_dict(
+        {"mau.visitor.templates.paths": [templates.as_posix()]}
+    )
+
+    build(source, output, environment)
+    assert build(source, output, environment).skipped
+
+    write(templates / "text.j2", "##{{ value }}##")
+
+    assert not build(source, output, environment).skipped
+    assert "##Document##" in (tmp_path / "doc.html").read_text()
+
+
+def test_build_output_changed(tmp_path):
+    source, output = create_source(tmp_path)
+    build(source, output)
+
+    write(tmp_path / "doc.html", "Something else")
+
+    assert not is_up_to_date(
+        output, build_key(HtmlVisitor, Environment()), Environment()
+    )
+    assert not build(source, output).skipped
+    assert "Document" in (tmp_path / "doc.html").read_text()
+
+
+def test_build_does_not_rewrite_unchanged_outputs(tmp_path):
+    source, output = create_source(tmp_path)
+    build(source, output)
+
+    os.utime(output, ns=(0, 0))
+
+    # The source changes, but the output doesn't.
+    write(tmp_path / "doc.mau", f"Document\n\n\n<< mau:{tmp_path}/included.mau\n")
+
+    result = build(source, output)
+
+    assert not result.skipped
+    assert os.stat(output).st_mtime_ns == 0
@@ -0,0 +1,86 @@
+import os
+
+from mau.cache import DiskCache, stable_hash
+from mau.nodes.inline import TextNode
+from mau.nodes.node import NodeInfo
+from mau.nodes.paragraph import ParagraphLineNode, ParagraphNode
+from mau.test_helpers import generate_context
+
+
+def test_disk_cache_get_and_set(tmp_path):
+    cache = DiskCache(tmp_path)
+
+    assert cache.get("abcdef") is None
+
+    cache.set("abcdef", b"some value")
+
+    assert cache.get("abcdef") == b"some value"
+    assert (tmp_path / "ab" / "abcdef").exists()
+
+
+def test_disk_cache_overwrite(tmp_path):
+    cache = DiskCache(tmp_path)
+
+    cache.set("abcdef", b"some value")
+    cache.set("abcdef", b"another value")
+
+    assert cache.get("abcdef") == b"another value"
+
+
+def test_disk_cache_prune_removes_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_size=20)
+
+    for index, key in enumerate(["key1", "key2", "key3"]):
+        cache.set(key, b"0123456789")
+        os.utime(cache._path(key), ns=(index * 10**9, index * 10**9))
+
+    # Reading an entry marks it as recently used.
+    cache.get("key1")
+
+    assert cache.prune() == 1
+    assert cache.get("key1") == b"0123456789"
+    assert cache.get("key2") is None
+    assert cache.get("key3") == b"0123456789"
+
+
+def test_disk_cache_prune_within_size(tmp_path):
+    cache = DiskCache(tmp_path, max_size=100)
+
+    cache.set("key1", b"0123456789")
+
+    assert cache.prune() == 0
+    assert cache.get("key1") == b"0123456789"
+
+
+def test_stable_hash_values():
+    assert stable_hash("a", 1, [None, True], {"key": 1.5}) == stable_hash(
+        "a", 1, [None, True], {"key": 1.5}
+    )
+    assert stable_hash("a") != stable_hash("b")
+    assert stable_hash(1) != stable_hash("1")
+    assert stable_hash(["a", "b"]) != stable_hash(["ab"])
+    assert stable_hash({"a", "b"}) == stable_hash({"b", "a"})
+
+
+def test_stable_hash_nodes():
+    def make_paragraph(text):
+        paragraph = ParagraphNode(
+            lines=[ParagraphLineNode(content=[TextNode(text)])],
+            info=NodeInfo(context=generate_context(1, 0, 1, 10)),
+        )
+        paragraph.lines[0].parent = paragraph
+
+        return paragraph
+
+    assert stable_hash(make_paragraph("text")) == stable_hash(make_paragraph("text"))
+    assert stable_hash(make_paragraph("text")) != stable_hash(make_paragraph("other"))
+
+
+def test_stable_hash_skip_attributes():
+    node1 = TextNode("text", info=NodeInfo(context=generate_context(1, 0, 1, 4)))
+    node2 = TextNode("text", info=NodeInfo(context=generate_context(5, 0, 5, 4)))
+
+    assert stable_hash(node1) != stable_hash(node2)
+    assert stable_hash(node1, skip_attributes=("parent", "info")) == stable_hash(
+        node2, skip_attributes=("parent", "info")
+    )
@@ -0,0 +1,102 @@
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from mau import entry_points
+from mau.entry_points import (
+    discover_entry_points,
+    load_entry_point,
+    user_cache_dir,
+)
+
+DISCOVERED = {
+    "mau.visitors": [["html", "mau.visitors.html_visitor:HtmlVisitor"]],
+    "mau.templates": [],
+}
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("MAU_CACHE_DIR", str(tmp_path / "cache"))
+
+    # The discovery is also cached in memory.
+    entry_points._discovered_entry_points.cache_clear()
+    yield tmp_path / "cache"
+    entry_points._discovered_entry_points.cache_clear()
+
+
+def test_user_cache_dir(cache_dir, monkeypatch):
+    assert user_cache_dir() == cache_dir
+
+    monkeypatch.delenv("MAU_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", "/some/cache")
+
+    if sys.platform not in ("win32", "darwin"):
+        assert user_cache_dir().as_posix() == "/some/cache/mau"
+
+
+def test_discovery_is_cached_on_disk():
+    with patch.object(
+        entry_points, "_scan_entry_points", return_value=DISCOVERED
+    ) as mock_scan:
+        assert discover_entry_points("mau.visitors") == [
+            ("html", "mau.visitors.html_visitor:HtmlVisitor")
+        ]
+
+        # A new process reads the cache.
+        entry_points._discovered_entry_points.cache_clear()
+        assert discover_entry_points("mau.visitors") == [
+            ("html", "mau.visitors.html_visitor:HtmlVisitor")
+        ]
+
+    mock_scan.assert_called_once()
+
+
+def test_discovery_cache_depends_on_sys_path(tmp_path, monkeypatch):
+    site_packages = tmp_path / "site-packages"
+    site_packages.mkdir()
+    monkeypatch.setattr(sys, "path", [str(site_packages)])
+
+    with patch.object(
+        entry_points, "_scan_entry_points", return_value=DISCOVERED
+    ) as mock_scan:
+        discover_entry_points("mau.visitors")
+
+        # Installing a package adds
+        # a metadata directory.
+        (site_packages / "package-1.0.dist-info").mkdir()
+
+        entry_points._discovered_entry_points.cache_clear()
+        discover_entry_points("mau.visitors")
+
+    assert mock_scan.call_count == 2
+
+
+def test_discovery_cache_ignores_other_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "path", [""])
+
+    with patch.object(
+        entry_points, "_scan_entry_points", return_value=DISCOVERED
+    ) as mock_scan:
+        discover_entry_points("mau.visitors")
+
+        # Writing an output in the current
+        # directory doesn't invalidate the cache.
+        (tmp_path / "doc.html").write_text("<p>Text</p>")
+
+        entry_points._discovered_entry_points.cache_clear()
+        discover_entry_points("mau.visitors")
+
+    mock_scan.assert_called_once()
+
+
+def test_load_entry_point():
+    from mau.visitors.html_visitor import HtmlVisitor
+
+    assert load_entry_point("mau.visitors.html_visitor:HtmlVisitor") is HtmlVisitor
+    assert (
+        load_entry_point("mau.visitors.html_visitor:HtmlVisitor.extension [extra]")
+        == HtmlVisitor.extension
+    )
@@ -3,8 +3,32 @@ from unittest.mock import patch
 import pytest
 
 from mau import ConfigurationError, load_environment_files, load_environment_variables
+from mau.environment import files
 from mau.environment.environment import Environment
 
+TEST_CONTENT = """
+key1: value1
+key2: value2
+"""
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("MAU_CACHE_DIR", str(tmp_path / "cache"))
+
+    # Parsed files are also cached in memory.
+    files._load_data_file.cache_clear()
+    yield tmp_path / "cache"
+    files._load_data_file.cache_clear()
+
+
+@pytest.fixture
+def afile(tmp_path):
+    path = tmp_path / "afile.yaml"
+    path.write_text(TEST_CONTENT)
+
+    return path
+
 
 def test_load_environment_files_empty():
     environment = Environment()
@@ -14,9 +38,7 @@ def test_load_environment_files_empty():
     assert environment.asdict() == {}
 
 
-@patch("mau.Path.open")
-@patch("mau.yaml.safe_load")
-def test_load_environment_files(mock_safe_load, mock_path_open):
+def test_load_environment_files(afile):
     # Test that we can load a file with
     #
     # `akey=/path/to/afile.yaml`
@@ -24,17 +46,11 @@ def test_load_environment_files(mock_safe_load, mock_path_open):
     # resulting in its content being stored
     # under the namespace `mau.envfiles.akey`.
 
-    test_content = {
-        "key1": "value1",
-        "key2": "value2",
-    }
-    mock_safe_load.return_value = test_content
-
     environment = Environment()
 
     load_environment_files(
         environment,
-        ["akey=/path/to/afile.yaml"],
+        [f"akey={afile}"],
     )
 
     assert environment.asdict() == {
@@ -49,9 +65,7 @@ def test_load_environment_files(mock_safe_load, mock_path_open):
     }
 
 
-@patch("mau.Path.open")
-@patch("mau.yaml.safe_load")
-def test_load_environment_files_custom_namespace(mock_safe_load, mock_path_open):
+def test_load_environment_files_custom_namespace(afile):
     # Test that we can load a file with
     #
     # `akey=/path/to/afile.yaml`
@@ -60,17 +74,11 @@ def test_load_environment_files_custom_namespace(mock_safe_load, mock_path_open)
     # resulting in its content being stored
     # under the namespace `mau.somespace.akey`.
 
-    test_content = {
-        "key1": "value1",
-        "key2": "value2",
-    }
-    mock_safe_load.return_value = test_content
-
     environment = Environment()
 
     load_environment_files(
         environment,
-        ["akey=/path/to/afile.yaml"],
+        [f"akey={afile}"],
         "somespace",
     )
 
@@ -86,9 +94,7 @@ def test_load_environment_files_custom_namespace(mock_safe_load, mock_path_open)
     }
 
 
-@patch("mau.Path.open")
-@patch("mau.yaml.safe_load")
-def test_load_environment_files_simple_path(mock_safe_load, mock_path_open):
+def test_load_environment_files_simple_path(afile):
     # Test that we can load a file with
     #
     # `/path/to/afile.yaml`
@@ -96,17 +102,11 @@ def test_load_environment_files_simple_path(mock_safe_load, mock_path_open):
     # resulting in its content being stored
     # under the namespace `mau.envfiles.afile`.
 
-    test_content = {
-        "key1": "value1",
-        "key2": "value2",
-    }
-    mock_safe_load.return_value = test_content
-
     environment = Environment()
 
     load_environment_files(
         environment,
-        ["/path/to/afile.yaml"],
+        [str(afile)],
     )
 
     assert environment.asdict() == {
@@ -121,18 +121,126 @@ def test_load_environment_files_simple_path(mock_safe_load, mock_path_open):
     }
 
 
-@patch("mau.Path.open")
-@patch("mau.yaml.safe_load")
-def test_load_environment_failed_load(mock_safe_load, mock_path_open):
-    mock_safe_load.side_effect = ValueError
-
+def test_load_environment_failed_load(tmp_path):
+    # A file that doesn't exist is
+    # reported when it is added.
     with pytest.raises(ConfigurationError):
         load_environment_files(
             Environment(),
-            ["/path/to/afile.yaml"],
+            [str(tmp_path / "afile.yaml")],
         )
 
 
+def test_load_environment_failed_parse(tmp_path):
+    # A file that can't be parsed is reported
+    # when one of its values is needed.
+    path = tmp_path / "afile.yaml"
+    path.write_text("key: [value")
+
+    environment = Environment()
+
+    load_environment_files(environment, [str(path)])
+
+    with pytest.raises(ConfigurationError):
+        environment.get("mau.envfiles.afile.key")
+
+
+def test_load_environment_files_lazy(afile):
+    # Files are parsed the first time
+    # one of their values is needed.
+    environment = Environment()
+
+    with patch.object(
+        files, "parse_data_file", wraps=files.parse_data_file
+    ) as mock_parse:
+        load_environment_files(environment, [f"akey={afile}"])
+
+        assert environment.get("mau.parser.include_jobs") is None
+        mock_parse.assert_not_called()
+
+        assert environment["mau.envfiles.akey.key1"] == "value1"
+        assert environment.get("mau.envfiles.akey.key2") == "value2"
+
+    assert mock_parse.call_count == 1
+
+
+def test_load_environment_files_lazy_values_can_be_overridden(afile):
+    # A value set after the file has been
+    # added overrides the one in the file,
+    # as if the file had been loaded.
+    environment = Environment()
+
+    load_environment_files(environment, [f"akey={afile}"])
+    environment["mau.envfiles.akey.key1"] = "custom"
+
+    assert environment.asdict() == {
+        "mau": {
+            "envfiles": {
+                "akey": {
+                    "key1": "custom",
+                    "key2": "value2",
+                }
+            }
+        }
+    }
+
+
+def test_load_environment_files_eager(afile):
+    environment = Environment()
+
+    load_environment_files(environment, [f"akey={afile}"], lazy=False)
+
+    assert environment.pending() == {}
+    assert environment.asflatdict(load=False) == {
+        "mau.envfiles.akey.key1": "value1",
+        "mau.envfiles.akey.key2": "value2",
+    }
+
+
+def test_load_environment_files_json(tmp_path):
+    path = tmp_path / "afile.json"
+    path.write_text('{"key1": "value1", "key2": [1, 2]}')
+
+    environment = Environment()
+
+    with patch("yaml.load") as mock_yaml_load:
+        load_environment_files(environment, [str(path)])
+
+        assert environment.asdict() == {
+            "mau": {"envfiles": {"afile": {"key1": "value1", "key2": [1, 2]}}}
+        }
+
+    mock_yaml_load.assert_not_called()
+
+
+def test_load_environment_files_are_cached_on_disk(afile):
+    with patch.object(
+        files, "parse_data_file", wraps=files.parse_data_file
+    ) as mock_parse:
+        for _ in range(2):
+            # A new process would start
+            # with an empty memory cache.
+            files._load_data_file.cache_clear()
+
+            environment = Environment()
+            load_environment_files(environment, [f"akey={afile}"])
+
+            assert environment.get("mau.envfiles.akey.key1") == "value1"
+
+        assert mock_parse.call_count == 1
+
+        # A change of the file
+        # invalidates the cache.
+        afile.write_text("key1: changed\n")
+        files._load_data_file.cache_clear()
+
+        environment = Environment()
+        load_environment_files(environment, [f"akey={afile}"])
+
+        assert environment.get("mau.envfiles.akey.key1") == "changed"
+        assert mock_parse.call_count == 2
+
+
 def test_load_environment_variables_empty():
     environment = Environment()
 
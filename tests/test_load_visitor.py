@@ -0,0 +1,24 @@
+import subprocess
+import sys
+
+from mau import load_visitor
+from mau.visitors.html_visitor import HtmlVisitor
+
+
+def test_load_visitor():
+    assert load_visitor("core:HtmlVisitor") is HtmlVisitor
+
+
+def test_import_mau_does_not_import_visitors():
+    # Visitors and their dependencies are
+    # imported only when they are used.
+    code = (
+        "import sys, mau; "
+        "print(sorted(m for m in ('jinja2', 'yaml', 'rich') if m in sys.modules))"
+    )
+
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+
+    assert output.strip() == "[]"
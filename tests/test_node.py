@@ -1,6 +1,13 @@
-from mau.nodes.node import Node, NodeInfo
+import pickle
+from textwrap import dedent
+
+from mau.lexers.document_lexer import DocumentLexer
+from mau.nodes.node import Node, NodeInfo, child_values
 from mau.nodes.node_arguments import NodeArguments
-from mau.test_helpers import generate_context
+from mau.parsers.document_parser import DocumentParser
+from mau.test_helpers import generate_context, parser_runner_factory
+
+runner = parser_runner_factory(DocumentLexer, DocumentParser)
 
 
 def test_info():
@@ -45,3 +52,38 @@ def test_node_set_parent():
     node.set_parent(parent)
 
     assert node.parent is parent
+
+
+def test_child_values():
+    child = Node()
+    label = Node()
+    node = Node(parent=Node())
+    node.content = [child, "text"]
+    node.labels = {"title": [label]}
+    node.child = child
+
+    assert list(child_values(node)) == [[child, "text"], [label], child]
+
+
+def test_parsed_document_is_picklable():
+    source = """
+    = Header
+
+    Some text with a footnote[footnote](note).
+
+    [footnote=note]
+    ----
+    The footnote.
+    ----
+
+    ::toc:
+    """
+
+    parser = runner(dedent(source))
+    document = parser.output.document
+
+    unpickled = pickle.loads(pickle.dumps(document))
+
+    assert len(unpickled.content) == len(document.content)
+    assert all(child.parent is unpickled for child in unpickled.content)
+    assert unpickled.content[0].type == document.content[0].type
@@ -0,0 +1,310 @@
+import os
+
+from mau import ConfigurationError
+from mau.environment.environment import Environment
+from mau.test_helpers import NullMessageHandler
+from mau.visitors.html_visitor import HtmlVisitor
+from mau.watch import FileWatcher, WatchBuilder
+
+
+def write(path, text):
+    # Write the file and make sure that its
+    # modification time changes, as the
+    # resolution of the clock might be low.
+    stamp = path.stat().st_mtime_ns if path.exists() else 0
+
+    path.write_text(text)
+
+    if path.stat().st_mtime_ns <= stamp:
+        os.utime(path, ns=(stamp + 1_000_000, stamp + 1_000_000))
+
+
+def create_builder(tmp_path, environment_factory=None, configuration_files=()):
+    write(tmp_path / "included.mau", "Included text\n")
+    write(tmp_path / "doc0.mau", f"Document 0\n\n<< mau:{tmp_path}/included.mau\n")
+    write(tmp_path / "doc1.mau", "Document 1\n")
+
+    jobs = [
+        ((tmp_path / f"doc{i}.mau").as_posix(), (tmp_path / f"doc{i}.html").as_posix())
+        for i in range(2)
+    ]
+
+    return WatchBuilder(
+        HtmlVisitor,
+        NullMessageHandler(),
+        environment_factory or Environment,
+        jobs,
+        configuration_files,
+    )
+
+
+def test_file_watcher(tmp_path):
+    path = tmp_path / "afile.txt"
+    write(path, "text")
+
+    watcher = FileWatcher()
+    watcher.watch([path.as_posix()])
+
+    assert watcher.changes() == set()
+
+    write(path, "other text")
+
+    assert watcher.changes() == {path.as_posix()}
+    assert watcher.changes() == set()
+
+
+def test_file_watcher_missing_files(tmp_path):
+    path = tmp_path / "afile.txt"
+
+    watcher = FileWatcher()
+    watcher.watch([path.as_posix()])
+
+    write(path, "text")
+
+    assert watcher.changes() == {path.as_posix()}
+
+
+def test_file_watcher_directories(tmp_path):
+    (tmp_path / "templates").mkdir()
+
+    watcher = FileWatcher()
+    watcher.watch([], [(tmp_path / "templates").as_posix()])
+
+    write(tmp_path / "templates" / "text.j2", "text")
+
+    assert (tmp_path / "templates" / "text.j2").as_posix() in watcher.changes()
+
+
+def test_file_watcher_keeps_changes_made_before_watch(tmp_path):
+    # A change that happens while the outputs
+    # are built is seen by the next check.
+    path = tmp_path / "afile.txt"
+    write(path, "text")
+
+    watcher = FileWatcher()
+    watcher.watch([path.as_posix()])
+
+    write(path, "other text")
+    watcher.watch([path.as_posix()])
+
+    assert watcher.changes() == {path.as_posix()}
+
+
+def test_build(tmp_path):
+    builder = create_builder(tmp_path)
+
+    results = builder.build()
+
+    assert [result.success for result in results] == [True, True]
+    assert "Included text" in (tmp_path / "doc0.html").read_text()
+    assert "Document 1" in (tmp_path / "doc1.html").read_text()
+
+    assert builder.targets[0].dependencies == {
+        (tmp_path / "doc0.mau").as_posix(),
+        (tmp_path / "included.mau").as_posix(),
+    }
+    assert builder.targets[1].dependencies == {(tmp_path / "doc1.mau").as_posix()}
+
+
+def test_poll_rebuilds_affected_files(tmp_path):
+    builder = create_builder(tmp_path)
+    builder.build()
+
+    assert builder.poll() == []
+
+    write(tmp_path / "included.mau", "Changed text\n")
+
+    results = builder.poll()
+
+    assert [result.source_filename for result in results] == [
+        (tmp_path / "doc0.mau").as_posix()
+    ]
+    assert "Changed text" in (tmp_path / "doc0.html").read_text()
+
+
+def test_poll_keeps_unchanged_included_files(tmp_path):
+    builder = create_builder(tmp_path)
+    builder.build()
+
+    memo = dict(builder.include_memo)
+    assert len(memo) == 1
+
+    write(tmp_path / "doc0.mau", f"Changed\n\n<< mau:{tmp_path}/included.mau\n")
+    builder.poll()
+
+    assert builder.include_memo == memo
+    assert "Changed" in (tmp_path / "doc0.html").read_text()
+
+
+def test_unchanged_outputs_are_not_written(tmp_path):
+    builder = create_builder(tmp_path)
+    builder.build()
+
+    output = tmp_path / "doc1.html"
+    os.utime(output, ns=(0, 0))
+
+    # The source changes, but the output doesn't.
+    write(tmp_path / "doc1.mau", "Document 1\n\n")
+    results = builder.poll()
+
+    assert [result.success for result in results] == [True]
+    assert output.stat().st_mtime_ns == 0
+
+
+def test_configuration_change_rebuilds_everything(tmp_path):
+    config = tmp_path / "config.yaml"
+    write(config, "")
+
+    environments = []
+
+    def environment_factory():
+        environments.append(Environment())
+        return environments[-1]
+
+    builder = create_builder(tmp_path, environment_factory, [config.as_posix()])
+    builder.build()
+
+    write(config, "key: value\n")
+
+    assert len(builder.poll()) == 2
+    assert len(environments) == 2
+    assert builder.environment is environments[1]
+
+
+def test_templates_change_rebuilds_everything(tmp_path):
+    templates = tmp_path / "templates"
+    templates.mkdir()
+
+    def environment_factory():
+        return Environment.from_dict(
+            {"mau.visitor.templates.paths": [templates.as_posix()]}
+        )
+
+    builder = create_builder(tmp_path, environment_factory)
+    builder.build()
+
+    write(templates / "text.j2", "##{{ value }}##")
+
+    assert len(builder.poll()) == 2
+    assert "##Document 1##" in (tmp_path / "doc1.html").read_text()
+
+
+def test_template_errors_do_not_stop_watching(tmp_path):
+    templates = tmp_path / "templates"
+    templates.mkdir()
+
+    def environment_factory():
+        return Environment.from_dict(
+            {"mau.visitor.templates.paths": [templates.as_posix()]}
+        )
+
+    builder = create_builder(tmp_path, environment_factory)
+    builder.build()
+
+    write(templates / "text.j2", "##{{ value }##")
+
+    results = builder.poll()
+
+    assert [result.success for result in results] == [False, False]
+    assert results[0].error.startswith("TemplateSyntaxError: unexpected '}'")
+    assert all(target.dirty for target in builder.targets)
+
+    write(templates / "text.j2", "##{{ value }}##")
+
+    results = builder.poll()
+
+    assert [result.success for result in results] == [True, True]
+    assert "##Document 1##" in (tmp_path / "doc1.html").read_text()
+    assert not any(target.dirty for target in builder.targets)
+
+
+def test_dirty_targets_are_built_at_every_change(tmp_path):
+    builder = create_builder(tmp_path)
+    write(tmp_path / "doc1.mau", "{undefined}\n")
+    builder.build()
+
+    assert builder.targets[1].dirty
+
+    write(tmp_path / "included.mau", "Changed text\n")
+
+    results = builder.poll()
+
+    assert [result.source_filename for result in results] == [
+        (tmp_path / "doc0.mau").as_posix(),
+        (tmp_path / "doc1.mau").as_posix(),
+    ]
+
+
+def test_undecodable_source(tmp_path):
+    builder = create_builder(tmp_path)
+    (tmp_path / "doc1.mau").write_bytes(b"Caf\xe9\n")
+
+    results = builder.build()
+
+    assert results[1].error.startswith("Cannot decode file")
+
+    write(tmp_path / "doc1.mau", "Document 1\n")
+
+    assert [result.success for result in builder.poll()] == [True]
+
+
+def test_configuration_errors_do_not_stop_watching(tmp_path):
+    config = tmp_path / "config.yaml"
+    write(config, "")
+
+    def environment_factory():
+        if config.read_text() == "broken":
+            raise ConfigurationError("Error processing config.yaml")
+
+        return Environment()
+
+    builder = create_builder(tmp_path, environment_factory, [config.as_posix()])
+    builder.build()
+    environment = builder.environment
+
+    write(config, "broken")
+
+    assert builder.poll() == []
+    assert builder.environment is environment
+
+    write(config, "key: value\n")
+
+    assert len(builder.poll()) == 2
+    assert builder.environment is not environment
+
+
+def test_missing_source(tmp_path):
+    builder = create_builder(tmp_path)
+    (tmp_path / "doc1.mau").unlink()
+
+    results = builder.build()
+
+    assert not results[1].success
+
+    write(tmp_path / "doc1.mau", "Document 1\n")
+
+    results = builder.poll()
+
+    assert [result.success for result in results] == [True]
+
+
+def test_poll_rebuilds_nested_includes(tmp_path):
+    builder = create_builder(tmp_path)
+
+    write(tmp_path / "nested.mau", "Nested text\n")
+    write(tmp_path / "included.mau", f"<< mau:{tmp_path}/nested.mau\n")
+    builder.build()
+
+    assert "Nested text" in (tmp_path / "doc0.html").read_text()
+    assert (tmp_path / "nested.mau").as_posix() in builder.targets[0].dependencies
+
+    write(tmp_path / "nested.mau", "Changed nested text\n")
+    results = builder.poll()
+
+    assert [result.source_filename for result in results] == [
+        (tmp_path / "doc0.mau").as_posix()
+    ]
+    assert "Changed nested text" in (tmp_path / "doc0.html").read_text()
+
+    # The entries of the changed files are removed.
+    assert all(entry.is_current() for entry in builder.include_memo.values())
@@ -16,23 +16,45 @@ from mau.visitors.base_visitor import (
 
 
 def test_visitor_node_accept():
-    node = Mock()
-    node.accept.return_value = {
-        "_type": "test",
-        "_context": generate_context(1, 2, 3, 4).asdict(),
-        "unnamed_args": ["arg1"],
-        "named_args": {"key1": "value1"},
-        "subtype": "subtype1",
-        "tags": ["tag1"],
-        "internal_tags": ["tag2"],
-        "parent": {},
-    }
+    node = ATestNode("somevalue")
 
     bv = BaseVisitor(NullMessageHandler(), Environment())
-    result = bv.visit(node, key1="value1")
+    result = node.accept(bv)
+
+    assert result == bv.visit(node)
+
+
+def test_visitor_dispatch_table():
+    class Visitor(BaseVisitor):
+        def _visit_some_type(self, node: Node, **kwargs):
+            return {"data": "some-type", "internal_tags": []}
+
+    node = Node()
+    node.type = "some-type"
+
+    visitor = Visitor(NullMessageHandler(), Environment())
+
+    assert visitor.visit(node, key1="value1") == {
+        "data": "some-type",
+        "internal_tags": [],
+    }
+    assert Visitor._dispatch_table["some-type"] is Visitor._visit_some_type
+    assert "some-type" not in BaseVisitor._dispatch_table
+
+
+def test_visitor_dispatch_table_default():
+    class Visitor(BaseVisitor):
+        pass
+
+    with patch.object(Visitor, "_visit_default") as mock_visit_default:
+        mock_visit_default.return_value = {"internal_tags": []}
+
+        node = Node()
+        visitor = Visitor(NullMessageHandler(), Environment())
+        visitor.visit(node, key1="value1")
 
-    node.accept.assert_called_with(bv, key1="value1")
-    assert result == node.accept.return_value
+    mock_visit_default.assert_called_with(visitor, node, key1="value1")
+    assert Visitor._dispatch_table == {"none": mock_visit_default}
 
 
 def test_visitor_no_node():
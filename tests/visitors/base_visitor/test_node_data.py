@@ -0,0 +1,144 @@
+import pickle
+from unittest.mock import Mock
+
+from mau.environment.environment import Environment
+from mau.nodes.inline import TextNode
+from mau.nodes.node import Node, NodeInfo
+from mau.nodes.paragraph import ParagraphLineNode
+from mau.test_helpers import NullMessageHandler, generate_context
+from mau.visitors.base_visitor import BaseVisitor, NodeData, materialize
+
+
+def test_node_data_plain_values():
+    data = NodeData({"key1": "value1"})
+
+    assert data["key1"] == "value1"
+    assert "key1" in data
+    assert len(data) == 1
+    assert list(data) == ["key1"]
+    assert data == {"key1": "value1"}
+
+
+def test_node_data_lazy_values_are_computed_once():
+    factory = Mock(return_value="value2")
+
+    data = NodeData({"key1": "value1"}, {"key2": factory})
+
+    assert "key2" in data
+    assert len(data) == 2
+    factory.assert_not_called()
+
+    assert data["key2"] == "value2"
+    assert data["key2"] == "value2"
+    factory.assert_called_once_with(data)
+
+
+def test_node_data_set_lazy():
+    data = NodeData({"key1": "value1"})
+
+    data.set_lazy("key1", lambda d: "value2")
+
+    assert data["key1"] == "value2"
+
+
+def test_node_data_set_overrides_lazy_value():
+    factory = Mock(return_value="value2")
+    data = NodeData(lazy_values={"key1": factory})
+
+    data["key1"] = "value1"
+
+    assert data["key1"] == "value1"
+    factory.assert_not_called()
+
+
+def test_node_data_update_overrides_lazy_value():
+    factory = Mock(return_value="value2")
+    data = NodeData(lazy_values={"key1": factory})
+
+    data.update({"key1": "value1"}, key2="value3")
+
+    assert data == {"key1": "value1", "key2": "value3"}
+    factory.assert_not_called()
+
+
+def test_node_data_delete():
+    data = NodeData({"key1": "value1"}, {"key2": lambda d: "value2"})
+
+    del data["key1"]
+    del data["key2"]
+
+    assert len(data) == 0
+
+
+def test_materialize():
+    data = NodeData(
+        {"key1": [NodeData(lazy_values={"key2": lambda d: "value2"})]},
+        {"key3": lambda d: {"key4": NodeData({"key5": "value5"})}},
+    )
+
+    result = materialize(data)
+
+    assert result == {
+        "key1": [{"key2": "value2"}],
+        "key3": {"key4": {"key5": "value5"}},
+    }
+    assert type(result) is dict
+    assert type(result["key1"][0]) is dict
+    assert type(result["key3"]["key4"]) is dict
+
+
+def test_visit_does_not_compute_lazy_values():
+    parent = Node()
+    node = TextNode("Some text", parent=parent)
+    node.info = Mock()
+
+    bv = BaseVisitor(NullMessageHandler(), Environment())
+    result = bv.visit(node)
+
+    assert isinstance(result, NodeData)
+    assert result["value"] == "Some text"
+    node.info.context.asdict.assert_not_called()
+
+
+def test_visit_computes_lazy_values_on_access():
+    parent = Node(info=NodeInfo(context=generate_context(1, 0, 1, 10)))
+    node = ParagraphLineNode(
+        content=[TextNode("Some text")],
+        parent=parent,
+        info=NodeInfo(context=generate_context(1, 2, 3, 4)),
+    )
+
+    bv = BaseVisitor(NullMessageHandler(), Environment())
+    result = bv.visit(node)
+
+    assert result["_context"] == generate_context(1, 2, 3, 4).asdict()
+    assert result["parent"]["_context"] == generate_context(1, 0, 1, 10).asdict()
+    assert result["content"][0]["value"] == "Some text"
+    assert result["labels"] == {}
+
+
+def test_node_data_asdict_and_repr():
+    data = NodeData({"key1": "value1"}, {"key2": lambda d: "value2"})
+
+    assert data.asdict() == {"key1": "value1", "key2": "value2"}
+    assert repr(data) == "{'key1': 'value1', 'key2': 'value2'}"
+
+
+def test_node_data_copy():
+    data = NodeData({"key1": "value1"}, {"key2": lambda d: "value2"})
+
+    data_copy = data.copy()
+    data_copy["key3"] = "value3"
+
+    assert data_copy["key2"] == "value2"
+    assert "key3" not in data
+    assert dict(data) == {"key1": "value1", "key2": "value2"}
+
+
+def test_node_data_pickle():
+    data = NodeData({"key1": "value1"}, {"key2": lambda d: "value2"}, visitor=object())
+
+    unpickled = pickle.loads(pickle.dumps(data))
+
+    assert dict(unpickled) == {"key1": "value1"}
+    assert unpickled.visitor is None
@@ -0,0 +1,324 @@
+from mau.environment.environment import Environment
+from mau.lexers.document_lexer import DocumentLexer
+from mau.nodes.document import DocumentNode
+from mau.nodes.header import HeaderNode
+from mau.nodes.inline import StyleNode, TextNode, VerbatimNode
+from mau.nodes.macro import MacroLinkNode
+from mau.nodes.paragraph import ParagraphLineNode, ParagraphNode
+from mau.nodes.raw import RawContent, RawLineNode, RawNode
+from mau.nodes.source import SourceNode
+from mau.parsers.document_parser import DocumentParser
+from mau.parsers.document_processors.block_engines.source import scan_source
+from mau.test_helpers import NullMessageHandler, dedent, parser_runner_factory
+from mau.text_buffer import Context
+from mau.visitors.html_visitor import HtmlVisitor, html_attributes
+
+runner = parser_runner_factory(DocumentLexer, DocumentParser)
+
+
+def make_visitor(templates=None):
+    environment = Environment()
+
+    if templates:
+        environment.dupdate(templates, "mau.visitor.templates.custom")
+
+    return HtmlVisitor(NullMessageHandler(), environment)
+
+
+def make_document():
+    return DocumentNode(
+        content=[
+            ParagraphNode(
+                lines=[ParagraphLineNode(content=[TextNode(f"Paragraph {i}")])]
+            )
+            for i in range(3)
+        ]
+    )
+
+
+def render(source):
+    parser = runner(dedent(source))
+
+    return make_visitor().visit(parser.output.document)
+
+
+def test_html_attributes():
+    assert html_attributes(id="x", class_=["a", "b"]) == ' id="x" class="a b"'
+
+
+def test_html_attributes_skip_empty_values():
+    assert html_attributes(id=None, class_=[], href="") == ""
+
+
+def test_html_attributes_are_escaped():
+    assert html_attributes(href='a"b') == ' href="a&quot;b"'
+
+
+def test_text_is_escaped():
+    visitor = make_visitor()
+
+    assert visitor.visit(TextNode("a < b & c")) == "a &lt; b &amp; c"
+
+
+def test_verbatim():
+    visitor = make_visitor()
+
+    assert visitor.visit(VerbatimNode("<x>")) == "<code>&lt;x&gt;</code>"
+
+
+def test_style():
+    visitor = make_visitor()
+
+    node = StyleNode("star", content=[TextNode("bold")])
+
+    assert visitor.visit(node) == "<strong>bold</strong>"
+
+
+def test_link():
+    visitor = make_visitor()
+
+    node = MacroLinkNode("https://example.com", content=[TextNode("here")])
+
+    assert visitor.visit(node) == '<a href="https://example.com">here</a>'
+
+
+def test_link_without_text():
+    visitor = make_visitor()
+
+    node = MacroLinkNode("https://example.com")
+
+    assert visitor.visit(node) == (
+        '<a href="https://example.com">https://example.com</a>'
+    )
+
+
+def test_header_level_is_capped():
+    visitor = make_visitor()
+
+    node = HeaderNode(8, internal_id="some-id", content=[TextNode("Title")])
+
+    assert visitor.visit(node) == '<h6 id="some-id">Title</h6>'
+
+
+def test_document():
+    visitor = make_visitor()
+
+    assert visitor.process(make_document()) == (
+        "<p>Paragraph 0</p>\n<p>Paragraph 1</p>\n<p>Paragraph 2</p>"
+    )
+
+
+def test_user_templates_take_precedence():
+    visitor = make_visitor({"paragraph.j2": "<div>{{ lines }}</div>"})
+
+    assert visitor.process(make_document()) == (
+        "<div>Paragraph 0</div>\n<div>Paragraph 1</div>\n<div>Paragraph 2</div>"
+    )
+
+
+def test_subclasses_can_override_methods():
+    class CustomHtmlVisitor(HtmlVisitor):
+        def _html_paragraph(self, node, data):
+            return f"<section>{data['lines']}</section>"
+
+    visitor = CustomHtmlVisitor(NullMessageHandler(), Environment())
+
+    assert visitor.process(make_document()) == (
+        "<section>Paragraph 0</section>\n"
+        "<section>Paragraph 1</section>\n"
+        "<section>Paragraph 2</section>"
+    )
+
+    # The parent class is not affected.
+    assert "<p>" in make_visitor().process(make_document())
+
+
+def test_stream():
+    visitor = make_visitor()
+
+    assert "".join(visitor.process_iter(make_document())) == (
+        "<p>Paragraph 0</p>\n<p>Paragraph 1</p>\n<p>Paragraph 2</p>"
+    )
+
+
+def test_raw_content_is_output_as_is():
+    visitor = make_visitor()
+
+    node = RawNode(raw_content=RawContent("<b>\n</b>"))
+
+    assert visitor.visit(node) == make_visitor().visit(
+        RawNode(content=[RawLineNode("<b>"), RawLineNode("</b>")])
+    )
+    assert node.has_line_nodes is False
+
+
+def test_source_lines_are_rendered_without_line_nodes():
+    def make_node():
+        return SourceNode(
+            "python",
+            source_content=scan_source(
+                "a < b\nimport os:mark:\nx = 1:@:", Context.empty(), ":", "@", "hl", {}
+            ),
+        )
+
+    node = make_node()
+    rendered = make_visitor().visit(node)
+    assert node.has_line_nodes is False
+
+    materialized = make_node()
+    assert len(materialized.content) == 3
+    assert make_visitor().visit(materialized) == rendered
+    assert '<span class="hl-hl">x = 1</span>' in rendered
+
+
+def test_source_markers_are_rendered():
+    def make_node():
+        return SourceNode(
+            "python",
+            source_content=scan_source(
+                "import os:<1>:\nx = 1:@:\ny = 2:2:",
+                Context.empty(),
+                ":",
+                "@",
+                "hl",
+                {},
+            ),
+        )
+
+    rendered = make_visitor().visit(make_node())
+
+    materialized = make_node()
+    assert len(materialized.content) == 3
+    assert make_visitor().visit(materialized) == rendered
+
+    assert 'import os <span class="callout">&lt;1&gt;</span>' in rendered
+    assert '<span class="hl-hl">x = 1</span>\n' in rendered
+    assert 'y = 2 <span class="callout">2</span>' in rendered
+
+
+def test_block():
+    source = """
+    [*warning, classes="a,b"]
+    . A title
+    ----
+    Some text
+    ----
+    """
+
+    assert render(source) == (
+        '<div class="block a b warning">'
+        '<div class="title">A title</div>'
+        '<div class="content"><p>Some text</p></div>'
+        "</div>"
+    )
+
+
+def test_list():
+    source = """
+    * Item 1
+    * Item 2
+    """
+
+    assert render(source) == "<ul><li>Item 1</li><li>Item 2</li></ul>"
+
+
+def test_ordered_list():
+    source = """
+    # Item 1
+    # Item 2
+    """
+
+    assert render(source) == "<ol><li>Item 1</li><li>Item 2</li></ol>"
+
+
+def test_ordered_list_start():
+    source = """
+    [start=3]
+    # Item 3
+    # Item 4
+    """
+
+    assert render(source) == '<ol start="3"><li>Item 3</li><li>Item 4</li></ol>'
+
+
+def test_toc():
+    source = """
+    = Header 1
+    == Header 1.1
+    = Header 2
+
+    << toc
+    """
+
+    assert render(source).splitlines()[-1] == (
+        '<div class="toc"><ul>'
+        '<li><a href="#header-1-1aa5">Header 1</a>'
+        '<ul><li><a href="#header-1.1-3cc7">Header 1.1</a></li></ul></li>'
+        '<li><a href="#header-2-3780">Header 2</a></li>'
+        "</ul></div>"
+    )
+
+
+def test_footnotes():
+    source = """
+    Some text[footnote](note).
+
+    [footnote=note]
+    ----
+    The note.
+    ----
+
+    << footnotes
+    """
+
+    assert render(source).splitlines() == [
+        '<p>Some text<sup>[<a id="ref-note" href="#note">1</a>]</sup>.</p>',
+        (
+            '<div class="footnotes">'
+            '<div id="note"><a href="#ref-note">1</a> <p>The note.</p></div>'
+            "</div>"
+        ),
+    ]
+
+
+def test_blockgroup():
+    source = """
+    [group=mygroup, position=left]
+    ----
+    Left
+    ----
+
+    [group=mygroup, position=right]
+    ----
+    Right
+    ----
+
+    << blockgroup:mygroup
+    """
+
+    assert render(source) == (
+        '<div class="blockgroup">'
+        '<div class="block"><div class="content"><p>Left</p></div></div>'
+        '<div class="block"><div class="content"><p>Right</p></div></div>'
+        "</div>"
+    )
+
+
+def test_include_image():
+    source = """
+    . A caption
+    << image:/images/a.png, "An <image>", "wide,big"
+    """
+
+    assert render(source) == (
+        '<figure class="wide big">'
+        '<img src="/images/a.png" alt="An &lt;image&gt;" />'
+        "<figcaption>A caption</figcaption>"
+        "</figure>"
+    )
+
+
+def test_include_image_without_arguments():
+    assert render("<< image:/images/a.png") == (
+        '<figure><img src="/images/a.png" /></figure>'
+    )
@@ -1,7 +1,11 @@
+from unittest.mock import patch
+
 import pytest
 
 from mau.environment.environment import Environment
 from mau.message import MauException, MauMessageType
+from mau.nodes.inline import TextNode
+from mau.nodes.node_arguments import NodeArguments
 from mau.test_helpers import ATestNode, NullMessageHandler
 from mau.visitors.jinja_visitor import JinjaVisitor
 
@@ -24,3 +28,125 @@ def test_no_node():
     result = visitor.visit(None)
 
     assert result == ""
+
+
+def test_template_resolution_is_cached():
+    templates = {
+        "text.j2": "{{ value }}",
+        "text.tg_tag1.j2": "##{{ value }}##",
+    }
+
+    environment = Environment()
+    environment.dupdate(templates, "mau.visitor.templates.custom")
+    visitor = JinjaVisitor(NullMessageHandler(), environment)
+
+    node1 = TextNode("Some text.", arguments=NodeArguments(tags=["tag1"]))
+    node2 = TextNode("Other text.", arguments=NodeArguments(tags=["tag1"]))
+    node3 = TextNode("More text.")
+
+    assert visitor.visit(node1) == "##Some text.##"
+    assert visitor.visit(node2) == "##Other text.##"
+    assert visitor.visit(node3) == "More text."
+
+    # Nodes with the same signature share the cache entry.
+    cache = visitor.templates_cache
+    assert cache[(("text", None, ("tag1",), None), ())] == visitor.templates["text"][0]
+    assert cache[(("text", None, (), None), ())] == visitor.templates["text"][1]
+
+
+def test_template_resolution_cache_hit_skips_matching():
+    templates = {
+        "text.j2": "{{ value }}",
+    }
+
+    environment = Environment()
+    environment.dupdate(templates, "mau.visitor.templates.custom")
+    visitor = JinjaVisitor(NullMessageHandler(), environment)
+
+    visitor.visit(TextNode("Some text."))
+
+    with patch.object(visitor, "_resolve_template") as mock_resolve:
+        result = visitor.visit(TextNode("Other text."))
+
+    mock_resolve.assert_not_called()
+    assert result == "Other text."
+
+
+def test_render_does_not_compute_unused_values():
+    templates = {
+        "text.j2": "{{ value }}",
+    }
+
+    environment = Environment()
+    environment.dupdate(templates, "mau.visitor.templates.custom")
+    visitor = JinjaVisitor(NullMessageHandler(), environment)
+
+    node = TextNode("Some text")
+
+    with (
+        patch.object(visitor, "_get_node_data", wraps=visitor._get_node_data) as m,
+        patch.object(Environment, "asdict") as mock_asdict,
+    ):
+        result = visitor.visit(node)
+
+    # The parent data was not requested.
+    m.assert_called_once_with(node)
+    mock_asdict.assert_not_called()
+    assert result == "Some text"
+
+
+def test_render_computes_used_values():
+    templates = {
+        "text.j2": "{{ value }}-{{ parent._type }}-{{ config.mau.key }}",
+    }
+
+    environment = Environment.from_dict({"key": "value"}, "mau")
+    environment.dupdate(templates, "mau.visitor.templates.custom")
+    visitor = JinjaVisitor(NullMessageHandler(), environment)
+
+    node = TextNode("Some text", parent=ATestNode("Parent"))
+
+    assert visitor.visit(node) == "Some text-test-value"
+
+
+def test_template_resolution_with_prefixes():
+    templates = {
+        "text.j2": "{{ value }}",
+        "text.pf_prefix1.j2": "1{{ value }}1",
+        "text.pf_prefix2.j2": "2{{ value }}2",
+    }
+
+    environment = Environment()
+    environment.dupdate(templates, "mau.visitor.templates.custom")
+    environment["mau.visitor.templates.prefixes"] = ["prefix2", "prefix1"]
+    visitor = JinjaVisitor(NullMessageHandler(), environment)
+
+    assert visitor.visit(TextNode("Some text")) == "2Some text2"
+
+
+def test_render_error_in_template():
+    templates = {
+        "text.j2": "{{ value }}{{ 1 / 0 }}",
+    }
+
+    environment = Environment()
+    environment.dupdate(templates, "mau.visitor.templates.custom")
+    visitor = JinjaVisitor(NullMessageHandler(), environment)
+
+    with pytest.raises(ZeroDivisionError):
+        visitor.visit(TextNode("Some text"))
+
+
+def test_render_undefined_value():
+    templates = {
+        "text.j2": "{{ value }}{{ notavalue.attribute }}",
+    }
+
+    environment = Environment()
+    environment.dupdate(templates, "mau.visitor.templates.custom")
+    visitor = JinjaVisitor(NullMessageHandler(), environment)
+
+    with pytest.raises(MauException) as exc:
+        visitor.visit(TextNode("Some text"))
+
+    assert exc.value.message.text.startswith("Error rendering node with template")
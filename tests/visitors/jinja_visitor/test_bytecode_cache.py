@@ -0,0 +1,87 @@
+from unittest.mock import patch
+
+import jinja2
+
+from mau.environment.environment import Environment
+from mau.nodes.inline import TextNode
+from mau.test_helpers import NullMessageHandler
+from mau.visitors.jinja_visitor import (
+    JinjaVisitor,
+    TemplatesBytecodeCache,
+    clear_templates_registry,
+)
+
+
+def _environment(cache_dir=None):
+    templates = {
+        "text.j2": "{{ value }}",
+        "text.tg_tag1.j2": "##{{ value }}##",
+    }
+
+    environment = Environment()
+    environment.dupdate(templates, "mau.visitor.templates.custom")
+
+    if cache_dir:
+        environment["mau.visitor.templates.cache_dir"] = str(cache_dir)
+
+    return environment
+
+
+def test_no_bytecode_cache_by_default():
+    visitor = JinjaVisitor(NullMessageHandler(), _environment())
+
+    assert visitor._dict_env.bytecode_cache is None
+
+
+def test_bytecode_cache_configured(tmp_path):
+    cache_dir = tmp_path / "cache"
+
+    visitor = JinjaVisitor(NullMessageHandler(), _environment(cache_dir))
+
+    assert isinstance(visitor._dict_env.bytecode_cache, TemplatesBytecodeCache)
+    assert cache_dir.is_dir()
+
+
+def test_compile_templates_fills_the_cache(tmp_path):
+    visitor = JinjaVisitor(NullMessageHandler(), _environment(tmp_path))
+
+    assert visitor.compile_templates() == 2
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_bytecode_cache_skips_compilation(tmp_path):
+    visitor = JinjaVisitor(NullMessageHandler(), _environment(tmp_path))
+    visitor.compile_templates()
+
+    # Make sure the new visitor doesn't
+    # reuse the previous Jinja environment.
+    clear_templates_registry()
+
+    visitor = JinjaVisitor(NullMessageHandler(), _environment(tmp_path))
+
+    with patch.object(jinja2.Environment, "compile") as mock_compile:
+        result = visitor.visit(TextNode("Some text"))
+
+    mock_compile.assert_not_called()
+    assert result == "Some text"
+
+
+def test_bytecode_cache_key_depends_on_content(tmp_path):
+    cache = TemplatesBytecodeCache(str(tmp_path))
+    env = jinja2.Environment()
+
+    bucket1 = cache.get_bucket(env, "text", None, "{{ value }}")
+    bucket2 = cache.get_bucket(env, "text", None, "{{ value }}!")
+
+    assert bucket1.key != bucket2.key
+
+
+def test_bytecode_cache_key_depends_on_options(tmp_path):
+    cache1 = TemplatesBytecodeCache(str(tmp_path), options_key="a")
+    cache2 = TemplatesBytecodeCache(str(tmp_path), options_key="b")
+    env = jinja2.Environment()
+
+    bucket1 = cache1.get_bucket(env, "text", None, "{{ value }}")
+    bucket2 = cache2.get_bucket(env, "text", None, "{{ value }}")
+
+    assert bucket1.key != bucket2.key
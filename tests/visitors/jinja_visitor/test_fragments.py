@@ -0,0 +1,106 @@
+from mau.environment.environment import Environment
+from mau.nodes.document import DocumentNode
+from mau.nodes.inline import TextNode
+from mau.nodes.paragraph import ParagraphLineNode, ParagraphNode
+from mau.test_helpers import NullMessageHandler
+from mau.visitors.jinja_visitor import (
+    FRAGMENT_MARKER_END,
+    FRAGMENT_MARKER_START,
+    JinjaVisitor,
+    expand_fragments,
+)
+
+TEMPLATES = {
+    "text.j2": "{{ value }}",
+    "paragraph-line.j2": "{{ content }}",
+    "paragraph.j2": "<p>{{ lines }}</p>",
+    "document.j2": "<body>{{ content }}</body>",
+}
+
+
+def marker(index):
+    return f"{FRAGMENT_MARKER_START}{index}{FRAGMENT_MARKER_END}"
+
+
+def make_document():
+    return DocumentNode(
+        content=[
+            ParagraphNode(
+                lines=[
+                    ParagraphLineNode(content=[TextNode(f"Line {i}.{j}")])
+                    for j in range(3)
+                ]
+            )
+            for i in range(5)
+        ]
+    )
+
+
+def make_visitor(**config):
+    environment = Environment()
+    environment.dupdate(TEMPLATES, "mau.visitor.templates.custom")
+    for key, value in config.items():
+        environment[key] = value
+
+    return JinjaVisitor(NullMessageHandler(), environment)
+
+
+def test_expand_fragments():
+    fragments = [
+        "fragment0",
+        f"fragment1({marker(0)})",
+        f"fragment2({marker(1)},{marker(0)})",
+    ]
+
+    pieces = expand_fragments(f"start {marker(2)} end", fragments)
+
+    assert "".join(pieces) == ("start fragment2(fragment1(fragment0),fragment0) end")
+
+
+def test_expand_fragments_deep_nesting():
+    fragments = ["x"] + [f"({marker(i)})" for i in range(5000)]
+
+    pieces = expand_fragments(marker(5000), fragments)
+
+    assert "".join(pieces) == "(" * 5000 + "x" + ")" * 5000
+
+
+def test_process_with_fragments_matches_plain_output():
+    plain = make_visitor().process(make_document())
+
+    fragments_visitor = make_visitor(
+        **{
+            "mau.visitor.fragments.enabled": True,
+            "mau.visitor.fragments.min_size": 0,
+        }
+    )
+    result = fragments_visitor.process(make_document())
+
+    assert result == plain
+    assert FRAGMENT_MARKER_START not in result
+    assert fragments_visitor._fragments is None
+
+
+def test_fragments_min_size():
+    visitor = make_visitor(
+        **{
+            "mau.visitor.fragments.enabled": True,
+            "mau.visitor.fragments.min_size": 10,
+        }
+    )
+    visitor._preprocess(None)
+
+    assert visitor.visit(TextNode("Short")) == "Short"
+    assert visitor.visit(TextNode("Some longer text")) == marker(0)
+    assert visitor._fragments == ["Some longer text"]
+
+
+def test_visit_outside_process_does_not_create_fragments():
+    visitor = make_visitor(
+        **{
+            "mau.visitor.fragments.enabled": True,
+            "mau.visitor.fragments.min_size": 0,
+        }
+    )
+
+    assert visitor.visit(TextNode("Some text")) == "Some text"
@@ -0,0 +1,164 @@
+from typing import ClassVar
+from unittest.mock import patch
+
+import jinja2
+
+from mau.environment.environment import Environment
+from mau.nodes.inline import TextNode
+from mau.nodes.paragraph import ParagraphLineNode
+from mau.nodes.raw import RawContent, RawNode
+from mau.nodes.source import SourceNode
+from mau.parsers.document_processors.block_engines.source import scan_source
+from mau.test_helpers import NullMessageHandler
+from mau.text_buffer import Context
+from mau.visitors.jinja_visitor import JinjaVisitor
+
+
+def make_visitor(templates, visitor_class=JinjaVisitor):
+    environment = Environment()
+    environment.dupdate(templates, "mau.visitor.templates.custom")
+
+    return visitor_class(NullMessageHandler(), environment)
+
+
+def test_analyse_trivial_templates():
+    visitor = make_visitor(
+        {
+            "text.j2": "{{ value }}",
+            "paragraph-line.j2": "<p>{{ content }}</p>",
+            "word.j2": "static",
+        }
+    )
+
+    assert visitor._analyse_inline_template("text") == ((True, "value"),)
+    assert visitor._analyse_inline_template("paragraph-line") == (
+        (False, "<p>"),
+        (True, "content"),
+        (False, "</p>"),
+    )
+    assert visitor._analyse_inline_template("word") == ((False, "static"),)
+
+
+def test_analyse_non_trivial_templates():
+    visitor = make_visitor(
+        {
+            "text.j2": "{{ value | upper }}",
+            "word.j2": "{% if value %}{{ value }}{% endif %}",
+            "verbatim.j2": "{{ config.mau.key }}",
+            "style.j2": "{{ node.value }}",
+        }
+    )
+
+    assert visitor._analyse_inline_template("text") is None
+    assert visitor._analyse_inline_template("word") is None
+    assert visitor._analyse_inline_template("verbatim") is None
+    assert visitor._analyse_inline_template("style") is None
+
+
+def test_analyse_templates_with_autoescape():
+    class Visitor(JinjaVisitor):
+        jinja_environment_options: ClassVar[dict] = {"autoescape": True}
+
+    visitor = make_visitor({"text.j2": "{{ value }}"}, Visitor)
+
+    assert visitor._analyse_inline_template("text") is None
+    assert visitor.visit(TextNode("<b>")) == "&lt;b&gt;"
+
+
+def test_analyse_templates_with_strict_undefined():
+    class Visitor(JinjaVisitor):
+        jinja_environment_options: ClassVar[dict] = {
+            "undefined": jinja2.StrictUndefined
+        }
+
+    visitor = make_visitor({"text.j2": "{{ value }}"}, Visitor)
+
+    assert visitor._analyse_inline_template("text") is None
+
+
+def test_trivial_templates_skip_jinja():
+    visitor = make_visitor(
+        {
+            "text.j2": "{{ value }}{{ notavalue }}",
+            "paragraph-line.j2": "<p>{{ content }}</p>",
+        }
+    )
+
+    with patch.object(JinjaVisitor, "_render") as mock_render:
+        result = visitor.visit(ParagraphLineNode(content=[TextNode("Some text")]))
+
+    mock_render.assert_not_called()
+    assert result == "<p>Some text</p>"
+
+
+def test_non_trivial_templates_use_jinja():
+    visitor = make_visitor({"text.j2": "{{ value | upper }}"})
+
+    assert visitor.visit(TextNode("Some text")) == "SOME TEXT"
+
+
+def test_raw_lines_are_rendered_without_line_nodes():
+    class Visitor(JinjaVisitor):
+        join_with: ClassVar[dict] = {**JinjaVisitor.join_with, "raw": "\n"}
+
+    visitor = make_visitor(
+        {
+            "raw.j2": "{{ content }}",
+            "raw-line.j2": "[{{ value }}]",
+        },
+        Visitor,
+    )
+
+    node = RawNode(raw_content=RawContent("Line 1\nLine 2"))
+
+    assert visitor.visit(node) == "[Line 1]\n[Line 2]"
+    assert node.has_line_nodes is False
+
+    # Rendering the line nodes gives the same result.
+    assert len(node.content) == 2
+    assert visitor.visit(node) == "[Line 1]\n[Line 2]"
+
+
+def test_raw_lines_with_non_trivial_templates():
+    visitor = make_visitor(
+        {
+            "raw.j2": "{{ content }}|{{ text }}",
+            "raw-line.j2": "{{ value | upper }}",
+        }
+    )
+
+    node = RawNode(raw_content=RawContent("a\nb"))
+
+    assert visitor.visit(node) == "AB|a\nb"
+    assert node.has_line_nodes is True
+
+
+def test_source_lines_are_rendered_without_line_nodes():
+    class Visitor(JinjaVisitor):
+        join_with: ClassVar[dict] = {**JinjaVisitor.join_with, "source": "\n"}
+
+    visitor = make_visitor(
+        {
+            "source.j2": "{{ content }}",
+            "source-line.j2": "{{ line_number }} {{ line_content }}{{ marker }}",
+            "source-marker.j2": " <{{ value }}>",
+        },
+        Visitor,
+    )
+
+    def make_node():
+        return SourceNode(
+            "python",
+            source_content=scan_source(
+                "import sys\nimport os:mark:", Context.empty(), ":", "@", "", {}
+            ),
+        )
+
+    node = make_node()
+    assert visitor.visit(node) == "1 import sys\n2 import os <mark>"
+    assert node.has_line_nodes is False
+
+    # Rendering the line nodes gives the same result.
+    node = make_node()
+    assert len(node.content) == 2
+    assert visitor.visit(node) == "1 import sys\n2 import os <mark>"
@@ -0,0 +1,64 @@
+import pytest
+
+from mau.environment.environment import Environment
+from mau.message import MauException
+from mau.nodes.document import DocumentNode
+from mau.nodes.inline import TextNode
+from mau.nodes.paragraph import ParagraphLineNode, ParagraphNode
+from mau.test_helpers import NullMessageHandler
+from mau.visitors.jinja_visitor import JinjaVisitor
+
+TEMPLATES = {
+    "text.j2": "{{ value }}",
+    "paragraph-line.j2": "{{ content }}",
+    "paragraph.j2": "<p>{{ lines }}</p>",
+    "document.j2": "<body>{{ content }}</body>",
+}
+
+
+def make_document():
+    document = DocumentNode()
+    document.content = [
+        ParagraphNode(
+            lines=[ParagraphLineNode(content=[TextNode(f"Paragraph {i}")])],
+            parent=document,
+        )
+        for i in range(10)
+    ]
+
+    return document
+
+
+def make_visitor(templates=None, **config):
+    environment = Environment()
+    environment.dupdate(templates or TEMPLATES, "mau.visitor.templates.custom")
+
+    for key, value in config.items():
+        environment[key] = value
+
+    return JinjaVisitor(NullMessageHandler(), environment)
+
+
+def test_parallel_rendering():
+    expected = make_visitor().process(make_document())
+
+    visitor = make_visitor(**{"mau.visitor.jobs": 2})
+
+    assert visitor.process(make_document()) == expected
+
+
+def test_parallel_streaming():
+    expected = make_visitor().process(make_document())
+
+    visitor = make_visitor(**{"mau.visitor.jobs": 2})
+
+    assert "".join(visitor.process_iter(make_document())) == expected
+
+
+def test_parallel_rendering_error():
+    templates = dict(TEMPLATES)
+    templates["paragraph.j2"] = "{{ lines }}{{ notavalue.attribute }}"
+    visitor = make_visitor(templates, **{"mau.visitor.jobs": 2})
+
+    with pytest.raises(MauException):
+        visitor.process(make_document())
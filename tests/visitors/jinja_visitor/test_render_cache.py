@@ -0,0 +1,118 @@
+from unittest.mock import patch
+
+from mau.environment.environment import Environment
+from mau.nodes.document import DocumentNode
+from mau.nodes.inline import TextNode
+from mau.nodes.paragraph import ParagraphLineNode, ParagraphNode
+from mau.test_helpers import NullMessageHandler
+from mau.visitors.jinja_visitor import JinjaVisitor
+
+TEMPLATES = {
+    "text.j2": "{{ value }}",
+    "paragraph-line.j2": "{{ content }}",
+    "paragraph.j2": "<p>{{ lines }}</p>",
+    "document.j2": "<body>{{ content }}</body>",
+}
+
+
+def make_document(texts):
+    document = DocumentNode()
+    document.content = [
+        ParagraphNode(
+            lines=[ParagraphLineNode(content=[TextNode(text)])],
+            parent=document,
+        )
+        for text in texts
+    ]
+
+    return document
+
+
+def make_visitor(cache_path, templates=None, **config):
+    environment = Environment()
+    environment.dupdate(templates or TEMPLATES, "mau.visitor.templates.custom")
+    environment["mau.visitor.render_cache.path"] = str(cache_path)
+
+    for key, value in config.items():
+        environment[key] = value
+
+    return JinjaVisitor(NullMessageHandler(), environment)
+
+
+def test_render_cache_reuses_rendered_nodes(tmp_path):
+    texts = ["Paragraph 1", "Paragraph 2", "Paragraph 3"]
+    expected = "<body><p>Paragraph 1</p>\n<p>Paragraph 2</p>\n<p>Paragraph 3</p></body>"
+
+    assert make_visitor(tmp_path).process(make_document(texts)) == expected
+
+    visitor = make_visitor(tmp_path)
+    with patch.object(
+        JinjaVisitor, "_render_document_children", return_value=iter([])
+    ) as mock_render:
+        result = visitor.process(make_document(texts))
+
+    mock_render.assert_called_once()
+    assert mock_render.call_args.args[1] == []
+    assert result == expected
+
+
+def test_render_cache_renders_changed_nodes(tmp_path):
+    make_visitor(tmp_path).process(make_document(["Paragraph 1", "Paragraph 2"]))
+
+    visitor = make_visitor(tmp_path)
+    with patch.object(
+        JinjaVisitor,
+        "_render_document_children",
+        wraps=visitor._render_document_children,
+    ) as mock_render:
+        result = visitor.process(make_document(["Paragraph 1", "Changed"]))
+
+    assert mock_render.call_args.args[1] == [1]
+    assert result == "<body><p>Paragraph 1</p>\n<p>Changed</p></body>"
+
+
+def test_render_cache_key_depends_on_templates(tmp_path):
+    make_visitor(tmp_path).process(make_document(["Paragraph 1"]))
+
+    templates = dict(TEMPLATES)
+    templates["paragraph.j2"] = "<div>{{ lines }}</div>"
+
+    result = make_visitor(tmp_path, templates).process(make_document(["Paragraph 1"]))
+
+    assert result == "<body><div>Paragraph 1</div></body>"
+
+
+def test_render_cache_key_depends_on_configuration(tmp_path):
+    templates = dict(TEMPLATES)
+    templates["paragraph.j2"] = "<p>{{ config.mau.custom }}{{ lines }}</p>"
+
+    make_visitor(tmp_path, templates, **{"mau.custom": "A"}).process(
+        make_document(["Paragraph 1"])
+    )
+    result = make_visitor(tmp_path, templates, **{"mau.custom": "B"}).process(
+        make_document(["Paragraph 1"])
+    )
+
+    assert result == "<body><p>BParagraph 1</p></body>"
+
+
+def test_render_cache_disabled(tmp_path):
+    visitor = make_visitor(tmp_path, **{"mau.visitor.render_cache.enabled": False})
+
+    assert visitor._render_cache is None
+
+    visitor.process(make_document(["Paragraph 1"]))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_render_cache_with_fragments(tmp_path):
+    config = {
+        "mau.visitor.fragments.enabled": True,
+        "mau.visitor.fragments.min_size": 0,
+    }
+    texts = ["Paragraph 1", "Paragraph 2"]
+    expected = make_visitor(tmp_path / "plain").process(make_document(texts))
+
+    assert make_visitor(tmp_path, **config).process(make_document(texts)) == expected
+    assert make_visitor(tmp_path, **config).process(make_document(texts)) == expected
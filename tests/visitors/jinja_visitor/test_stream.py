@@ -0,0 +1,122 @@
+import pytest
+
+from mau.environment.environment import Environment
+from mau.message import MauException
+from mau.nodes.document import DocumentNode
+from mau.nodes.inline import TextNode
+from mau.nodes.paragraph import ParagraphLineNode, ParagraphNode
+from mau.test_helpers import NullMessageHandler
+from mau.visitors.base_visitor import BaseVisitor
+from mau.visitors.jinja_visitor import JinjaVisitor
+
+TEMPLATES = {
+    "text.j2": "{{ value }}",
+    "paragraph-line.j2": "{{ content }}",
+    "paragraph.j2": "<p>{{ lines }}</p>",
+    "document.j2": "<body>{{ content }}</body>",
+}
+
+
+def make_document():
+    return DocumentNode(
+        content=[
+            ParagraphNode(
+                lines=[ParagraphLineNode(content=[TextNode(f"Paragraph {i}")])]
+            )
+            for i in range(3)
+        ]
+    )
+
+
+def make_visitor(templates=None, **config):
+    environment = Environment()
+    environment.dupdate(templates or TEMPLATES, "mau.visitor.templates.custom")
+
+    for key, value in config.items():
+        environment[key] = value
+
+    return JinjaVisitor(NullMessageHandler(), environment)
+
+
+def test_base_visitor_process_iter():
+    visitor = BaseVisitor(NullMessageHandler(), Environment())
+
+    assert list(visitor.process_iter(None)) == [{}]
+
+
+def test_process_iter_document():
+    visitor = make_visitor()
+
+    chunks = list(visitor.process_iter(make_document()))
+
+    assert chunks == [
+        "<body>",
+        "<p>Paragraph 0</p>",
+        "\n",
+        "<p>Paragraph 1</p>",
+        "\n",
+        "<p>Paragraph 2</p>",
+        "</body>",
+    ]
+    assert "".join(chunks) == visitor.process(make_document())
+
+
+def test_process_iter_not_a_document():
+    visitor = make_visitor()
+
+    assert list(visitor.process_iter(TextNode("Some text"))) == ["Some text"]
+
+
+def test_process_iter_template_without_content():
+    templates = dict(TEMPLATES)
+    templates["document.j2"] = "<body></body>"
+    visitor = make_visitor(templates)
+
+    assert "".join(visitor.process_iter(make_document())) == "<body></body>"
+
+
+def test_process_iter_template_uses_content_twice():
+    templates = dict(TEMPLATES)
+    templates["document.j2"] = "{{ content }}|{{ content }}"
+    visitor = make_visitor(templates)
+
+    result = "".join(visitor.process_iter(make_document()))
+
+    assert result == visitor.process(make_document())
+
+
+def test_process_iter_with_fragments():
+    visitor = make_visitor(
+        **{
+            "mau.visitor.fragments.enabled": True,
+            "mau.visitor.fragments.min_size": 0,
+        }
+    )
+
+    result = "".join(visitor.process_iter(make_document()))
+
+    assert result == make_visitor().process(make_document())
+    assert visitor._fragments is None
+
+
+def test_process_iter_custom_postprocess():
+    class Visitor(JinjaVisitor):
+        def _postprocess(self, result, **kwargs):
+            return result.upper()
+
+    environment = Environment()
+    environment.dupdate(TEMPLATES, "mau.visitor.templates.custom")
+    visitor = Visitor(NullMessageHandler(), environment)
+
+    chunks = list(visitor.process_iter(make_document()))
+
+    assert chunks == [visitor.process(make_document())]
+
+
+def test_process_iter_undefined_value():
+    templates = dict(TEMPLATES)
+    templates["document.j2"] = "{{ content }}{{ notavalue.attribute }}"
+    visitor = make_visitor(templates)
+
+    with pytest.raises(MauException):
+        list(visitor.process_iter(make_document()))
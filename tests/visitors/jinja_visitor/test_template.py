@@ -1,6 +1,6 @@
 import pytest
 
-from mau.visitors.jinja_visitor import Template
+from mau.visitors.jinja_visitor import Template, template_signature
 from mau.nodes.node import Node
 
 
@@ -162,3 +162,47 @@ def test_match_tags():
     assert template.match(node_b)
     assert not template.match(node_a)
     assert not template.match(node_c)
+
+
+def test_template_signature():
+    parent = Node()
+    parent.type = "ptype_a"
+
+    node = Node(parent=parent)
+    node.type = "type_a"
+    node.arguments.subtype = "subtype_a"
+    node.arguments.tags = ["tag_b", "tag_a", "tag_b"]
+
+    assert template_signature(node) == (
+        "type_a",
+        "subtype_a",
+        ("tag_a", "tag_b"),
+        "ptype_a",
+    )
+
+
+def test_template_signature_no_parent():
+    node = Node()
+    node.type = "type_a"
+
+    assert template_signature(node) == ("type_a", None, (), None)
+
+
+def test_match_signature():
+    template = Template(
+        type="type_a",
+        name="name_a",
+        content="content_a",
+        subtype="subtype_a",
+        prefix="prefix_a",
+        ptype="ptype_a",
+        tags=["tag_a1"],
+    )
+
+    signature = ("type_a", "subtype_a", ("tag_a1", "tag_a2"), "ptype_a")
+
+    assert template.match_signature(signature)
+    assert template.match_signature(signature, prefix="prefix_a")
+    assert not template.match_signature(signature, prefix="prefix_b")
+    assert not template.match_signature(("type_a", "subtype_a", (), "ptype_a"))
+    assert not template.match_signature(("type_a", "subtype_a", ("tag_a1",), None))
@@ -0,0 +1,106 @@
+import os
+from unittest.mock import patch
+
+from mau.environment.environment import Environment
+from mau.nodes.inline import TextNode
+from mau.test_helpers import NullMessageHandler
+from mau.visitors.jinja_visitor import JinjaVisitor, clear_templates_registry
+
+
+def _custom_templates_environment(templates):
+    environment = Environment()
+    environment.dupdate(templates, "mau.visitor.templates.custom")
+
+    return environment
+
+
+def test_visitors_with_same_configuration_share_templates():
+    templates = {"text.j2": "{{ value }}"}
+
+    visitor1 = JinjaVisitor(
+        NullMessageHandler(), _custom_templates_environment(templates)
+    )
+    visitor2 = JinjaVisitor(
+        NullMessageHandler(), _custom_templates_environment(templates)
+    )
+
+    assert visitor1._dict_env is visitor2._dict_env
+    assert visitor1.templates is visitor2.templates
+    assert visitor1.templates_cache is visitor2.templates_cache
+
+
+def test_visitors_with_different_configuration_do_not_share_templates():
+    visitor1 = JinjaVisitor(
+        NullMessageHandler(),
+        _custom_templates_environment({"text.j2": "{{ value }}"}),
+    )
+    visitor2 = JinjaVisitor(
+        NullMessageHandler(),
+        _custom_templates_environment({"text.j2": "##{{ value }}##"}),
+    )
+
+    assert visitor1._dict_env is not visitor2._dict_env
+    assert visitor1.visit(TextNode("Some text")) == "Some text"
+    assert visitor2.visit(TextNode("Some text")) == "##Some text##"
+
+
+def test_clear_templates_registry():
+    templates = {"text.j2": "{{ value }}"}
+
+    visitor1 = JinjaVisitor(
+        NullMessageHandler(), _custom_templates_environment(templates)
+    )
+    clear_templates_registry()
+    visitor2 = JinjaVisitor(
+        NullMessageHandler(), _custom_templates_environment(templates)
+    )
+
+    assert visitor1._dict_env is not visitor2._dict_env
+
+
+def test_registry_skips_loading_templates():
+    templates = {"text.j2": "{{ value }}"}
+
+    JinjaVisitor(NullMessageHandler(), _custom_templates_environment(templates))
+
+    with patch.object(JinjaVisitor, "_load_template_set") as mock_load:
+        JinjaVisitor(NullMessageHandler(), _custom_templates_environment(templates))
+
+    mock_load.assert_not_called()
+
+
+def test_registry_is_invalidated_when_templates_change(tmp_path):
+    template_file = tmp_path / "text.j2"
+    template_file.write_text("{{ value }}")
+
+    environment = Environment.from_dict(
+        {"mau.visitor.templates.paths": [tmp_path.as_posix()]}
+    )
+
+    visitor1 = JinjaVisitor(NullMessageHandler(), environment)
+    assert visitor1.visit(TextNode("Some text")) == "Some text"
+
+    template_file.write_text("##{{ value }}##")
+    stat = template_file.stat()
+    os.utime(template_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    visitor2 = JinjaVisitor(NullMessageHandler(), environment)
+    assert visitor2._dict_env is not visitor1._dict_env
+    assert visitor2.visit(TextNode("Some text")) == "##Some text##"
+
+
+def test_registry_is_invalidated_when_templates_are_added(tmp_path):
+    (tmp_path / "text.j2").write_text("{{ value }}")
+
+    environment = Environment.from_dict(
+        {"mau.visitor.templates.paths": [tmp_path.as_posix()]}
+    )
+
+    visitor1 = JinjaVisitor(NullMessageHandler(), environment)
+
+    (tmp_path / "text.tg_tag1.j2").write_text("##{{ value }}##")
+
+    visitor2 = JinjaVisitor(NullMessageHandler(), environment)
+
+    assert visitor2._dict_env is not visitor1._dict_env
+    assert len(visitor2.templates["text"]) == 2
@@ -0,0 +1,113 @@
+import pytest
+
+from mau.environment.environment import Environment
+from mau.nodes.node import NodeInfo
+from mau.nodes.node_arguments import NodeArguments
+from mau.test_helpers import ATestNode, NullMessageHandler, generate_context
+from mau.visitors.binary_visitor import BinaryVisitor, pack, unpack
+
+
+def test_binary_visitor_class_attributes():
+    bv = BinaryVisitor(NullMessageHandler(), Environment())
+
+    assert bv.format_code == "msgpack"
+    assert bv.extension == "msgpack"
+
+
+def test_binary_visitor_no_node():
+    bv = BinaryVisitor(NullMessageHandler(), Environment())
+    result = bv.process(None)
+
+    assert result == b"\x80"
+
+
+def test_binary_visitor_generic_node():
+    node = ATestNode(
+        "Some test content",
+        arguments=NodeArguments(
+            unnamed_args=["arg1"],
+            named_args={"key1": "value1"},
+            tags=["tag1"],
+            internal_tags=["tag2"],
+            subtype="subtype1",
+        ),
+        info=NodeInfo(
+            context=generate_context(1, 2, 3, 4),
+        ),
+    )
+
+    bv = BinaryVisitor(NullMessageHandler(), Environment())
+    result = bv.process(node)
+
+    assert unpack(result) == {
+        "_type": "test",
+        "_context": generate_context(1, 2, 3, 4).asdict(),
+        "unnamed_args": ["arg1"],
+        "named_args": {"key1": "value1"},
+        "subtype": "subtype1",
+        "tags": ["tag1"],
+        "internal_tags": ["tag2"],
+        "parent": {},
+    }
+
+
+@pytest.mark.parametrize(
+    "value,encoded",
+    [
+        (None, b"\xc0"),
+        (False, b"\xc2"),
+        (True, b"\xc3"),
+        (1, b"\x01"),
+        (-1, b"\xff"),
+        (200, b"\xcc\xc8"),
+        (-200, b"\xd1\xff\x38"),
+        (70000, b"\xce\x00\x01\x11\x70"),
+        (1.5, b"\xcb\x3f\xf8\x00\x00\x00\x00\x00\x00"),
+        ("abc", b"\xa3abc"),
+        (b"abc", b"\xc4\x03abc"),
+        ([1, 2], b"\x92\x01\x02"),
+        ({"a": 1}, b"\x81\xa1a\x01"),
+    ],
+)
+def test_pack(value, encoded):
+    assert pack(value) == encoded
+    assert unpack(encoded) == value
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        2**40,
+        -(2**40),
+        "x" * 40,
+        "x" * 300,
+        "x" * 70000,
+        "àèìòù",
+        list(range(20)),
+        list(range(70000)),
+        {str(i): i for i in range(20)},
+        b"x" * 300,
+        {"nested": [{"a": [None, True, 1.25]}]},
+    ],
+)
+def test_pack_unpack(value):
+    assert unpack(pack(value)) == value
+
+
+def test_pack_tuples_as_lists():
+    assert unpack(pack((1, 2))) == [1, 2]
+
+
+def test_pack_unsupported_type():
+    with pytest.raises(TypeError):
+        pack(object())
+
+
+def test_unpack_truncated_data():
+    with pytest.raises(ValueError):
+        unpack(b"\xa3ab")
+
+
+def test_unpack_extra_data():
+    with pytest.raises(ValueError):
+        unpack(b"\x01\x02")
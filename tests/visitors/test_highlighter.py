@@ -0,0 +1,115 @@
+from unittest.mock import patch
+
+from mau.cache import DiskCache
+from mau.environment.environment import Environment
+from mau.nodes.document import DocumentNode
+from mau.nodes.source import SourceNode
+from mau.parsers.document_processors.block_engines.source import scan_source
+from mau.test_helpers import NullMessageHandler
+from mau.text_buffer import Context
+from mau.visitors import highlighter
+from mau.visitors.highlighter import (
+    SourceHighlighter,
+    find_source_nodes,
+    highlight_code,
+)
+from mau.visitors.html_visitor import HtmlVisitor
+
+CODE = "\nimport os:mark:\n\nx = '<b>'\n"
+
+
+def make_source_node(code=CODE, language="python"):
+    return SourceNode(
+        language,
+        source_content=scan_source(code, Context.empty(), ":", "@", "default", {}),
+    )
+
+
+def test_highlight_code_keeps_the_lines():
+    lines = highlight_code(
+        "python", "\nimport os\n\nx = '<b>'\n", "html", {"nowrap": True}
+    )
+
+    assert len(lines) == 5
+    assert lines[0] == ""
+    assert lines[1].startswith('<span class="kn">import</span>')
+    assert "&lt;b&gt;" in lines[3]
+    assert lines[4] == ""
+
+
+def test_highlight_code_unknown_language():
+    assert highlight_code("notalanguage", "code", "html", {}) is None
+
+
+def test_find_source_nodes():
+    first = make_source_node()
+    second = make_source_node()
+    document = DocumentNode(content=[first, second, first])
+
+    assert find_source_nodes(document) == [first, second]
+
+
+def test_highlighter_runs_once_per_code(tmp_path):
+    document = DocumentNode(
+        content=[make_source_node(), make_source_node(), make_source_node("a = 1")]
+    )
+
+    source_highlighter = SourceHighlighter(cache=DiskCache(tmp_path))
+
+    with patch.object(
+        highlighter, "_highlight_worker", wraps=highlighter._highlight_worker
+    ) as mock_worker:
+        assert source_highlighter.process(document) == 3
+
+    assert mock_worker.call_count == 2
+    assert source_highlighter.misses == 2
+
+    first, second, third = document.content
+    assert first.highlighted_lines is second.highlighted_lines
+    assert len(first.highlighted_lines) == 5
+    assert third.highlighted_lines == [
+        '<span class="n">a</span> <span class="o">=</span> <span class="mi">1</span>'
+    ]
+
+    # The markers are not highlighted.
+    assert "mark" not in first.highlighted_lines[1]
+
+    # A new highlighter finds the code in the cache.
+    document = DocumentNode(content=[make_source_node()])
+    source_highlighter = SourceHighlighter(cache=DiskCache(tmp_path))
+
+    with patch.object(highlighter, "_highlight_worker") as mock_worker:
+        source_highlighter.process(document)
+
+    mock_worker.assert_not_called()
+    assert source_highlighter.hits == 1
+    assert document.content[0].highlighted_lines == first.highlighted_lines
+
+
+def test_highlighter_uses_processes():
+    document = DocumentNode(
+        content=[make_source_node("a = 1"), make_source_node("b = 2")]
+    )
+
+    SourceHighlighter(jobs=2).process(document)
+
+    assert [node.highlighted_lines[0][:24] for node in document.content] == [
+        '<span class="n">a</span>',
+        '<span class="n">b</span>',
+    ]
+
+
+def test_html_visitor_renders_highlighted_lines():
+    environment = Environment.from_dict(
+        {"visitor": {"highlight": {"enabled": True}}}, "mau"
+    )
+    visitor = HtmlVisitor(NullMessageHandler(), environment)
+
+    node = make_source_node("x = '<b>'")
+    rendered = visitor.process(DocumentNode(content=[node]))
+
+    assert '<span class="s1">&#39;&lt;b&gt;&#39;</span>' in rendered
+
+    # Rendering the line nodes gives the same result.
+    assert len(node.content) == 1
+    assert visitor.process(DocumentNode(content=[node])) == rendered
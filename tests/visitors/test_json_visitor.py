@@ -0,0 +1,89 @@
+import json
+
+from mau.environment.environment import Environment
+from mau.nodes.node import NodeInfo
+from mau.nodes.node_arguments import NodeArguments
+from mau.test_helpers import ATestNode, NullMessageHandler, generate_context
+from mau.visitors.json_visitor import JsonVisitor
+
+
+def test_json_visitor_class_attributes():
+    bv = JsonVisitor(NullMessageHandler(), Environment())
+
+    assert bv.format_code == "json"
+    assert bv.extension == "json"
+
+
+def test_json_visitor_no_node():
+    bv = JsonVisitor(NullMessageHandler(), Environment())
+    result = bv.process(None)
+
+    assert result == "{}"
+
+
+def test_json_visitor_generic_node():
+    node = ATestNode(
+        "Some test content",
+        arguments=NodeArguments(
+            unnamed_args=["arg1"],
+            named_args={"key1": "value1"},
+            tags=["tag1"],
+            internal_tags=["tag2"],
+            subtype="subtype1",
+        ),
+        info=NodeInfo(
+            context=generate_context(1, 2, 3, 4),
+        ),
+    )
+
+    bv = JsonVisitor(NullMessageHandler(), Environment())
+    result = bv.process(node)
+
+    assert json.loads(result) == {
+        "_type": "test",
+        "_context": generate_context(1, 2, 3, 4).asdict(),
+        "unnamed_args": ["arg1"],
+        "named_args": {"key1": "value1"},
+        "subtype": "subtype1",
+        "tags": ["tag1"],
+        "internal_tags": ["tag2"],
+        "parent": {},
+    }
+
+
+def test_json_visitor_is_compact():
+    node = ATestNode("Some test content")
+
+    bv = JsonVisitor(NullMessageHandler(), Environment())
+    result = bv.process(node)
+
+    assert " " not in result.replace("Some test content", "")
+
+
+def test_json_visitor_strip_parent():
+    parent = ATestNode("Parent")
+    node = ATestNode("Some test content", parent=parent)
+
+    environment = Environment()
+    environment["mau.visitor.strip_parent"] = True
+
+    bv = JsonVisitor(NullMessageHandler(), environment)
+    result = json.loads(bv.process(node))
+
+    assert "parent" not in result
+
+
+def test_json_visitor_intern_contexts():
+    context = generate_context(1, 2, 3, 4)
+    parent = ATestNode("Parent", info=NodeInfo(context=context))
+    node = ATestNode("Some test content", parent=parent, info=NodeInfo(context=context))
+
+    environment = Environment()
+    environment["mau.visitor.intern_contexts"] = True
+
+    bv = JsonVisitor(NullMessageHandler(), environment)
+    result = json.loads(bv.process(node))
+
+    assert result["contexts"] == [context.asdict()]
+    assert result["tree"]["_context"] == 0
+    assert result["tree"]["parent"]["_context"] == 0
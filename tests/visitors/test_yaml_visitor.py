@@ -49,3 +49,29 @@ def test_yaml_visitor_generic_node():
         "internal_tags": ["tag2"],
         "parent": {},
     }
+
+
+def test_yaml_visitor_strip_parent_and_intern_contexts():
+    context = generate_context(1, 2, 3, 4)
+    parent = ATestNode("Parent", info=NodeInfo(context=context))
+    node = ATestNode("Some test content", parent=parent, info=NodeInfo(context=context))
+
+    environment = Environment()
+    environment["mau.visitor.strip_parent"] = True
+    environment["mau.visitor.intern_contexts"] = True
+
+    bv = YamlVisitor(NullMessageHandler(), environment)
+    result = bv.process(node)
+
+    assert yaml.load(result, Loader=yaml.SafeLoader) == {
+        "contexts": [context.asdict()],
+        "tree": {
+            "_type": "test",
+            "_context": 0,
+            "unnamed_args": [],
+            "named_args": {},
+            "subtype": None,
+            "tags": [],
+            "internal_tags": [],
+        },
+    }